@@ -0,0 +1,257 @@
+"""
+backup.py
+Online backup of ops.db with the SQLite backup API, gzip-compressed and rotated.
+
+The copy runs in a worker thread on its own connection, which holds a single
+read transaction for the whole copy: the snapshot stays consistent, and commits
+made meanwhile neither restart the copy nor wait for it (WAL readers never block
+the writer). db._write_lock is never taken, so the monitor and the job lanes
+keep running however large the DB grows. Pages are copied STEP_PAGES at a time
+with a short pause between steps to leave disk bandwidth for the bot.
+
+Usage:
+    python backup.py                  # create a backup now
+    python backup.py --list           # list backups, newest first
+    python backup.py --restore FILE   # replace ops.db (bot must be stopped)
+    python backup.py --convert-auto-vacuum  # one-time VACUUM (bot must be stopped)
+
+Restore keeps the replaced DB as <db>.pre-restore. --convert-auto-vacuum
+rewrites a DB created before auto_vacuum=INCREMENTAL so the nightly
+incremental vacuum can shrink it; it needs free disk for a full copy.
+
+Dependency chain: config <- db <- backup
+"""
+
+import argparse
+import asyncio
+import gzip
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import db
+from config import KST, settings
+
+# ── Module-level constants (monkeypatch-friendly) ─────────────────────────────
+
+_PROJECT_ROOT = Path(__file__).resolve().parent
+LOCK_FILE = _PROJECT_ROOT / ".main.lock"
+BACKUP_DIR = str(_PROJECT_ROOT / settings.db_backup_dir)
+STEP_PAGES = settings.db_backup_step_pages
+STEP_PAUSE_SECONDS = 0.005
+_COPY_BLOCK = 1 << 20
+
+
+def _archive_glob() -> str:
+    return f"{Path(db.DB_FILE).stem}-*.db.gz"
+
+
+def list_backups(dest_dir: str | None = None) -> list[Path]:
+    """Backup archives in dest_dir, newest first."""
+    folder = Path(dest_dir or BACKUP_DIR)
+    if not folder.is_dir():
+        return []
+    return sorted(
+        folder.glob(_archive_glob()), key=lambda p: p.stat().st_mtime_ns, reverse=True
+    )
+
+
+def rotate(keep: int, dest_dir: str | None = None) -> list[Path]:
+    """Delete all but the newest keep archives. Returns the removed paths."""
+    removed = list_backups(dest_dir)[max(int(keep), 1) :]
+    for path in removed:
+        path.unlink(missing_ok=True)
+    return removed
+
+
+def _copy_snapshot(src_path: str, dst_path: str, step_pages: int) -> int:
+    """Copy src into a fresh dst file page-step by page-step. Returns page count."""
+    src = sqlite3.connect(
+        src_path, isolation_level=None, timeout=settings.db_busy_timeout_ms / 1000
+    )
+    dst = sqlite3.connect(dst_path, isolation_level=None)
+    try:
+        src.execute("PRAGMA query_only=ON")
+        # One read transaction across all steps pins the snapshot.
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        dst.execute("PRAGMA journal_mode=OFF")
+        dst.execute("PRAGMA synchronous=OFF")
+
+        def _pause(status: int, remaining: int, total: int) -> None:
+            if remaining and STEP_PAUSE_SECONDS:
+                time.sleep(STEP_PAUSE_SECONDS)
+
+        src.backup(dst, pages=max(int(step_pages), 1), progress=_pause)
+        src.execute("COMMIT")
+        pages = dst.execute("PRAGMA page_count").fetchone()[0]
+        check = dst.execute("PRAGMA quick_check").fetchone()[0]
+        if check != "ok":
+            raise RuntimeError(f"backup copy failed quick_check: {check}")
+        return pages
+    finally:
+        dst.close()
+        src.close()
+
+
+def _gzip_file(src_path: str, dst_path: str) -> None:
+    part = f"{dst_path}.part"
+    with open(src_path, "rb") as src, gzip.open(part, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, _COPY_BLOCK)
+    os.replace(part, dst_path)
+
+
+def _create_backup_sync(dest_dir: str, keep: int, step_pages: int) -> dict:
+    started = time.monotonic()
+    folder = Path(dest_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(KST).strftime("%Y%m%d-%H%M%S")
+    archive = folder / f"{Path(db.DB_FILE).stem}-{stamp}.db.gz"
+    snapshot = folder / f".{archive.name[: -len('.gz')]}.tmp"
+    try:
+        pages = _copy_snapshot(db.DB_FILE, str(snapshot), step_pages)
+        db_bytes = snapshot.stat().st_size
+        _gzip_file(str(snapshot), str(archive))
+    finally:
+        snapshot.unlink(missing_ok=True)
+        Path(f"{archive}.part").unlink(missing_ok=True)
+    removed = rotate(keep, dest_dir)
+    return {
+        "path": str(archive),
+        "pages": pages,
+        "db_bytes": db_bytes,
+        "gz_bytes": archive.stat().st_size,
+        "seconds": round(time.monotonic() - started, 2),
+        "removed": len(removed),
+    }
+
+
+async def create_backup(
+    dest_dir: str | None = None,
+    keep: int | None = None,
+    step_pages: int | None = None,
+) -> dict:
+    """Back up DB_FILE to <dest_dir>/<db>-YYYYmmdd-HHMMSS.db.gz and rotate.
+
+    Runs in a worker thread; safe while the bot is writing.
+    Returns: path, pages, db_bytes, gz_bytes, seconds and removed archive count.
+    """
+    return await asyncio.to_thread(
+        _create_backup_sync,
+        dest_dir or BACKUP_DIR,
+        settings.db_backup_keep if keep is None else keep,
+        STEP_PAGES if step_pages is None else step_pages,
+    )
+
+
+def restore_backup(archive: str, db_path: str | None = None) -> Path | None:
+    """Replace db_path (default DB_FILE) with a backup archive.
+
+    Refuses while .main.lock exists. The archive is decompressed and checked
+    before anything is replaced; the old DB is kept as <db>.pre-restore.
+    Returns: path of the kept pre-restore copy, None if there was no DB.
+    """
+    if LOCK_FILE.exists():
+        raise RuntimeError("bot is running (.main.lock exists); stop it first")
+    target = Path(db_path or db.DB_FILE)
+    staged = target.with_name(f".{target.name}.restore")
+    try:
+        with gzip.open(archive, "rb") as src, open(staged, "wb") as dst:
+            shutil.copyfileobj(src, dst, _COPY_BLOCK)
+        conn = sqlite3.connect(staged)
+        try:
+            check = conn.execute("PRAGMA quick_check").fetchone()[0]
+        finally:
+            conn.close()
+        if check != "ok":
+            raise RuntimeError(f"backup failed quick_check: {check}")
+
+        kept = None
+        if target.exists():
+            # Fold any WAL into the old file so the pre-restore copy is complete.
+            conn = sqlite3.connect(target)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                conn.close()
+            kept = target.with_name(f"{target.name}.pre-restore")
+            os.replace(target, kept)
+        for suffix in ("-wal", "-shm"):
+            Path(f"{target}{suffix}").unlink(missing_ok=True)
+        os.replace(staged, target)
+        return kept
+    finally:
+        staged.unlink(missing_ok=True)
+
+
+def convert_auto_vacuum(db_path: str | None = None) -> bool:
+    """Switch db_path (default DB_FILE) to auto_vacuum=INCREMENTAL with a VACUUM.
+
+    Refuses while .main.lock exists. Returns False if it was already incremental.
+    """
+    if LOCK_FILE.exists():
+        raise RuntimeError("bot is running (.main.lock exists); stop it first")
+    conn = sqlite3.connect(db_path or db.DB_FILE, isolation_level=None)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return False
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        return True
+    finally:
+        conn.close()
+
+
+# ── Entry point ───────────────────────────────────────────────────────────────
+
+
+def main(argv: list[str] | None = None) -> bool:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--list", action="store_true", help="list backups")
+    group.add_argument("--restore", metavar="FILE", help="restore ops.db from FILE")
+    group.add_argument(
+        "--convert-auto-vacuum",
+        action="store_true",
+        help="one-time switch of ops.db to auto_vacuum=INCREMENTAL (full VACUUM)",
+    )
+    parser.add_argument("--dir", default=None, help=f"backup dir ({BACKUP_DIR})")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for path in list_backups(args.dir):
+            stamp = datetime.fromtimestamp(path.stat().st_mtime, KST)
+            print(f"{stamp:%Y-%m-%d %H:%M:%S}  {path.stat().st_size:>12,}  {path}")
+        return True
+    if args.restore:
+        try:
+            kept = restore_backup(args.restore)
+        except Exception as exc:
+            print(f"backup: ERROR restore failed: {exc}")
+            return False
+        print(f"backup: restored {db.DB_FILE} from {args.restore}")
+        if kept is not None:
+            print(f"backup: previous DB kept as {kept}")
+        return True
+
+    if args.convert_auto_vacuum:
+        try:
+            converted = convert_auto_vacuum()
+        except Exception as exc:
+            print(f"backup: ERROR auto_vacuum conversion failed: {exc}")
+            return False
+        state = "converted to" if converted else "already"
+        print(f"backup: {db.DB_FILE} {state} auto_vacuum=INCREMENTAL")
+        return True
+
+    report = asyncio.run(create_backup(args.dir))
+    print(f"backup: {report}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
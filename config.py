@@ -6,6 +6,7 @@ config.py
 
 from datetime import timezone, timedelta
 from pathlib import Path
+from typing import Literal
 
 from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -300,6 +301,35 @@ class Settings(BaseSettings):
     coupang_product_sheet: str = "쿠팡상품관리"
     coupang_order_sheet: str = "쿠팡주문관리"
     coupang_product_refresh_minutes: int = Field(30, ge=1)
+    # 주문 레인: 저비용 신호 확인 주기(초) + 안전망 정기 폴링 주기(분)
+    # 예산: 기존 5분 주문/발송 잡 = 시간당 API 24회+, 시트 읽기 24회.
+    # probe 300초(시간당 ≤12회, 각 API 1회 + G~M 읽기 ≤1회) + 15분 폴링이 그 이하.
+    coupang_order_probe_seconds: int = Field(300, ge=60)
+    coupang_order_poll_minutes: int = Field(15, ge=1)
+
+    # ops.db 로그 보존: 원본 행 보존일(이후 일별 집계로 압축) + 이벤트 보존일 + 실행 시각(KST)
+    db_retention_days: int = Field(30, ge=1)
+    db_event_retention_days: int = Field(365, ge=1)
+    db_maintenance_hour: int = Field(4, ge=0, le=23)
+    # 가격 시계열 원본 포인트 보존일 (시간/일별 집계는 계속 보관)
+    price_series_raw_days: int = Field(180, ge=1)
+
+    # ops.db pragma 프로필 (쓰기/읽기 연결 공통) + 체크포인트/optimize 주기(분)
+    db_synchronous: Literal["OFF", "NORMAL", "FULL"] = "NORMAL"
+    db_cache_size_kib: int = Field(16384, ge=256)
+    db_mmap_size_mib: int = Field(256, ge=0)
+    db_temp_store: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+    db_wal_autocheckpoint_pages: int = Field(1000, ge=0)
+    db_journal_size_limit_mib: int = Field(64, ge=0)
+    db_busy_timeout_ms: int = Field(10000, ge=0)
+    db_read_pool_size: int = Field(2, ge=0)
+    db_checkpoint_minutes: int = Field(30, ge=1)
+
+    # ops.db 온라인 백업: 저장 폴더(프로젝트 기준) + 보관 개수 + 실행 시각(KST) + 단계당 페이지 수
+    db_backup_dir: str = "backups"
+    db_backup_keep: int = Field(7, ge=1)
+    db_backup_hour: int = Field(3, ge=0, le=23)
+    db_backup_step_pages: int = Field(1024, ge=1)
 
     # MyMunja SMS
     mymunja_id: str = ""
@@ -14,12 +14,29 @@ import hmac
 import json
 import os
 import re
+import time
+from dataclasses import dataclass
 from difflib import SequenceMatcher
 from datetime import datetime, timezone, timedelta
 from urllib.parse import urlencode, urlparse
 
 from config import KST, settings
 from utils import post_webhook
+import db
+import job_metrics
+import price_series
+from product_names import (
+    cache_summary as _name_cache_summary,
+    canonicalize_count_tokens as _canonicalize_count_tokens,  # noqa: F401
+    canonicalize_measure_tokens as _canonicalize_measure_tokens,  # noqa: F401
+    compact_number_str as _compact_number_str,  # noqa: F401
+    name_count_set as _name_count_set,
+    name_number_set as _name_number_set,
+    name_token_set as _name_token_set,
+    normalize_product_name as _normalize_product_name,
+    parse_product_number as _parse_product_number,  # noqa: F401
+    product_name_variants as _product_name_variants,
+)
 
 import httpx
 import gspread
@@ -28,8 +45,15 @@ from google.oauth2.service_account import Credentials
 
 try:
     from rapidfuzz import fuzz as _rf_fuzz
+    from rapidfuzz import process as _rf_process
 except Exception:
     _rf_fuzz = None
+    _rf_process = None
+
+try:
+    import numpy as _np  # rapidfuzz process.cdist 결과 배열용 (선택)
+except Exception:
+    _np = None
 
 import logging
 
@@ -277,6 +301,7 @@ async def _coupang_get(
         r = await client.get(COUPANG_BASE_URL + full_path, headers=headers)
         if not r.is_success and log_error:
             _log_api_error("GET", r)
+        job_metrics.add(api_calls=1)
         r.raise_for_status()
         await asyncio.sleep(_COUPANG_API_DELAY)
         return r.json()
@@ -299,6 +324,7 @@ async def _coupang_put(
             )
         if not r.is_success:
             _log_api_error("PUT", r)
+        job_metrics.add(api_calls=1)
         r.raise_for_status()
         await asyncio.sleep(_COUPANG_API_DELAY)
         return r.json()
@@ -321,6 +347,7 @@ async def _coupang_post(
             )
         if not r.is_success:
             _log_api_error("POST", r)
+        job_metrics.add(api_calls=1)
         r.raise_for_status()
         await asyncio.sleep(_COUPANG_API_DELAY)
         return r.json()
@@ -459,6 +486,7 @@ def _google_creds():
 
 
 def _open_coupang_sheet(sheet_name: str):
+    job_metrics.add(sheet_calls=1)
     gc = gspread.authorize(_google_creds())
     sh = gc.open_by_key(COUPANG_SHEET_ID)
     return sh.worksheet(sheet_name)
@@ -807,11 +835,14 @@ async def _record_order_to_sourcing_tab(
     product_name: str,
     qty: int,
     paid_unit: int | None,
+    pending_rows: dict[str, dict] | None = None,
 ) -> None:
     """주문 정보를 소싱처 탭에 자동 기록한다.
 
     vendorItemId로 소싱목록을 조회하여 구매처 URL과 매입가격을 가져오고,
     URL 도메인에 대응하는 소싱처 탭에 행을 추가한다.
+    pending_rows가 주어지면 즉시 쓰지 않고 탭별로 모아 두며,
+    _flush_sourcing_tab_rows()가 탭마다 한 번에 기록한다.
 
     실패 시 Discord 경고 알림을 발송하며, 어떤 경우에도 예외를 발생시키지 않는다.
     """
@@ -869,9 +900,10 @@ async def _record_order_to_sourcing_tab(
         await post_webhook(COUPANG_ORDER_WEBHOOK, "소싱탭 기록 실패", embeds=embeds)
         return
 
-    # d. 소싱처 탭 열기
+    # d. 소싱처 탭 열기 (일괄 기록 중이면 이미 연 탭 재사용)
+    pending_tab = pending_rows.get(tab_name) if pending_rows is not None else None
     try:
-        ws = sh.worksheet(tab_name)
+        ws = pending_tab["ws"] if pending_tab else sh.worksheet(tab_name)
     except gspread.exceptions.WorksheetNotFound:
         _log_sourcing.warning(
             f"소싱탭 기록 스킵: 탭 없음 | orderId={order_id} tab={tab_name}"
@@ -913,6 +945,13 @@ async def _record_order_to_sourcing_tab(
         str(buy_price) if buy_price else "",  # M: 매입가격
     ]
 
+    if pending_rows is not None:
+        if pending_tab is None:
+            pending_tab = pending_rows[tab_name] = {"ws": ws, "rows": [], "labels": []}
+        pending_tab["rows"].append(row)
+        pending_tab["labels"].append(f"orderId={order_id} | {product_name}")
+        return
+
     # f. 행 추가 (K열 = 쿠팡주문ID 기준 마지막 행 탐지)
     # get_all_values()는 모든 열 중 데이터가 있는 마지막 행까지 반환하므로,
     # A~M 외 열(수식 등)이 더 아래에 있으면 next_row가 실제 데이터 끝보다 뒤로 밀림.
@@ -934,6 +973,40 @@ async def _record_order_to_sourcing_tab(
     )
 
 
+def _flush_sourcing_tab_rows(pending_rows: dict[str, dict]) -> int:
+    """탭별로 모아 둔 소싱탭 행을 탭당 K열 조회 1회 + 범위 쓰기 1회로 기록한다.
+
+    append_rows()는 표 범위를 자동 탐지하므로 A~M 외 열에 데이터가 있으면
+    엉뚱한 위치에 붙는다. 단건 경로와 같이 K열 기준 다음 빈 행을 구하고,
+    그 뒤로 모은 행 수만큼 범위를 지정해 쓴다.
+
+    Returns: 기록된 행 수
+    """
+    written = 0
+    for tab_name, pending_tab in pending_rows.items():
+        rows = pending_tab["rows"]
+        if not rows:
+            continue
+        ws = pending_tab["ws"]
+        try:
+            col_k = ws.col_values(11)  # K열 (쿠팡주문ID)
+            next_row = len(col_k) + 1
+            last_row = next_row + len(rows) - 1
+            ws.update(
+                f"A{next_row}:M{last_row}", rows, value_input_option="USER_ENTERED"
+            )
+        except Exception as e:
+            _log_sourcing.error(
+                f"소싱탭 행 추가 실패: tab={tab_name} rows={len(rows)} error={e}"
+            )
+            continue
+
+        written += len(rows)
+        for label in pending_tab["labels"]:
+            _log_sourcing.info(f"소싱탭 기록 완료: {tab_name} | {label}")
+    return written
+
+
 def _check_order_price_guard(order: dict, min_price_by_vid: dict[str, int]) -> dict:
     """
     정책:
@@ -1000,6 +1073,7 @@ def _flush_sheet_cell_updates(
     for i in range(0, len(items), chunk_size):
         chunk = items[i : i + chunk_size]
         body = [{"range": rng, "values": [[val]]} for rng, val in chunk]
+        job_metrics.add(sheet_calls=1)
         try:
             ws.batch_update(body, value_input_option="USER_ENTERED")
         except Exception as e:
@@ -1088,6 +1162,55 @@ async def get_orders_by_status(status: str, days: int = 7) -> list[dict]:
         return []
 
 
+# 주문시트에 이미 있는 orderId (process_new_orders가 갱신). 가격미달보류처럼
+# ACCEPT에 머무는 주문이 신호를 계속 점유하지 않도록 probe에서 제외한다.
+# probe는 1건씩 조회하고, 시트에 이미 있는 주문이면 다음 페이지를
+# _ORDER_PROBE_MAX_PAGES까지만 넘겨 본다 (그 이상은 정기 폴링이 처리).
+_ORDER_PROBE_PAGE_SIZE = 1
+_ORDER_PROBE_MAX_PAGES = 3
+_sheet_order_ids: set[str] = set()
+
+
+async def probe_accept_orders(days: int = 7) -> str | None:
+    """결제완료(ACCEPT) 주문을 1건 단위로 조회하는 저비용 신호.
+
+    주문시트에 아직 없는 첫 orderId를 반환하고, 그런 주문이 없으면 "",
+    조회 실패 시 None. 보통 API 1회로 끝난다.
+    """
+    now_kst = datetime.now(KST)
+    start = (now_kst - timedelta(days=max(min(int(days), 31), 1))).date()
+    params = {
+        "createdAtFrom": _coupang_date_with_tz(
+            datetime(start.year, start.month, start.day, tzinfo=KST)
+        ),
+        "createdAtTo": _coupang_date_with_tz(now_kst),
+        "status": "ACCEPT",
+        "maxPerPage": _ORDER_PROBE_PAGE_SIZE,
+    }
+    path = f"{COUPANG_OPENAPI_V5_VENDOR}/ordersheets"
+    for _ in range(_ORDER_PROBE_MAX_PAGES):
+        try:
+            result = await _coupang_get(path, params)
+        except Exception as e:
+            _log_order.warning(f"신규 주문 신호 조회 실패: {e}")
+            return None
+        data = result.get("data", [])
+        next_token = str(result.get("nextToken", "") or "")
+        if isinstance(data, dict):
+            next_token = str(data.get("nextToken", "") or next_token)
+            data = data.get("content", []) or data.get("data", []) or []
+        if not isinstance(data, list):
+            return ""
+        for order in data:
+            order_id = str(order.get("orderId", "") or "?")
+            if order_id not in _sheet_order_ids:
+                return order_id
+        if not next_token or next_token == params.get("nextToken"):
+            return ""
+        params["nextToken"] = next_token
+    return ""
+
+
 async def get_new_orders() -> list[dict]:
     """결제완료(ACCEPT) 상태 주문 목록 조회 (하위 호환용)"""
     return await get_orders_by_status("ACCEPT")
@@ -1214,41 +1337,114 @@ async def get_order_sheet_ids() -> set[str]:
         return set()
 
 
+def _build_order_sheet_row(order: dict, sms_sent: bool, status: str) -> list[str]:
+    """주문 1건을 주문시트 행(A~M열)으로 변환"""
+    receiver = order.get("receiver", {})
+    items = order.get("orderItems", [{}])
+    item = items[0] if items else {}
+
+    # ordersheets API: vendorItemName, shippingCount 사용
+    product_name = _order_item_name(item)
+    quantity = _order_item_qty(item)
+
+    return [
+        str(order.get("orderId", "")),  # A: 주문ID
+        product_name,  # B: 상품명
+        str(quantity),  # C: 수량
+        receiver.get("name", ""),  # D: 수신자
+        receiver.get("safeNumber", receiver.get("receiverNumber", "")),  # E: 연락처
+        (
+            receiver.get("addr1", "") + " " + receiver.get("addr2", "")
+        ).strip(),  # F: 주소
+        status,  # G: 상태
+        order.get("orderedAt", ""),  # H: 주문일시
+        "발송완료" if sms_sent else "미완료",  # I: SMS발송
+        str(order.get("shipmentBoxId", "")),  # J: shipmentBoxId (배송처리에 필요)
+        "",  # K: 송장번호 (수기입력)
+        "",  # L: 택배사코드 (수기입력)
+        "",  # M: 발송처리일시 (자동기록)
+    ]
+
+
 async def append_order_to_sheet(
     ws, order: dict, sms_sent: bool, status: str = "상품준비중"
 ):
     """주문 정보를 구글 시트에 추가 (A~M열)"""
     try:
-        receiver = order.get("receiver", {})
-        items = order.get("orderItems", [{}])
-        item = items[0] if items else {}
-
-        # ordersheets API: vendorItemName, shippingCount 사용
-        product_name = _order_item_name(item)
-        quantity = _order_item_qty(item)
-
-        row = [
-            str(order.get("orderId", "")),  # A: 주문ID
-            product_name,  # B: 상품명
-            str(quantity),  # C: 수량
-            receiver.get("name", ""),  # D: 수신자
-            receiver.get("safeNumber", receiver.get("receiverNumber", "")),  # E: 연락처
-            (
-                receiver.get("addr1", "") + " " + receiver.get("addr2", "")
-            ).strip(),  # F: 주소
-            status,  # G: 상태
-            order.get("orderedAt", ""),  # H: 주문일시
-            "발송완료" if sms_sent else "미완료",  # I: SMS발송
-            str(order.get("shipmentBoxId", "")),  # J: shipmentBoxId (배송처리에 필요)
-            "",  # K: 송장번호 (수기입력)
-            "",  # L: 택배사코드 (수기입력)
-            "",  # M: 발송처리일시 (자동기록)
-        ]
+        row = _build_order_sheet_row(order, sms_sent, status)
         ws.append_row(row, value_input_option="USER_ENTERED")
     except Exception as e:
         _log_sheet.error(f"주문 기록 실패: {e}")
 
 
+def _append_order_rows(ws, rows: list[list[str]]) -> int:
+    """주문 행을 append_rows 1회로 기록. 실패 시 누락된 행만 행 단위로 재시도.
+
+    append_rows가 응답 타임아웃 등으로 실패해도 시트에는 이미 반영됐을 수 있으므로,
+    재시도 전에 A열(주문ID)을 다시 읽어 이미 기록된 주문은 건너뛴다.
+
+    Returns: 기록된 행 수 (이미 반영된 행 포함)
+    """
+    if not rows:
+        return 0
+    job_metrics.add(sheet_calls=1)
+    try:
+        ws.append_rows(rows, value_input_option="USER_ENTERED")
+        return len(rows)
+    except Exception as e:
+        _log_sheet.warning(f"주문 일괄 기록 실패 — 누락 행만 재시도: {e}")
+
+    try:
+        job_metrics.add(sheet_calls=1)
+        recorded = {v.strip() for v in ws.col_values(COL_ORDER_ID) if v.strip()}
+    except Exception as e:
+        # 반영 여부를 확인할 수 없으면 중복 기록 대신 다음 주기에 다시 처리한다.
+        _log_sheet.error(f"주문ID 열 재조회 실패 — 행 단위 재시도 생략: {e}")
+        return 0
+
+    written = 0
+    for row in rows:
+        if row and str(row[COL_ORDER_ID - 1]).strip() in recorded:
+            written += 1
+            continue
+        try:
+            ws.append_row(row, value_input_option="USER_ENTERED")
+            written += 1
+        except Exception as e:
+            _log_sheet.error(f"주문 기록 실패: {row[0] if row else ''} | {e}")
+    return written
+
+
+async def _confirm_orders_concurrently(targets: list[tuple[str, str]]) -> list[bool]:
+    """발주확인 일괄 실행. 동시 호출 수는 _coupang_api_sem이 제한한다.
+
+    Args:
+        targets: (orderId, shipmentBoxId) 목록
+    Returns: targets 순서대로 성공 여부
+    """
+    if not targets:
+        return []
+    results = await asyncio.gather(
+        *(confirm_order(order_id, box_id) for order_id, box_id in targets),
+        return_exceptions=True,
+    )
+    return [result is True for result in results]
+
+
+async def _send_privacy_sms_concurrently(phones: list[str]) -> list[tuple[bool, str]]:
+    """개인정보 고지 LMS 일괄 발송. 발송 속도는 _SMS_SEMAPHORE/_SMS_INTERVAL이 제한한다.
+
+    Returns: phones 순서대로 (성공여부, SMS 잔여건수)
+    """
+    if not phones:
+        return []
+    results = await asyncio.gather(
+        *(send_order_privacy_sms(phone) for phone in phones),
+        return_exceptions=True,
+    )
+    return [result if isinstance(result, tuple) else (False, "") for result in results]
+
+
 # ──────────────────────────────────────────────
 # 주문 자동화 메인 흐름
 # ──────────────────────────────────────────────
@@ -1259,6 +1455,9 @@ async def process_new_orders():
     - ACCEPT 가격미달: 주문 진행 보류(상태=가격미달보류) + 알림
     - ACCEPT 매핑/금액 파싱 누락: 경고 후 진행
     - INSTRUCT(상품준비중): 시트에 없으면 추가, 있으면 상태 갱신
+
+    단계별 파이프라인으로 처리한다:
+    분류 → 발주확인 동시 실행 → SMS 동시 발송 → 시트 append_rows 1회 → 소싱탭/알림
     """
     _log_order.info(f"주문 동기화 시작... ({_now_kst_str()})")
 
@@ -1266,6 +1465,7 @@ async def process_new_orders():
     accept_orders = await get_orders_by_status("ACCEPT", days=7)
     instruct_orders = await get_orders_by_status("INSTRUCT", days=7)
     all_orders = accept_orders + instruct_orders
+    await _remember_order_shipments(all_orders)
 
     if not all_orders:
         _log_order.info("조회된 주문 없음 (결제완료 + 상품준비중)")
@@ -1298,6 +1498,8 @@ async def process_new_orders():
         )
 
     processed_ids = set(order_row_by_id.keys())
+    _sheet_order_ids.clear()
+    _sheet_order_ids.update(processed_ids)
     pending_cell_updates: dict[str, object] = {}
     min_price_by_vid = _load_sourcing_min_price_by_vid()
 
@@ -1320,9 +1522,14 @@ async def process_new_orders():
 
     sourcing_info_by_vid = _load_sourcing_info_by_vid() if sh_sourcing else {}
 
-    new_count = 0
     updated_count = 0
 
+    # 1단계: 분류 (API 호출 없이 처리 대상만 모은다)
+    hold_rows: list[list[str]] = []
+    retry_confirms: list[dict] = []
+    new_accepts: list[dict] = []
+    new_instructs: list[dict] = []
+
     # ── 결제완료(ACCEPT) 처리 ──
     for order in accept_orders:
         order_id = str(order.get("orderId", ""))
@@ -1480,15 +1687,14 @@ async def process_new_orders():
                         )
                         order_sms_by_id[order_id] = "미완료"
                         updated_count += 1
-                    await asyncio.sleep(0.2)
                     continue
 
-            await append_order_to_sheet(
-                ws, order, sms_sent=False, status=ORDER_STATUS_PRICE_HOLD
+            hold_rows.append(
+                _build_order_sheet_row(
+                    order, sms_sent=False, status=ORDER_STATUS_PRICE_HOLD
+                )
             )
             processed_ids.add(order_id)
-            new_count += 1
-            await asyncio.sleep(0.2)
             continue
 
         if order_id in processed_ids:
@@ -1507,106 +1713,39 @@ async def process_new_orders():
                 _log_order.info(
                     f"[결제완료-재시도] {order_id} | {product_name} x{qty} | {_mask_name(buyer_name)}"
                 )
-                confirmed = await confirm_order(order_id, shipment_box_id)
-                if confirmed:
-                    _queue_sheet_cell_update(
-                        pending_cell_updates, row_idx, COL_ORDER_STATUS, "상품준비중"
-                    )
-                    order_status_by_id[order_id] = "상품준비중"
-                    updated_count += 1
-                else:
-                    _queue_sheet_cell_update(
-                        pending_cell_updates, row_idx, COL_ORDER_STATUS, "결제완료"
-                    )
-                    order_status_by_id[order_id] = "결제완료"
-                    updated_count += 1
-                    _log_order.warning(
-                        f"발주확인 실패 — 시트 상태를 결제완료로 유지: {order_id}"
-                    )
+                retry_confirms.append(
+                    {
+                        "order_id": order_id,
+                        "shipment_box_id": shipment_box_id,
+                        "row_idx": row_idx,
+                    }
+                )
 
-            if current_sms not in ("발송완료", "미완료"):
+            if needs_sms_mark:
                 _queue_sheet_cell_update(
                     pending_cell_updates, row_idx, COL_ORDER_SMS, "미완료"
                 )
                 order_sms_by_id[order_id] = "미완료"
                 updated_count += 1
-
-            await asyncio.sleep(0.3)
             continue
 
         _log_order.info(
             f"[결제완료] {order_id} | {product_name} x{qty} | {_mask_name(buyer_name)}"
         )
-
-        # 1. 발주확인 처리 (→ 상품준비중으로 자동 전환)
-        confirmed = await confirm_order(order_id, shipment_box_id)
-        row_status = "상품준비중" if confirmed else "결제완료"
-        if not confirmed:
-            _log_order.warning(
-                f"발주확인 실패 — 시트 상태를 결제완료로 유지: {order_id}"
-            )
-
-        # 2. SMS 발송
-        sms_sent = False
-        sms_remaining = ""
-        if phone and confirmed:
-            sms_sent, sms_remaining = await send_order_privacy_sms(phone)
-        elif not phone:
-            _log_order.warning("수신번호 없음 — SMS 건너뜀")
-
-        # 3. 시트에 기록 (발주확인 성공 시 상품준비중, 실패 시 결제완료)
-        await append_order_to_sheet(ws, order, sms_sent, status=row_status)
-        processed_ids.add(order_id)
-        new_count += 1
-
-        # 4. 소싱탭 자동기록
-        if sh_sourcing and sourcing_info_by_vid is not None:
-            try:
-                await _record_order_to_sourcing_tab(
-                    sh_sourcing,
-                    sourcing_info_by_vid,
-                    order_id=order_id,
-                    vendor_item_id=vendor_item_id,
-                    buyer_name=buyer_name,
-                    product_name=product_name,
-                    qty=qty,
-                    paid_unit=paid_unit,
-                )
-            except Exception as e:
-                _log_order.warning(
-                    f"소싱탭 기록 오류 (무시): orderId={order_id} error={e}"
-                )
-
-        embeds = [
+        new_accepts.append(
             {
-                "title": "🛍️ 신규 주문 접수",
-                "color": 3447003,
-                "fields": [
-                    {"name": "주문 ID", "value": order_id, "inline": True},
-                    {"name": "상품", "value": product_name, "inline": True},
-                    {"name": "수량", "value": f"{qty}개", "inline": True},
-                    {"name": "구매자", "value": _mask_name(buyer_name), "inline": True},
-                    {
-                        "name": "발주확인",
-                        "value": "✅" if confirmed else "❌",
-                        "inline": True,
-                    },
-                    {
-                        "name": "SMS",
-                        "value": "✅" if sms_sent else "❌",
-                        "inline": True,
-                    },
-                    {
-                        "name": "SMS 잔여",
-                        "value": f"{sms_remaining}건" if sms_remaining else "-",
-                        "inline": True,
-                    },
-                    {"name": "처리시각", "value": _now_kst_str(), "inline": False},
-                ],
+                "order": order,
+                "order_id": order_id,
+                "shipment_box_id": shipment_box_id,
+                "phone": phone,
+                "buyer_name": buyer_name,
+                "product_name": product_name,
+                "qty": qty,
+                "vendor_item_id": vendor_item_id,
+                "paid_unit": paid_unit,
             }
-        ]
-        await post_webhook(COUPANG_ORDER_WEBHOOK, "새 주문 접수", embeds=embeds)
-        await asyncio.sleep(0.5)
+        )
+        processed_ids.add(order_id)
 
     # ── 상품준비중(INSTRUCT) 처리 ──
     # 시트에 없는 건만 추가 (발주확인은 이미 완료 상태)
@@ -1641,52 +1780,143 @@ async def process_new_orders():
                     )
                     order_sms_by_id[order_id] = "미완료"
                     updated_count += 1
-
-            await asyncio.sleep(0.2)
             continue
 
         _log_order.info(
             f"[상품준비중] {order_id} | {_order_item_name(item)} — 시트 추가"
         )
-        sms_sent = False
-        if phone:
-            sms_sent, _ = await send_order_privacy_sms(phone)
-        else:
-            _log_order.warning(f"수신번호 없음 — SMS 건너뜀 ({order_id})")
-
-        await append_order_to_sheet(ws, order, sms_sent=sms_sent, status="상품준비중")
+        guard_inst = _check_order_price_guard(order, min_price_by_vid)
+        new_instructs.append(
+            {
+                "order": order,
+                "order_id": order_id,
+                "phone": phone,
+                "buyer_name": receiver.get("name", "고객"),
+                "product_name": guard_inst["product_name"],
+                "qty": guard_inst["qty"],
+                "vendor_item_id": guard_inst["vendor_item_id"] or "N/A",
+                "paid_unit": guard_inst["paid_unit"],
+            }
+        )
         processed_ids.add(order_id)
-        new_count += 1
-
-        # 소싱탭 자동기록 (INSTRUCT 신규)
-        if sh_sourcing and sourcing_info_by_vid is not None:
-            guard_inst = _check_order_price_guard(order, min_price_by_vid)
-            vendor_item_id_inst = guard_inst["vendor_item_id"] or "N/A"
-            paid_unit_inst = guard_inst["paid_unit"]
-            qty_inst = guard_inst["qty"]
-            product_name_inst = guard_inst["product_name"]
-            buyer_name_inst = receiver.get("name", "고객")
+
+    # 2단계: 발주확인 동시 실행 (→ 상품준비중으로 자동 전환)
+    confirm_targets = retry_confirms + new_accepts
+    confirm_results = await _confirm_orders_concurrently(
+        [(t["order_id"], t["shipment_box_id"]) for t in confirm_targets]
+    )
+    for target, confirmed in zip(confirm_targets, confirm_results):
+        target["confirmed"] = confirmed
+        if not confirmed:
+            _log_order.warning(
+                f"발주확인 실패 — 시트 상태를 결제완료로 유지: {target['order_id']}"
+            )
+
+    for target in retry_confirms:
+        row_status = "상품준비중" if target["confirmed"] else "결제완료"
+        _queue_sheet_cell_update(
+            pending_cell_updates, target["row_idx"], COL_ORDER_STATUS, row_status
+        )
+        order_status_by_id[target["order_id"]] = row_status
+        updated_count += 1
+
+    # 3단계: SMS 발송 (발주확인 성공 건 + 신규 상품준비중 건)
+    sms_targets: list[dict] = []
+    for target in new_accepts + new_instructs:
+        target["sms_sent"] = False
+        target["sms_remaining"] = ""
+        if not target["phone"]:
+            _log_order.warning(f"수신번호 없음 — SMS 건너뜀 ({target['order_id']})")
+        elif target.get("confirmed", True):
+            sms_targets.append(target)
+
+    sms_results = await _send_privacy_sms_concurrently(
+        [t["phone"] for t in sms_targets]
+    )
+    for target, (sms_sent, sms_remaining) in zip(sms_targets, sms_results):
+        target["sms_sent"] = sms_sent
+        target["sms_remaining"] = sms_remaining
+
+    # 4단계: 시트 기록 (발주확인 성공 시 상품준비중, 실패 시 결제완료)
+    new_rows = list(hold_rows)
+    for target in new_accepts:
+        row_status = "상품준비중" if target["confirmed"] else "결제완료"
+        new_rows.append(
+            _build_order_sheet_row(target["order"], target["sms_sent"], row_status)
+        )
+    for target in new_instructs:
+        new_rows.append(
+            _build_order_sheet_row(target["order"], target["sms_sent"], "상품준비중")
+        )
+    new_count = _append_order_rows(ws, new_rows)
+    if new_count == len(new_rows):
+        _sheet_order_ids.update(str(row[COL_ORDER_ID - 1]).strip() for row in new_rows)
+
+    # 5단계: 소싱탭 자동기록 (탭별로 모아 탭당 1회 기록)
+    if sh_sourcing and sourcing_info_by_vid is not None:
+        sourcing_pending_rows: dict[str, dict] = {}
+        for target in new_accepts + new_instructs:
             try:
                 await _record_order_to_sourcing_tab(
                     sh_sourcing,
                     sourcing_info_by_vid,
-                    order_id=order_id,
-                    vendor_item_id=vendor_item_id_inst,
-                    buyer_name=buyer_name_inst,
-                    product_name=product_name_inst,
-                    qty=qty_inst,
-                    paid_unit=paid_unit_inst,
+                    order_id=target["order_id"],
+                    vendor_item_id=target["vendor_item_id"],
+                    buyer_name=target["buyer_name"],
+                    product_name=target["product_name"],
+                    qty=target["qty"],
+                    paid_unit=target["paid_unit"],
+                    pending_rows=sourcing_pending_rows,
                 )
             except Exception as e:
                 _log_order.warning(
-                    f"소싱탭 기록 오류 (무시): orderId={order_id} error={e}"
+                    f"소싱탭 기록 오류 (무시): orderId={target['order_id']} error={e}"
                 )
-
-        await asyncio.sleep(0.3)
+        _flush_sourcing_tab_rows(sourcing_pending_rows)
 
     _flush_sheet_cell_updates(ws, pending_cell_updates)
 
+    # 6단계: 신규 주문 알림
+    for target in new_accepts:
+        embeds = [
+            {
+                "title": "🛍️ 신규 주문 접수",
+                "color": 3447003,
+                "fields": [
+                    {"name": "주문 ID", "value": target["order_id"], "inline": True},
+                    {"name": "상품", "value": target["product_name"], "inline": True},
+                    {"name": "수량", "value": f"{target['qty']}개", "inline": True},
+                    {
+                        "name": "구매자",
+                        "value": _mask_name(target["buyer_name"]),
+                        "inline": True,
+                    },
+                    {
+                        "name": "발주확인",
+                        "value": "✅" if target["confirmed"] else "❌",
+                        "inline": True,
+                    },
+                    {
+                        "name": "SMS",
+                        "value": "✅" if target["sms_sent"] else "❌",
+                        "inline": True,
+                    },
+                    {
+                        "name": "SMS 잔여",
+                        "value": f"{target['sms_remaining']}건"
+                        if target["sms_remaining"]
+                        else "-",
+                        "inline": True,
+                    },
+                    {"name": "처리시각", "value": _now_kst_str(), "inline": False},
+                ],
+            }
+        ]
+        await post_webhook(COUPANG_ORDER_WEBHOOK, "새 주문 접수", embeds=embeds)
+        await asyncio.sleep(0.5)  # Discord 웹훅 rate limit 여유
+
     _log_order.info(f"완료 — 신규 추가 {new_count}건, 상태갱신 {updated_count}건")
+    job_metrics.add(items_changed=new_count + updated_count)
     if new_count == 0 and updated_count == 0:
         _log_order.info("모든 주문이 이미 시트에 동기화되어 있음")
 
@@ -1934,15 +2164,19 @@ _price_state: dict[
 _sync_baseline_initialized = False
 _last_product_sheet_refresh_at: datetime | None = None
 
-# 소싱목록 이전 가격 상태 (변경 감지용)
-_sourcing_price_state: dict[int, int] = {}  # {row_num: min_price}
-_SOURCING_PRICE_STATE_FILE = "sourcing_price_state.json"
+# 소싱목록 이전 상태 (변경 감지용) — 행 번호가 아닌 _sourcing_row_key() 기준.
+# ops.db(sourcing_price_state / sourcing_row_state)에 변경분만 저장한다.
+_sourcing_price_state: dict[str, int] = {}  # {row_key: min_price}
+_sourcing_row_hashes: dict[str, str] = {}  # {row_key: 마지막 동기화 성공 시 입력 해시}
+_sourcing_state_loaded = False
+# 구버전 행 번호 키 JSON 상태 — 최초 1회 ops.db로 가져온 뒤 .bak으로 이름을 바꾼다.
+_LEGACY_SOURCING_PRICE_STATE_FILE = "sourcing_price_state.json"
 
 
-def _load_sourcing_price_state() -> dict[int, int]:
-    """JSON 파일에서 소싱 가격 상태를 읽어 반환. 파일 없거나 손상 시 {} 반환."""
+def _load_legacy_sourcing_price_state() -> dict[int, int]:
+    """구버전 JSON 상태 {row_num: min_price}. 파일 없거나 손상 시 {} 반환."""
     try:
-        with open(_SOURCING_PRICE_STATE_FILE, encoding="utf-8") as f:
+        with open(_LEGACY_SOURCING_PRICE_STATE_FILE, encoding="utf-8") as f:
             raw = json.load(f)
         return {int(k): int(v) for k, v in raw.items()}
     except (FileNotFoundError, json.JSONDecodeError, ValueError, TypeError):
@@ -1951,15 +2185,127 @@ def _load_sourcing_price_state() -> dict[int, int]:
         return {}
 
 
-def _save_sourcing_price_state(state: dict[int, int]) -> None:
-    """소싱 가격 상태를 JSON 파일에 원자적으로 저장 (tmp + os.replace)."""
-    tmp_path = _SOURCING_PRICE_STATE_FILE + ".tmp"
+def _retire_legacy_sourcing_price_state() -> None:
+    """가져오기가 끝난 구버전 JSON 상태 파일을 .bak으로 이름 변경."""
+    try:
+        os.replace(
+            _LEGACY_SOURCING_PRICE_STATE_FILE,
+            _LEGACY_SOURCING_PRICE_STATE_FILE + ".bak",
+        )
+        _log_sourcing.info(
+            f"구버전 소싱 가격 상태 가져오기 완료 → "
+            f"{_LEGACY_SOURCING_PRICE_STATE_FILE}.bak"
+        )
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        _log_sourcing.warning(f"구버전 소싱 가격 상태 파일 정리 실패: {e}")
+
+
+def _sourcing_row_key(
+    name_cell: str, vid_cell: str, price_vid_cell: str, seen: set[str]
+) -> str:
+    """소싱목록 행의 안정적인 식별키 (행 번호가 밀려도 유지).
+
+    가격동기화 vendorItemId(P열, 없으면 O열) 기준이며, vendorItemId가 없으면
+    상품명을 쓴다. 같은 키가 한 번 더 나오면 '#2', '#3'... 을 붙인다.
+    """
+    vids = _parse_vendor_item_ids(price_vid_cell) or _parse_vendor_item_ids(vid_cell)
+    if vids:
+        base = "vid:" + ",".join(sorted(vids))
+    else:
+        base = "name:" + (_normalize_product_name(name_cell) or name_cell)
+    key = base
+    n = 1
+    while key in seen:
+        n += 1
+        key = f"{base}#{n}"
+    seen.add(key)
+    return key
+
+
+def _sourcing_row_hash(*cells: str) -> str:
+    """소싱목록 B/H/K/O/P열 값의 해시 (입력 변경 감지용)."""
+    return hashlib.sha1("\x1f".join(cells).encode("utf-8")).hexdigest()
+
+
+async def _load_sourcing_sync_state() -> bool:
+    """ops.db의 행 해시·최소판매금액 상태를 메모리로 복원 (프로세스당 1회).
+
+    DB를 쓸 수 없으면 False — 메모리 상태만으로 진행하고 다음 실행에서 다시 시도한다.
+    """
+    global _sourcing_state_loaded
+    if _sourcing_state_loaded:
+        return True
+    try:
+        async with db.get_read_conn() as conn:
+            async with conn.execute(
+                "SELECT row_key, input_hash FROM sourcing_row_state"
+            ) as cur:
+                hashes = {row[0]: row[1] for row in await cur.fetchall()}
+            async with conn.execute(
+                "SELECT row_key, min_price FROM sourcing_price_state"
+            ) as cur:
+                prices = {row[0]: int(row[1]) for row in await cur.fetchall()}
+    except Exception as e:
+        _log_sourcing.warning(f"소싱 상태 로드 실패 — 메모리 상태로 진행: {e}")
+        return False
+    _sourcing_row_hashes.clear()
+    _sourcing_row_hashes.update(hashes)
+    _sourcing_price_state.clear()
+    _sourcing_price_state.update(prices)
+    _sourcing_state_loaded = True
+    return True
+
+
+async def _save_sourcing_sync_state(
+    synced: dict[str, str], prices: dict[str, int], removed: set[str]
+) -> bool:
+    """이번 실행에서 바뀐 행 해시·최소판매금액과 사라진 행 키만 한 트랜잭션으로 반영."""
+    if not synced and not prices and not removed:
+        return True
+    now = datetime.now(KST).isoformat()
+    try:
+        conn = db.get_conn()
+        async with db._write_lock:
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO sourcing_row_state"
+                    "(row_key, input_hash, synced_at) VALUES (?,?,?)",
+                    [(key, row_hash, now) for key, row_hash in synced.items()],
+                )
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO sourcing_price_state"
+                    "(row_key, min_price, updated_at) VALUES (?,?,?)",
+                    [(key, price, now) for key, price in prices.items()],
+                )
+                await conn.executemany(
+                    "DELETE FROM sourcing_row_state WHERE row_key = ?",
+                    [(key,) for key in removed],
+                )
+                await conn.executemany(
+                    "DELETE FROM sourcing_price_state WHERE row_key = ?",
+                    [(key,) for key in removed],
+                )
+                await conn.commit()
+            except Exception:
+                await conn.execute("ROLLBACK")
+                raise
+    except Exception as e:
+        _log_sourcing.warning(f"소싱 상태 저장 실패: {e}")
+        return False
+    return True
+
+
+def _load_product_name_index(sh) -> "_ProductNameIndex | None":
+    """쿠팡상품관리 시트를 읽어 상품명 매칭 인덱스를 반환 (시트 버전별 캐시)."""
     try:
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            json.dump({str(k): v for k, v in state.items()}, f, ensure_ascii=False)
-        os.replace(tmp_path, _SOURCING_PRICE_STATE_FILE)
+        product_rows = sh.worksheet(COUPANG_PRODUCT_SHEET).get_all_values()
+        return _get_product_name_index(product_rows)
     except Exception as e:
-        _log_sourcing.warning(f"소싱 가격 상태 저장 실패: {e}")
+        _log_sourcing.error(f"쿠팡상품관리 매핑 인덱스 생성 실패: {e}")
+        return None
 
 
 _price_guard_warned_missing: set[str] = set()
@@ -1979,115 +2325,7 @@ SOURCING_MATCH_THRESHOLD = _env_int("SOURCING_MATCH_THRESHOLD", 82)
 SOURCING_MATCH_MIN_GAP = _env_int("SOURCING_MATCH_MIN_GAP", 6)
 SOURCING_SIBLING_MATCH_MIN = _env_int("SOURCING_SIBLING_MATCH_MIN", 90)
 SOURCING_SIBLING_SCORE_WINDOW = _env_int("SOURCING_SIBLING_SCORE_WINDOW", 2)
-
-
-def _normalize_product_name(name: str) -> str:
-    value = (name or "").strip().lower()
-    value = _canonicalize_measure_tokens(value)
-    value = _canonicalize_count_tokens(value)
-    value = re.sub(r"[^0-9a-z가-힣]+", " ", value)
-    return re.sub(r"\s+", " ", value).strip()
-
-
-def _parse_product_number(raw: str) -> float | None:
-    value = (raw or "").strip()
-    if not value:
-        return None
-
-    if "," in value and "." not in value:
-        head, tail = value.split(",", 1)
-        if len(tail) == 3:
-            value = value.replace(",", "")
-        else:
-            value = value.replace(",", ".")
-    else:
-        value = value.replace(",", "")
-
-    try:
-        return float(value)
-    except Exception:
-        return None
-
-
-def _compact_number_str(value: float) -> str:
-    if abs(value - round(value)) < 1e-9:
-        return str(int(round(value)))
-    return f"{value:.3f}".rstrip("0").rstrip(".")
-
-
-def _canonicalize_measure_tokens(value: str) -> str:
-    def repl(match: re.Match[str]) -> str:
-        number = _parse_product_number(match.group("num"))
-        unit = (match.group("unit") or "").lower()
-        if number is None:
-            return match.group(0)
-        if unit == "kg":
-            return f"{int(round(number * 1000))}g"
-        if unit in {"g", "gr"}:
-            return f"{_compact_number_str(number)}g"
-        if unit == "l":
-            return f"{int(round(number * 1000))}ml"
-        if unit == "ml":
-            return f"{_compact_number_str(number)}ml"
-        return match.group(0)
-
-    return re.sub(
-        r"(?P<num>\d+(?:[.,]\d+)?)\s*(?P<unit>kg|g|gr|ml|l)\b",
-        repl,
-        value,
-        flags=re.IGNORECASE,
-    )
-
-
-def _canonicalize_count_tokens(value: str) -> str:
-    normalized = value
-    normalized = re.sub(r"\b단일상품\b", " 1개 ", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"\b단품\b", " 1개 ", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(
-        r"(?<![0-9a-z가-힣])(?:x|×|\*)\s*(\d+)\b",
-        lambda m: f" {m.group(1)}개 ",
-        normalized,
-        flags=re.IGNORECASE,
-    )
-    normalized = re.sub(
-        r"\b(\d+)\s*(?:ea|개입|입|개|박스|box|팩|pack|세트)\b",
-        lambda m: f" {m.group(1)}개 ",
-        normalized,
-        flags=re.IGNORECASE,
-    )
-    return normalized
-
-
-def _product_name_variants(name: str) -> list[str]:
-    raw = (name or "").strip()
-    if not raw:
-        return []
-    variants = {raw}
-    if " / " in raw:
-        variants.add(raw.split(" / ", 1)[0].strip())
-    if "/" in raw:
-        variants.add(raw.split("/", 1)[0].strip())
-
-    expanded: list[str] = []
-    seen: set[str] = set()
-    for variant in variants:
-        for candidate in (
-            variant,
-            re.sub(r"\([^)]*\)", " ", variant),
-            re.sub(r"\[[^\]]*\]", " ", variant),
-            re.sub(r"[\(\[][^)\]]*[\)\]]", " ", variant),
-            re.sub(
-                r"\b(?:단일상품|단품|1\s*(?:개|박스|box|팩|pack|세트|입|개입|ea))\b",
-                " ",
-                variant,
-                flags=re.IGNORECASE,
-            ),
-        ):
-            cleaned = re.sub(r"\s+", " ", candidate).strip(" /").strip()
-            if cleaned and cleaned not in seen:
-                seen.add(cleaned)
-                expanded.append(cleaned)
-    return expanded
+SOURCING_MATCH_WORKERS = _env_int("SOURCING_MATCH_WORKERS", -1)  # -1: 전체 코어
 
 
 def _fuzzy_name_score(a: str, b: str) -> int:
@@ -2104,39 +2342,108 @@ def _fuzzy_name_score(a: str, b: str) -> int:
     return int(SequenceMatcher(None, a, b).ratio() * 100)
 
 
-def _name_token_set(name: str) -> set[str]:
-    normalized = _normalize_product_name(name)
-    if not normalized:
-        return set()
-    return {t for t in normalized.split(" ") if len(t) >= 2}
+def _fuzzy_score_matrix(queries: list[str], choices: list[str]) -> list[list[int]]:
+    """queries × choices 의 _fuzzy_name_score 행렬.
 
+    rapidfuzz + numpy가 있으면 scorer별 process.cdist 1회씩(멀티스레드)으로
+    계산하고, 없으면 쌍별 _fuzzy_name_score 로 계산한다.
+    """
+    if not queries or not choices:
+        return [[] for _ in queries]
+    if _rf_process is not None and _np is not None:
+        try:
+            matrix = None
+            for scorer in (
+                _rf_fuzz.ratio,
+                _rf_fuzz.partial_ratio,
+                _rf_fuzz.token_set_ratio,
+            ):
+                # float64: float32 반올림이 int() 절사 결과를 1점 바꿀 수 있음
+                scores = _rf_process.cdist(
+                    queries,
+                    choices,
+                    scorer=scorer,
+                    dtype=_np.float64,
+                    workers=SOURCING_MATCH_WORKERS,
+                )
+                matrix = scores if matrix is None else _np.maximum(matrix, scores)
+            # 빈 문자열은 _fuzzy_name_score와 같이 0점
+            matrix[[not q for q in queries], :] = 0
+            matrix[:, [not c for c in choices]] = 0
+            return matrix.astype(_np.int32).tolist()
+        except Exception as e:
+            _log_sourcing.warning(f"cdist 일괄 점수 계산 실패 — 개별 계산: {e}")
+    return [[_fuzzy_name_score(q, c) for c in choices] for q in queries]
 
-def _name_number_set(name: str) -> set[str]:
-    normalized = _normalize_product_name(name)
-    if not normalized:
-        return set()
-    return set(re.findall(r"\d+", normalized))
 
+def _top2_scores(scores: list[int], choices: list[str]) -> tuple[int, str, int]:
+    """(1등 점수, 1등 키, 2등 점수) — 전체 정렬 없이 한 번 순회."""
+    best_score, best_key, second_score = -1, "", 0
+    for score, key in zip(scores, choices):
+        if score > best_score:
+            if best_score >= 0:
+                second_score = best_score
+            best_score, best_key = score, key
+        elif score > second_score:
+            second_score = score
+    return max(best_score, 0), best_key, second_score
 
-def _name_count_set(name: str) -> set[str]:
-    normalized = _normalize_product_name(name)
-    if not normalized:
-        return set()
-    return set(re.findall(r"(\d+)개", normalized))
 
+@dataclass(slots=True)
+class _ProductNameIndex:
+    """쿠팡상품관리 상품명 매칭 인덱스 (시트 내용이 바뀔 때만 다시 만든다).
 
-def _build_product_name_vid_index(
-    product_rows: list[list[str]],
-) -> tuple[dict[str, set[str]], dict[str, str]]:
-    name_to_vids: dict[str, set[str]] = {}
-    name_display: dict[str, str] = {}
+    키는 정규화 상품명이며, 토큰/숫자/개수 집합과 토큰 → 키 역색인을 미리 계산해
+    자동매칭·가격동기화가 행마다 정규식을 다시 돌리지 않게 한다.
+    """
 
-    for row in product_rows[PRODUCT_START_ROW - 1 :]:
-        if len(row) < COL_PRODUCT_NAME:
-            continue
+    version: str
+    name_to_vids: dict[str, set[str]]
+    name_display: dict[str, str]
+    vid_to_product_name: dict[str, str]
+    tokens: dict[str, frozenset[str]]
+    numbers: dict[str, frozenset[str]]
+    counts: dict[str, frozenset[str]]
+    token_to_keys: dict[str, set[str]]
 
-        vendor_item_cell = (
-            (row[COL_VENDOR_ITEM_ID - 1] or "").strip()
+    def keys_sharing_tokens(self, tokens: set[str]) -> set[str]:
+        """토큰을 하나 이상 공유하는 키 (공백 기준 단어 포함)."""
+        keys: set[str] = set()
+        for token in tokens:
+            keys.update(self.token_to_keys.get(token, ()))
+        return keys
+
+
+_product_name_index: _ProductNameIndex | None = None
+
+
+def _product_sheet_version(product_rows: list[list[str]]) -> str:
+    """쿠팡상품관리 상품명/vendorItemId 열의 해시 (인덱스 캐시 키)."""
+    digest = hashlib.sha1()
+    for row in product_rows[PRODUCT_START_ROW - 1 :]:
+        name = row[COL_PRODUCT_NAME - 1] if len(row) >= COL_PRODUCT_NAME else ""
+        vid = row[COL_VENDOR_ITEM_ID - 1] if len(row) >= COL_VENDOR_ITEM_ID else ""
+        digest.update(f"{name}\x1f{vid}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _get_product_name_index(product_rows: list[list[str]]) -> _ProductNameIndex:
+    """상품 시트 버전이 같으면 캐시된 인덱스를, 바뀌었으면 새로 만든 인덱스를 반환."""
+    global _product_name_index
+    version = _product_sheet_version(product_rows)
+    if _product_name_index is not None and _product_name_index.version == version:
+        return _product_name_index
+
+    name_to_vids: dict[str, set[str]] = {}
+    name_display: dict[str, str] = {}
+    vid_to_product_name: dict[str, str] = {}
+
+    for row in product_rows[PRODUCT_START_ROW - 1 :]:
+        if len(row) < COL_PRODUCT_NAME:
+            continue
+
+        vendor_item_cell = (
+            (row[COL_VENDOR_ITEM_ID - 1] or "").strip()
             if len(row) >= COL_VENDOR_ITEM_ID
             else ""
         )
@@ -2157,14 +2464,38 @@ def _build_product_name_vid_index(
                 name_display[key] = variant
             for vendor_item_id in parsed_vids:
                 name_to_vids[key].add(vendor_item_id)
-
-    return name_to_vids, name_display
+                vid_to_product_name[vendor_item_id] = product_name
+
+    tokens: dict[str, frozenset[str]] = {}
+    numbers: dict[str, frozenset[str]] = {}
+    counts: dict[str, frozenset[str]] = {}
+    token_to_keys: dict[str, set[str]] = {}
+    for key in name_to_vids:
+        tokens[key] = _name_token_set(key)
+        numbers[key] = _name_number_set(key)
+        counts[key] = _name_count_set(key)
+        for token in tokens[key].union(key.split(" ")):
+            token_to_keys.setdefault(token, set()).add(key)
+
+    _product_name_index = _ProductNameIndex(
+        version=version,
+        name_to_vids=name_to_vids,
+        name_display=name_display,
+        vid_to_product_name=vid_to_product_name,
+        tokens=tokens,
+        numbers=numbers,
+        counts=counts,
+        token_to_keys=token_to_keys,
+    )
+    _log_sourcing.info(f"상품명 매칭 인덱스 생성 → 키 {len(name_to_vids)}개")
+    return _product_name_index
 
 
 def _match_sourcing_vendor_item_ids(
     sourcing_name: str,
-    name_to_vids: dict[str, set[str]],
+    index: _ProductNameIndex,
 ) -> tuple[list[str], str, int, str]:
+    name_to_vids = index.name_to_vids
     if not sourcing_name or not name_to_vids:
         return [], "", 0, ""
 
@@ -2188,16 +2519,19 @@ def _match_sourcing_vendor_item_ids(
         matched_key = max(exact_keys, key=len)
         match_mode = "exact"
     else:
-        best_candidate: tuple[int, int, int, str] | None = None
+        # 토큰/숫자를 하나라도 공유하는 키만 후보로 삼고(없으면 전체), 한 번에 점수를 낸다.
+        source_words: set[str] = set()
         for source_key in source_keys:
-            scored = [
-                (_fuzzy_name_score(source_key, ckey), ckey) for ckey in candidate_keys
-            ]
-            scored.sort(key=lambda x: x[0], reverse=True)
-            if not scored:
+            source_words.update(source_key.split(" "))
+        blocked_keys = index.keys_sharing_tokens(source_words)
+        candidate_keys = sorted(blocked_keys) if blocked_keys else candidate_keys
+
+        best_candidate: tuple[int, int, int, str] | None = None
+        score_matrix = _fuzzy_score_matrix(source_keys, candidate_keys)
+        for source_key, scores in zip(source_keys, score_matrix):
+            if not scores:
                 continue
-            best_score, best_key = scored[0]
-            second_score = scored[1][0] if len(scored) > 1 else 0
+            best_score, best_key, second_score = _top2_scores(scores, candidate_keys)
             candidate = (
                 best_score,
                 best_score - second_score,
@@ -2224,17 +2558,19 @@ def _match_sourcing_vendor_item_ids(
 
     source_tokens = _name_token_set(sourcing_name)
     source_counts = _name_count_set(sourcing_name)
-    matched_tokens = _name_token_set(matched_key)
-    matched_counts = _name_count_set(matched_key)
+    matched_tokens = index.tokens[matched_key]
+    matched_counts = index.counts[matched_key]
     score_floor = max(
         SOURCING_MATCH_THRESHOLD, matched_score - SOURCING_SIBLING_SCORE_WINDOW
     )
 
-    for candidate_key, candidate_vids in name_to_vids.items():
+    # 형제 상품은 최적 키와 토큰을 3개 이상 공유해야 하므로 역색인 후보만 본다.
+    sibling_keys: list[str] = []
+    for candidate_key in sorted(index.keys_sharing_tokens(matched_tokens)):
         if candidate_key == matched_key:
             continue
 
-        candidate_counts = _name_count_set(candidate_key)
+        candidate_counts = index.counts[candidate_key]
         if source_counts:
             if candidate_counts != source_counts:
                 continue
@@ -2245,14 +2581,17 @@ def _match_sourcing_vendor_item_ids(
             elif any(int(value) > 1 for value in candidate_counts):
                 continue
 
-        candidate_tokens = _name_token_set(candidate_key)
-        if not candidate_tokens:
+        if not index.tokens[candidate_key]:
             continue
-
-        source_score = max(
-            _fuzzy_name_score(source_key, candidate_key) for source_key in source_keys
-        )
-        sibling_score = _fuzzy_name_score(matched_key, candidate_key)
+        sibling_keys.append(candidate_key)
+
+    # 소싱명 변형들 + 최적 키 × 형제 후보를 한 번에 채점한다.
+    sibling_matrix = _fuzzy_score_matrix(source_keys + [matched_key], sibling_keys)
+    for col, candidate_key in enumerate(sibling_keys):
+        candidate_vids = name_to_vids[candidate_key]
+        candidate_tokens = index.tokens[candidate_key]
+        source_score = max(row[col] for row in sibling_matrix[:-1])
+        sibling_score = sibling_matrix[-1][col]
         overlap_with_best = len(matched_tokens.intersection(candidate_tokens))
         overlap_with_source = len(source_tokens.intersection(candidate_tokens))
         smaller_token_count = max(1, min(len(matched_tokens), len(candidate_tokens)))
@@ -2275,6 +2614,66 @@ def _match_sourcing_vendor_item_ids(
     )
 
 
+def _match_cache_version(index: _ProductNameIndex) -> str:
+    """매칭 캐시 버전: 상품 인덱스 버전 + 매칭 임계값 (어느 쪽이 바뀌어도 재채점)."""
+    return (
+        f"{index.version}:{SOURCING_MATCH_THRESHOLD}:{SOURCING_MATCH_MIN_GAP}:"
+        f"{SOURCING_SIBLING_MATCH_MIN}:{SOURCING_SIBLING_SCORE_WINDOW}"
+    )
+
+
+async def _load_match_cache(
+    version: str,
+) -> dict[str, tuple[list[str], str, int, str, str]]:
+    """현재 버전의 소싱명별 매칭 결과. DB를 쓸 수 없으면 {} (전체 재채점)."""
+    try:
+        async with db.get_read_conn() as conn:
+            async with conn.execute(
+                "SELECT source_name, vids, matched_key, score, match_mode, price_vid "
+                "FROM sourcing_match_cache WHERE index_version = ?",
+                (version,),
+            ) as cur:
+                rows = await cur.fetchall()
+    except Exception as e:
+        _log_sourcing.warning(f"매칭 캐시 로드 실패 — 전체 재채점: {e}")
+        return {}
+    return {
+        name: (vids.split(",") if vids else [], key, score, mode, price_vid)
+        for name, vids, key, score, mode, price_vid in rows
+    }
+
+
+async def _save_match_cache(
+    version: str, entries: dict[str, tuple[list[str], str, int, str, str]]
+) -> None:
+    """새로 채점한 결과를 저장하고 이전 버전 결과는 정리한다."""
+    now = datetime.now(KST).isoformat()
+    try:
+        conn = db.get_conn()
+        async with db._write_lock:
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                await conn.execute(
+                    "DELETE FROM sourcing_match_cache WHERE index_version != ?",
+                    (version,),
+                )
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO sourcing_match_cache"
+                    "(source_name, index_version, vids, matched_key, score,"
+                    " match_mode, price_vid, updated_at) VALUES (?,?,?,?,?,?,?,?)",
+                    [
+                        (name, version, ",".join(vids), key, score, mode, pvid, now)
+                        for name, (vids, key, score, mode, pvid) in entries.items()
+                    ],
+                )
+                await conn.commit()
+            except Exception:
+                await conn.execute("ROLLBACK")
+                raise
+    except Exception as e:
+        _log_sourcing.warning(f"매칭 캐시 저장 실패: {e}")
+
+
 def _pick_representative_vendor_item_id(
     matched_key: str,
     matched_vids: list[str],
@@ -2518,11 +2917,14 @@ async def refresh_product_sheet_from_api(force: bool = False) -> bool:
     return True
 
 
-async def update_sale_price(vendor_item_id: str, new_price: int) -> bool:
+# 판매가 변경 후 읽기 검증 간격: 최초 정착 대기 1회 + 불일치 항목 재확인
+PRICE_VERIFY_DELAYS = (1.5, 3.0)
+
+
+async def _put_sale_price(vendor_item_id: str, new_price: int) -> bool:
     """
-    판매가 변경 API 호출 + 읽기 검증 (read-back verification)
+    판매가 변경 API 호출 (검증 없음)
     PUT /vendor-items/{vendorItemId}/prices/{price}
-    API가 SUCCESS를 반환해도 실제 가격 변경을 GET으로 확인한 후 True 반환.
     """
     if new_price % 10 != 0:
         _log_sync.error(
@@ -2534,7 +2936,11 @@ async def update_sale_price(vendor_item_id: str, new_price: int) -> bool:
         f"{COUPANG_SELLER_MARKETPLACE}/vendor-items/{vendor_item_id}/prices/{new_price}"
     )
     try:
-        result = await _coupang_put(path, params={"forceSalePriceUpdate": "true"})
+        try:
+            result = await _coupang_put(path, params={"forceSalePriceUpdate": "true"})
+        finally:
+            # 타임아웃/예외여도 서버에 반영됐을 수 있으므로 캐시는 항상 버린다.
+            _invalidate_inventory_cache(vendor_item_id)
         code = str(result.get("code", ""))
         _log_sync.info(
             f"판매가 변경 API 응답: vid={vendor_item_id} "
@@ -2546,49 +2952,98 @@ async def update_sale_price(vendor_item_id: str, new_price: int) -> bool:
     except Exception as e:
         _log_sync.error(f"판매가 변경 예외: {e}")
         return False
+    return True
+
 
-    # Read-back verification: Coupang API returns SUCCESS but price may not be applied
-    for attempt in range(2):
-        await asyncio.sleep(1.5 if attempt == 0 else 3.0)
+def _inventory_sale_price(api_data: dict | None) -> int | None:
+    """inventories 응답에서 판매가 추출 (salePrice → price 순)."""
+    for key in ("salePrice", "price"):
+        val = (api_data or {}).get(key)
+        if val is None:
+            continue
         try:
-            api_data = await get_vendor_item_stock(vendor_item_id)
-            actual: int | None = None
-            if api_data:
-                for key in ("salePrice", "price"):
-                    val = api_data.get(key)
-                    if val is not None:
-                        try:
-                            candidate = int(val)
-                        except (ValueError, TypeError):
-                            continue
-                        if candidate > 0:
-                            actual = candidate
-                            break
+            candidate = int(val)
+        except (ValueError, TypeError):
+            continue
+        if candidate > 0:
+            return candidate
+    return None
+
+
+async def verify_sale_prices(expected: dict[str, int]) -> dict[str, bool]:
+    """
+    판매가 변경 읽기 검증 (read-back verification)
+    쿠팡 API가 SUCCESS를 반환해도 실제 반영이 늦거나 누락될 수 있어 GET으로 확인한다.
+    정착 대기 후 모든 대상을 한 번에 조회하고, 불일치 항목만 다시 확인한다.
+
+    Args:
+        expected: {vendorItemId: 기대 판매가}
+    Returns: {vendorItemId: 검증 성공 여부}
+    """
+    results = {vid: False for vid in expected}
+    pending = dict(expected)
+    attempts = len(PRICE_VERIFY_DELAYS)
+
+    for attempt, delay in enumerate(PRICE_VERIFY_DELAYS, start=1):
+        if not pending:
+            break
+        await asyncio.sleep(delay)
+        reads = await asyncio.gather(
+            *(get_vendor_item_stock(vid, fresh=True) for vid in pending),
+            return_exceptions=True,
+        )
+
+        mismatched: dict[str, int] = {}
+        for (vid, new_price), api_data in zip(pending.items(), reads):
+            if isinstance(api_data, Exception):
+                _log_sync.warning(f"판매가 검증 조회 실패: vid={vid} {api_data}")
+                mismatched[vid] = new_price
+                continue
+            actual = _inventory_sale_price(api_data)
             if actual == new_price:
+                results[vid] = True
                 _log_sync.info(
-                    f"판매가 변경 검증 성공: vid={vendor_item_id} "
-                    f"price={new_price:,}원 (attempt {attempt + 1})"
+                    f"판매가 변경 검증 성공: vid={vid} "
+                    f"price={new_price:,}원 (attempt {attempt})"
                 )
-                return True
-            _log_sync.warning(
-                f"판매가 변경 검증 불일치 (attempt {attempt + 1}/2): "
-                f"vid={vendor_item_id} expected={new_price:,} actual={actual}"
-            )
-        except Exception as e:
-            _log_sync.warning(f"판매가 검증 조회 실패: {e}")
+            else:
+                _log_sync.warning(
+                    f"판매가 변경 검증 불일치 (attempt {attempt}/{attempts}): "
+                    f"vid={vid} expected={new_price:,} actual={actual}"
+                )
+                mismatched[vid] = new_price
+        pending = mismatched
 
-    _log_sync.error(
-        f"판매가 변경 검증 최종 실패: vid={vendor_item_id} "
-        f"expected={new_price:,} — API said SUCCESS but price not applied"
-    )
-    return False
+    for vid, new_price in pending.items():
+        _log_sync.error(
+            f"판매가 변경 검증 최종 실패: vid={vid} "
+            f"expected={new_price:,} — API said SUCCESS but price not applied"
+        )
+    return results
+
+
+async def update_sale_price(vendor_item_id: str, new_price: int) -> bool:
+    """
+    판매가 변경 API 호출 + 읽기 검증 (read-back verification)
+    PUT /vendor-items/{vendorItemId}/prices/{price}
+    API가 SUCCESS를 반환해도 실제 가격 변경을 GET으로 확인한 후 True 반환.
+    여러 건을 바꿀 때는 _put_sale_price()로 모두 요청한 뒤 verify_sale_prices()로
+    한 번에 검증한다.
+    """
+    if not await _put_sale_price(vendor_item_id, new_price):
+        return False
+    verified = await verify_sale_prices({vendor_item_id: new_price})
+    return verified[vendor_item_id]
 
 
 async def update_stock(vendor_item_id: str, quantity: int) -> bool:
     """재고 수량 변경 API"""
     path = f"{COUPANG_SELLER_MARKETPLACE}/vendor-items/{vendor_item_id}/quantities/{quantity}"
     try:
-        result = await _coupang_put(path)
+        try:
+            result = await _coupang_put(path)
+        finally:
+            _invalidate_inventory_cache(vendor_item_id)
         code = str(result.get("code", ""))
         if code in ("SUCCESS", "200"):
             _log_stock.info(f"재고 변경 → vendorItemId={vendor_item_id} | {quantity}개")
@@ -2606,7 +3061,10 @@ async def update_sale_status(vendor_item_id: str, on_sale: bool) -> bool:
     action = "resume" if on_sale else "stop"
     path = f"{COUPANG_SELLER_MARKETPLACE}/vendor-items/{vendor_item_id}/sales/{action}"
     try:
-        result = await _coupang_put(path)
+        try:
+            result = await _coupang_put(path)
+        finally:
+            _invalidate_inventory_cache(vendor_item_id)
         code = str(result.get("code", ""))
         status_str = "판매중" if on_sale else "판매중지(품절)"
         if code in ("SUCCESS", "200"):
@@ -2805,9 +3263,8 @@ async def sync_price_from_sourcing():
     """
     _log_sourcing.info(f"소싱목록 가격 동기화 확인... ({_now_kst_str()})")
 
-    # 재시작 후에도 가격 변동 감지가 가능하도록 이전 상태를 파일에서 복원
-    if not _sourcing_price_state:
-        _sourcing_price_state.update(_load_sourcing_price_state())
+    # 재시작 후에도 가격 변동 감지가 가능하도록 이전 상태를 ops.db에서 복원
+    state_loaded = await _load_sourcing_sync_state()
 
     try:
         gc = gspread.authorize(_google_creds())
@@ -2823,36 +3280,28 @@ async def sync_price_from_sourcing():
         return
 
     # 상품명 기반 vendorItemId 보강 인덱스 (O열에 1개만 있는 행 보완용)
-    product_name_to_vids: dict[str, set[str]] = {}
-    vid_to_product_name: dict[str, str] = {}
-    try:
-        ws_product = sh.worksheet(COUPANG_PRODUCT_SHEET)
-        product_rows = ws_product.get_all_values()
-        for row in product_rows[PRODUCT_START_ROW - 1 :]:
-            if len(row) < COL_PRODUCT_NAME:
-                continue
-            vid_cell = (
-                (row[COL_VENDOR_ITEM_ID - 1] or "").strip()
-                if len(row) >= COL_VENDOR_ITEM_ID
-                else ""
-            )
-            pname = (row[COL_PRODUCT_NAME - 1] or "").strip()
-            if not vid_cell or not pname:
-                continue
-            parsed_vids = _parse_vendor_item_ids(vid_cell)
-            if not parsed_vids:
-                continue
-            for variant in _product_name_variants(pname):
-                key = _normalize_product_name(variant)
-                if not key:
-                    continue
-                if key not in product_name_to_vids:
-                    product_name_to_vids[key] = set()
-                for vid in parsed_vids:
-                    product_name_to_vids[key].add(vid)
-                    vid_to_product_name[vid] = pname
-    except Exception as e:
-        _log_sourcing.error(f"쿠팡상품관리 매핑 인덱스 생성 실패: {e}")
+    # 필요한 행이 있을 때만 쿠팡상품관리 시트를 읽는다.
+    product_index: _ProductNameIndex | None = None
+    product_index_loaded = False
+
+    # 마지막 동기화 이후 입력(B/H/K/O/P)이 바뀐 행만 처리한다.
+    seen_row_keys: set[str] = set()
+    synced_row_hashes: dict[str, str] = {}
+    price_state_updates: dict[str, int] = {}
+    unchanged_rows = 0
+
+    # 구버전 JSON(행 번호 키)은 DB 상태가 비어 있을 때 현재 행 순서로 1회 가져온다.
+    legacy_import = (
+        state_loaded
+        and not _sourcing_price_state
+        and os.path.exists(_LEGACY_SOURCING_PRICE_STATE_FILE)
+    )
+    legacy_prices = _load_legacy_sourcing_price_state() if legacy_import else {}
+
+    def _remember_min_price(row_key: str, price: int) -> None:
+        if _sourcing_price_state.get(row_key) != price:
+            _sourcing_price_state[row_key] = price
+            price_state_updates[row_key] = price
 
     # 현재 판매가 인덱스 구성 (vendorItemId -> current_sale_price)
     current_price_by_vid: dict[str, int] = {}
@@ -2896,6 +3345,8 @@ async def sync_price_from_sourcing():
 
     price_changes = []
     price_failures: list[dict] = []
+    pending_price_rows: list[dict] = []  # 판매가 변경 요청 후 검증 대기 행
+    fired_prices: dict[str, int] = {}  # {vendorItemId: 요청한 판매가}
     soldout_changes = []
     soldout_row_seen = 0
 
@@ -2925,6 +3376,14 @@ async def sync_price_from_sourcing():
         ):
             continue
 
+        row_key = _sourcing_row_key(name_cell, vid_cell, price_vid_cell, seen_row_keys)
+        row_hash = _sourcing_row_hash(
+            name_cell, buy_price_cell, price_cell, vid_cell, price_vid_cell
+        )
+        if _sourcing_row_hashes.get(row_key) == row_hash:
+            unchanged_rows += 1
+            continue
+
         vendor_item_ids = _parse_vendor_item_ids(vid_cell)
         price_vendor_item_ids = _resolve_price_sync_vendor_item_ids(
             price_vid_cell, vendor_item_ids
@@ -2932,12 +3391,18 @@ async def sync_price_from_sourcing():
         is_soldout_row = _is_soldout_status(buy_price_cell)
 
         # 품절 행에서만 O열 비어있거나 1개인 케이스를 상품명으로 보강한다.
+        if is_soldout_row and len(vendor_item_ids) <= 1 and name_cell:
+            if not product_index_loaded:
+                product_index = _load_product_name_index(sh)
+                product_index_loaded = True
         if (
             is_soldout_row
             and len(vendor_item_ids) <= 1
             and name_cell
-            and product_name_to_vids
+            and product_index is not None
+            and product_index.name_to_vids
         ):
+            product_name_to_vids = product_index.name_to_vids
             source_key = _normalize_product_name(name_cell)
             augmented_ids: set[str] = set(vendor_item_ids)
             source_tokens = _name_token_set(name_cell)
@@ -2946,23 +3411,27 @@ async def sync_price_from_sourcing():
             exact_ids = product_name_to_vids.get(source_key, set())
             augmented_ids.update(exact_ids)
 
+            # 아래 두 보강 규칙은 토큰 2개 이상 공유가 조건이므로 역색인 후보만 본다.
+            token_candidates = product_index.keys_sharing_tokens(source_tokens)
+
             # 포함 관계 + 토큰 교집합 기반 보강
-            for key, ids in product_name_to_vids.items():
+            for key in token_candidates:
                 if not key:
                     continue
                 if source_key and (source_key in key or key in source_key):
                     overlap = len(source_tokens.intersection(set(key.split(" "))))
                     if overlap >= 2:
-                        augmented_ids.update(ids)
+                        augmented_ids.update(product_name_to_vids[key])
 
             # 숫자/용량/개수 표현이 달라도 토큰+숫자 교집합이 충분하면 보강한다.
             # 예: "푸르젠 참기름 350 x 2" <-> "푸르젠 ... 참기름 ... 350ml 2개"
             if len(augmented_ids) <= 1 and source_tokens:
-                for key, ids in product_name_to_vids.items():
+                for key in token_candidates:
                     if not key:
                         continue
-                    key_tokens = _name_token_set(key)
-                    key_numbers = _name_number_set(key)
+                    ids = product_name_to_vids[key]
+                    key_tokens = product_index.tokens[key]
+                    key_numbers = product_index.numbers[key]
                     token_overlap = len(source_tokens.intersection(key_tokens))
                     number_overlap = len(source_numbers.intersection(key_numbers))
                     if token_overlap >= 2 and (
@@ -2971,10 +3440,10 @@ async def sync_price_from_sourcing():
                         augmented_ids.update(ids)
 
             if len(augmented_ids) <= 1:
-                scored = [
-                    (_fuzzy_name_score(source_key, key), key)
-                    for key in product_name_to_vids.keys()
-                ]
+                all_keys = list(product_name_to_vids.keys())
+                scored = list(
+                    zip(_fuzzy_score_matrix([source_key], all_keys)[0], all_keys)
+                )
                 scored.sort(key=lambda x: x[0], reverse=True)
                 if scored:
                     best_score = scored[0][0]
@@ -3007,6 +3476,7 @@ async def sync_price_from_sourcing():
                 _log_sourcing.warning(
                     f"vendorItemId 매핑 없음 스킵 → row={i} name='{name_cell}' O열='{vid_cell}'"
                 )
+            synced_row_hashes[row_key] = row_hash
             continue
 
         # 매입가격(H열) 셀이 품절 상태면 자동 판매중지
@@ -3051,6 +3521,9 @@ async def sync_price_from_sourcing():
                     f"(성공 {len(stopped_ids)}개, 실패 {len(failed_ids)}개)"
                 )
 
+            else:
+                synced_row_hashes[row_key] = row_hash
+
             if stopped_ids:
                 soldout_changes.append(
                     {
@@ -3069,16 +3542,17 @@ async def sync_price_from_sourcing():
             new_price = None
 
         if new_price is None or new_price < 100:
+            synced_row_hashes[row_key] = row_hash
             continue
 
-        prev_price = _sourcing_price_state.get(i)
-
-        # 가격 변동 감지 (최초 실행 시에는 상태만 저장, 변경 없으면 스킵)
+        prev_price = _sourcing_price_state.get(row_key)
         if prev_price is None:
-            _sourcing_price_state[i] = new_price
-            continue
+            prev_price = legacy_prices.get(i)
 
-        if new_price == prev_price:
+        # 가격 변동 감지 (처음 보는 행은 상태만 저장, 변경 없으면 스킵)
+        if prev_price is None or new_price == prev_price:
+            _remember_min_price(row_key, new_price)
+            synced_row_hashes[row_key] = row_hash
             continue
 
         if not price_vendor_item_ids:
@@ -3087,6 +3561,7 @@ async def sync_price_from_sourcing():
                     f"가격동기화 vendorItemId 없음 스킵 → row={i} "
                     f"name='{name_cell}' O열='{vid_cell}' P열='{price_vid_cell}'"
                 )
+            synced_row_hashes[row_key] = row_hash
             continue
 
         # 변동 감지 → 가격동기화 대상 vendorItemId들에만 가격 업데이트
@@ -3096,12 +3571,12 @@ async def sync_price_from_sourcing():
             f"가격동기화 대상 {len(price_vendor_item_ids)}개"
         )
 
-        success_ids = []
-        success_details = []
+        fired_ids = []
         skipped_floor_ids = []
         skipped_unknown_ids = []
         failed_ids = []
 
+        # 1단계(요청): 판매가 변경만 보내고 검증은 모아서 한 번에 한다.
         for price_vendor_item_id in price_vendor_item_ids:
             current_sale_price = await _get_current_sale_price(price_vendor_item_id)
 
@@ -3114,23 +3589,60 @@ async def sync_price_from_sourcing():
             elif new_price <= current_sale_price:
                 skipped_floor_ids.append(price_vendor_item_id)
             else:
-                ok = await update_sale_price(price_vendor_item_id, new_price)
+                ok = await _put_sale_price(price_vendor_item_id, new_price)
                 if ok:
-                    success_ids.append(price_vendor_item_id)
-                    current_price_by_vid[price_vendor_item_id] = new_price
-                    success_details.append(
-                        {
-                            "vid": price_vendor_item_id,
-                            "product_name": vid_to_product_name.get(
-                                price_vendor_item_id, name_cell
-                            ),
-                            "old_price": current_sale_price,
-                            "new_price": new_price,
-                        }
-                    )
+                    fired_ids.append((price_vendor_item_id, current_sale_price))
+                    fired_prices[price_vendor_item_id] = new_price
                 else:
                     failed_ids.append(price_vendor_item_id)
-            await asyncio.sleep(0.2)
+
+        pending_price_rows.append(
+            {
+                "row": i,
+                "row_key": row_key,
+                "row_hash": row_hash,
+                "name": name_cell,
+                "prev": prev_price,
+                "new": new_price,
+                "fired": fired_ids,
+                "skip_floor": skipped_floor_ids,
+                "skip_unknown": skipped_unknown_ids,
+                "failed": failed_ids,
+            }
+        )
+
+    # 2단계(검증): 요청한 판매가를 정착 대기 1회 후 일괄 확인
+    verified = await verify_sale_prices(fired_prices) if fired_prices else {}
+    if verified and not product_index_loaded:
+        product_index = _load_product_name_index(sh)
+        product_index_loaded = True
+    vid_to_product_name = product_index.vid_to_product_name if product_index else {}
+
+    for pending_row in pending_price_rows:
+        i = pending_row["row"]
+        name_cell = pending_row["name"]
+        new_price = pending_row["new"]
+        skipped_floor_ids = pending_row["skip_floor"]
+        skipped_unknown_ids = pending_row["skip_unknown"]
+        failed_ids = list(pending_row["failed"])
+        success_ids = []
+        success_details = []
+
+        for vid, current_sale_price in pending_row["fired"]:
+            # 같은 vid가 다른 행에서 다른 가격으로 다시 요청됐으면 이 행은 실패로 본다.
+            if verified.get(vid) and fired_prices.get(vid) == new_price:
+                success_ids.append(vid)
+                current_price_by_vid[vid] = new_price
+                success_details.append(
+                    {
+                        "vid": vid,
+                        "product_name": vid_to_product_name.get(vid, name_cell),
+                        "old_price": current_sale_price,
+                        "new_price": new_price,
+                    }
+                )
+            else:
+                failed_ids.append(vid)
 
         # 일부 대상이 미확인/실패면 상태를 확정하지 않아 다음 주기에 재시도한다.
         if skipped_unknown_ids or failed_ids:
@@ -3139,7 +3651,8 @@ async def sync_price_from_sourcing():
                 f"(unknown={len(skipped_unknown_ids)}, failed={len(failed_ids)})"
             )
         else:
-            _sourcing_price_state[i] = new_price
+            _remember_min_price(pending_row["row_key"], new_price)
+            synced_row_hashes[pending_row["row_key"]] = pending_row["row_hash"]
 
         if skipped_floor_ids or skipped_unknown_ids or failed_ids:
             _log_sourcing.info(
@@ -3152,7 +3665,7 @@ async def sync_price_from_sourcing():
             price_changes.append(
                 {
                     "name": name_cell,
-                    "prev": prev_price,
+                    "prev": pending_row["prev"],
                     "new": new_price,
                     "count": len(success_ids),
                     "skip_floor": len(skipped_floor_ids),
@@ -3232,10 +3745,28 @@ async def sync_price_from_sourcing():
     if not price_changes and not soldout_changes:
         _log_sourcing.info("변경 없음")
 
-    _log_sourcing.info(f"품절 트리거 행 수: {soldout_row_seen}")
+    _log_sourcing.info(
+        f"품절 트리거 행 수: {soldout_row_seen} | 변경 없음 스킵 {unchanged_rows}행"
+    )
+    job_metrics.add(
+        items_processed=len(seen_row_keys),
+        items_changed=len(price_changes) + len(soldout_changes),
+    )
 
-    # 현재 가격 상태를 파일에 저장 (봇 재시작 후에도 변동 감지 유지)
-    _save_sourcing_price_state(_sourcing_price_state)
+    # 시트에서 사라진 행 키는 상태에서 제거하고, 바뀐 항목만 ops.db에 저장한다.
+    removed_row_keys = (
+        set(_sourcing_row_hashes) | set(_sourcing_price_state)
+    ) - seen_row_keys
+    for key in removed_row_keys:
+        _sourcing_row_hashes.pop(key, None)
+        _sourcing_price_state.pop(key, None)
+    _sourcing_row_hashes.update(synced_row_hashes)
+    if state_loaded:
+        saved = await _save_sourcing_sync_state(
+            synced_row_hashes, price_state_updates, removed_row_keys
+        )
+        if saved and legacy_import:
+            _retire_legacy_sourcing_price_state()
 
 
 # ──────────────────────────────────────────────
@@ -3302,12 +3833,19 @@ async def auto_match_sourcing_vendor_item_ids():
     except Exception as e:
         _log_sourcing.error(f"O/P열 헤더 보정 실패: {e}")
 
-    name_to_vids, name_display = _build_product_name_vid_index(product_rows)
+    product_index = _get_product_name_index(product_rows)
+    name_to_vids = product_index.name_to_vids
+    name_display = product_index.name_display
 
     if not name_to_vids:
         _log_sourcing.info("쿠팡상품관리에 매칭 대상 상품이 없습니다")
         return
 
+    # 같은 소싱명 + 같은 인덱스 버전이면 지난 매칭 결과를 재사용한다.
+    cache_version = _match_cache_version(product_index)
+    match_cache = await _load_match_cache(cache_version)
+    new_matches: dict[str, tuple[list[str], str, int, str, str]] = {}
+
     updates: list[dict] = []
     exact_count = 0
     fuzzy_count = 0
@@ -3338,17 +3876,36 @@ async def auto_match_sourcing_vendor_item_ids():
         )
         existing_price_vids = _parse_vendor_item_ids(existing_price_vid_raw)
         existing_vids = _parse_vendor_item_ids(existing_vid)
-        matched_vids, matched_key, matched_score, match_mode = (
-            _match_sourcing_vendor_item_ids(sourcing_name, name_to_vids)
-        )
+        cached = match_cache.get(sourcing_name)
+        if cached is None:
+            matched_vids, matched_key, matched_score, match_mode = (
+                _match_sourcing_vendor_item_ids(sourcing_name, product_index)
+            )
+            default_price_vid = (
+                _pick_representative_vendor_item_id(
+                    matched_key, matched_vids, name_to_vids
+                )
+                if matched_vids
+                else ""
+            )
+            cached = (
+                matched_vids,
+                matched_key,
+                matched_score,
+                match_mode,
+                default_price_vid,
+            )
+            match_cache[sourcing_name] = cached
+            new_matches[sourcing_name] = cached
+        matched_vids, matched_key, matched_score, match_mode, default_price_vid = cached
         if not matched_vids:
             continue
         existing_price_vid = existing_price_vids[0] if existing_price_vids else None
-        desired_price_vid = _pick_representative_vendor_item_id(
-            matched_key,
-            matched_vids,
-            name_to_vids,
-            preferred_vid=existing_price_vid,
+        # 기존 P열 값이 매칭 결과에 있으면 유지 (_pick_representative_vendor_item_id 규칙)
+        desired_price_vid = (
+            existing_price_vid
+            if existing_price_vid in matched_vids
+            else default_price_vid
         )
         if not desired_price_vid:
             continue
@@ -3394,6 +3951,14 @@ async def auto_match_sourcing_vendor_item_ids():
             }
         )
 
+    if new_matches:
+        await _save_match_cache(cache_version, new_matches)
+    _log_sourcing.info(
+        f"자동 매칭 캐시 → 재사용 {len(match_cache) - len(new_matches)}건, "
+        f"신규 채점 {len(new_matches)}건"
+    )
+    _log_sourcing.debug(f"상품명 정규화 캐시 hit/miss: {_name_cache_summary()}")
+
     if not updates:
         _log_sourcing.info("신규 매칭 없음")
         return
@@ -3621,13 +4186,292 @@ async def ship_order_api(
         return False
 
 
+# 주문ID → (shipmentBoxId, vendorItemId) 인덱스 (주문 조회 응답에서 기록, ops.db 영속)
+INVOICE_BATCH_SIZE = _env_int("COUPANG_INVOICE_BATCH_SIZE", 50)
+_SHIPMENT_INDEX_MEMORY_LIMIT = 5000
+_SHIP_NOTIFY_DETAIL_LIMIT = 5  # 초과 시 배송처리 알림을 요약 1건으로
+_order_shipments: dict[str, tuple[str, str]] = {}
+
+
+def _order_shipment_entry(order: dict) -> tuple[str, str, str] | None:
+    """주문 응답 1건 → (orderId, shipmentBoxId, vendorItemId). 값이 비면 None."""
+    order_id = str(order.get("orderId", "") or "").strip()
+    box_id = str(order.get("shipmentBoxId", "") or "").strip()
+    items = order.get("orderItems") or [{}]
+    vendor_item_id = str(items[0].get("vendorItemId", "") or "").strip()
+    if not order_id or not box_id.isdigit() or not vendor_item_id.isdigit():
+        return None
+    return order_id, box_id, vendor_item_id
+
+
+async def _remember_order_shipments(orders: list[dict]) -> int:
+    """주문 조회 응답의 shipmentBoxId/vendorItemId를 메모리와 ops.db에 기록.
+
+    Returns: 새로 기록되거나 바뀐 주문 수
+    """
+    changed: list[tuple[str, str, str]] = []
+    for order in orders:
+        entry = _order_shipment_entry(order)
+        if entry and _order_shipments.get(entry[0]) != entry[1:]:
+            changed.append(entry)
+    if not changed:
+        return 0
+
+    if len(_order_shipments) + len(changed) > _SHIPMENT_INDEX_MEMORY_LIMIT:
+        _order_shipments.clear()
+    for order_id, box_id, vendor_item_id in changed:
+        _order_shipments[order_id] = (box_id, vendor_item_id)
+
+    now = datetime.now(KST).isoformat()
+    try:
+        conn = db.get_conn()
+        async with db._write_lock:
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO coupang_order_shipments"
+                    "(order_id, shipment_box_id, vendor_item_id, updated_at)"
+                    " VALUES (?,?,?,?)",
+                    [(*entry, now) for entry in changed],
+                )
+                await conn.commit()
+            except Exception:
+                await conn.execute("ROLLBACK")
+                raise
+    except Exception as e:
+        _log_ship.warning(f"주문 배송정보 인덱스 저장 실패 (메모리만 유지): {e}")
+    return len(changed)
+
+
+async def _load_order_shipments(order_ids: list[str]) -> dict[str, tuple[str, str]]:
+    """메모리 → ops.db 순으로 주문ID의 (shipmentBoxId, vendorItemId)를 찾는다."""
+    found = {oid: _order_shipments[oid] for oid in order_ids if oid in _order_shipments}
+    missing = [oid for oid in order_ids if oid not in found]
+    if not missing:
+        return found
+    try:
+        async with db.get_read_conn() as conn:
+            for start in range(0, len(missing), 500):
+                chunk = missing[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                async with conn.execute(
+                    "SELECT order_id, shipment_box_id, vendor_item_id"
+                    f" FROM coupang_order_shipments WHERE order_id IN ({placeholders})",
+                    chunk,
+                ) as cur:
+                    for order_id, box_id, vendor_item_id in await cur.fetchall():
+                        found[order_id] = (box_id, vendor_item_id)
+                        _order_shipments[order_id] = (box_id, vendor_item_id)
+    except Exception as e:
+        _log_ship.warning(f"주문 배송정보 인덱스 조회 실패: {e}")
+    return found
+
+
+async def _resolve_order_shipments(
+    order_ids: list[str],
+) -> dict[str, tuple[str, str]]:
+    """주문ID 목록의 (shipmentBoxId, vendorItemId)를 일괄 확인.
+
+    인덱스 → 상품준비중 목록 1회 조회 → 남은 건만 get_shipment_box_id 동시 조회.
+    """
+    resolved = await _load_order_shipments(order_ids)
+    missing = [oid for oid in order_ids if oid not in resolved]
+    if not missing:
+        return resolved
+
+    _log_ship.info(f"배송정보 인덱스 미스 {len(missing)}건 → 상품준비중 목록 조회")
+    instruct_orders = await get_orders_by_status("INSTRUCT", days=14)
+    await _remember_order_shipments(instruct_orders)
+    for oid in missing:
+        if oid in _order_shipments:
+            resolved[oid] = _order_shipments[oid]
+
+    missing = [oid for oid in missing if oid not in resolved]
+    if missing:
+        results = await asyncio.gather(
+            *(get_shipment_box_id(oid) for oid in missing), return_exceptions=True
+        )
+        for oid, result in zip(missing, results):
+            if isinstance(result, tuple) and result[0] and result[1]:
+                resolved[oid] = result
+                _order_shipments[oid] = result
+    return resolved
+
+
+async def _applied_invoice_boxes(targets: list[dict]) -> set[str]:
+    """배송중(DEPARTURE) 목록에서 같은 송장번호로 이미 반영된 shipmentBoxId 집합.
+
+    조회 실패 시 get_orders_by_status가 빈 목록을 주므로 빈 집합(전부 재시도).
+    """
+    wanted = {t["shipment_box_id"]: t["invoice"].strip() for t in targets}
+    applied: set[str] = set()
+    for order in await get_orders_by_status("DEPARTURE", days=14):
+        box_id = str(order.get("shipmentBoxId", "") or "")
+        invoice = str(order.get("invoiceNumber", "") or "").strip()
+        if box_id in wanted and invoice and invoice == wanted[box_id]:
+            applied.add(box_id)
+    return applied
+
+
+async def ship_orders_api(
+    targets: list[dict],
+) -> dict[str, bool]:
+    """
+    쿠팡 송장업로드 API 일괄 호출 (orderSheetInvoiceApplyDtos 여러 건을 한 요청으로)
+    targets: {shipment_box_id, order_id, vendor_item_id, invoice, carrier_code} 목록
+    요청은 INVOICE_BATCH_SIZE 단위로 나눠 동시 실행하고(_coupang_api_sem 제한),
+    요청 자체가 실패한 묶음은 배송중 목록으로 반영 여부를 확인한 뒤,
+    반영되지 않은 건만 ship_order_api()로 건별 재시도한다.
+    Returns: {shipmentBoxId: 성공여부}
+    """
+    path = f"{COUPANG_OPENAPI_V4_VENDOR}/orders/invoices"
+    results: dict[str, bool] = {}
+    valid: list[dict] = []
+    for t in targets:
+        ids = (t["shipment_box_id"], t["order_id"], t["vendor_item_id"])
+        if all(str(v or "").isdigit() for v in ids):
+            valid.append(t)
+            continue
+        # 형식오류 행은 해당 주문만 실패 처리 (묶음 전체를 중단시키지 않음)
+        _log_ship.error(
+            f"송장등록 형식오류 → shipmentBoxId={ids[0]} orderId={ids[1]} "
+            f"vendorItemId={ids[2]}"
+        )
+        results[str(t["shipment_box_id"])] = False
+
+    batch_size = max(1, INVOICE_BATCH_SIZE)
+    batches = [
+        valid[start : start + batch_size] for start in range(0, len(valid), batch_size)
+    ]
+
+    async def _ship_single(target: dict) -> bool:
+        return await ship_order_api(
+            target["shipment_box_id"],
+            target["invoice"],
+            target["carrier_code"],
+            order_id=target["order_id"],
+            vendor_item_id=target["vendor_item_id"],
+        )
+
+    async def _ship_batch(batch: list[dict]) -> dict[str, bool]:
+        if len(batch) == 1:
+            return {batch[0]["shipment_box_id"]: await _ship_single(batch[0])}
+        body = {
+            "vendorId": COUPANG_VENDOR_ID,
+            "orderSheetInvoiceApplyDtos": [
+                {
+                    "shipmentBoxId": int(t["shipment_box_id"]),
+                    "orderId": int(t["order_id"]),
+                    "vendorItemId": int(t["vendor_item_id"]),
+                    "deliveryCompanyCode": t["carrier_code"].strip().upper(),
+                    "invoiceNumber": t["invoice"].strip(),
+                    "splitShipping": False,
+                    "preSplitShipped": False,
+                }
+                for t in batch
+            ],
+        }
+        try:
+            result = await _coupang_post(path, body)
+            code = str(result.get("code", ""))
+            if code not in ("200", "SUCCESS"):
+                raise RuntimeError(f"API 오류 → {result}")
+            response_list = (result.get("data") or {}).get("responseList") or []
+        except Exception as e:
+            # 타임아웃 등은 요청이 이미 반영됐을 수 있다 → 배송중 목록으로 확인 후
+            # 송장이 반영되지 않은 건만 건별 재시도
+            applied = await _applied_invoice_boxes(batch)
+            retry = [t for t in batch if t["shipment_box_id"] not in applied]
+            _log_ship.warning(
+                f"송장 일괄등록 실패 ({len(batch)}건, 반영 확인 {len(applied)}건)"
+                f" — {len(retry)}건 건별 재시도: {e}"
+            )
+            outcomes = await asyncio.gather(
+                *(_ship_single(t) for t in retry), return_exceptions=True
+            )
+            shipped = {
+                t["shipment_box_id"]: outcome is True
+                for t, outcome in zip(retry, outcomes)
+            }
+            return {
+                t["shipment_box_id"]: t["shipment_box_id"] in applied
+                or shipped.get(t["shipment_box_id"], False)
+                for t in batch
+            }
+
+        succeeded: dict[str, bool] = {}
+        for item in response_list:
+            box_id = str(item.get("shipmentBoxId", ""))
+            if item.get("succeed"):
+                succeeded[box_id] = True
+            else:
+                _log_ship.error(
+                    f"송장등록 실패 → shipmentBoxId={box_id} | {item.get('resultMessage', '')}"
+                )
+        return {
+            t["shipment_box_id"]: succeeded.get(t["shipment_box_id"], False)
+            for t in batch
+        }
+
+    for outcome in await asyncio.gather(*(_ship_batch(b) for b in batches)):
+        results.update(outcome)
+    return results
+
+
+# probe가 마지막으로 본 '주문완료' + 발송처리일시 빈 행 수 (None이면 모름).
+# 0이면 송장을 입력할 행이 없으므로 G~M열 읽기를 건너뛴다. 봇이 '주문완료'로
+# 바꿀 때(match_sourcing_orders_to_coupang) None으로 되돌리고, 사람이 직접 바꾼
+# 행은 정기 발송처리 폴링이 처리한다.
+_awaiting_invoice_rows: int | None = None
+
+
+async def probe_pending_shipments() -> str | None:
+    """쿠팡주문관리 G~M열만 읽어 배송처리 대기 행의 서명을 반환 (쿠팡 API 호출 없음).
+
+    대기 행이 없으면 "", 시트 조회 실패 시 None. 송장 입력을 기다리는 행이
+    없다고 알고 있으면 시트를 읽지 않고 ""를 반환한다.
+    """
+    global _awaiting_invoice_rows
+    if _awaiting_invoice_rows == 0:
+        return ""
+    first_col = rowcol_to_a1(ORDER_START_ROW, COL_ORDER_STATUS)
+    last_col = rowcol_to_a1(1, COL_ORDER_SHIP_DATE).rstrip("0123456789")
+    try:
+        ws = _open_coupang_sheet(COUPANG_ORDER_SHEET)
+        rows = ws.get(f"{first_col}:{last_col}")
+    except Exception as e:
+        _log_ship.warning(f"배송처리 신호 조회 실패: {e}")
+        return None
+
+    ready: list[str] = []
+    awaiting = 0
+    for offset, row in enumerate(rows):
+        cells = list(row) + [""] * (COL_ORDER_SHIP_DATE - COL_ORDER_STATUS + 1)
+        status = cells[0].strip()
+        invoice = cells[COL_ORDER_INVOICE - COL_ORDER_STATUS].strip()
+        carrier = cells[COL_ORDER_CARRIER - COL_ORDER_STATUS].strip()
+        ship_date = cells[COL_ORDER_SHIP_DATE - COL_ORDER_STATUS].strip()
+        if status != "주문완료" or ship_date:
+            continue
+        awaiting += 1
+        # process_shipping이 건너뛰는 택배사 코드 오류 행은 신호에서 제외
+        if normalize_carrier_code(carrier) not in VALID_CARRIER_CODES:
+            continue
+        if invoice and carrier:
+            ready.append(f"{ORDER_START_ROW + offset}|{invoice}|{carrier}")
+    _awaiting_invoice_rows = awaiting
+    if not ready:
+        return ""
+    return hashlib.sha1("\n".join(ready).encode("utf-8")).hexdigest()
+
+
 async def process_shipping():
     """
     쿠팡주문관리 시트 감지 → 자동 배송처리
     - K열(송장번호) + L열(택배사코드) 입력되고
     - G열(상태)이 '상품준비중'이고
     - M열(발송처리일시) 비어있는 행 처리
-    흐름: 쿠팡 배송중 API → 시트 상태 갱신
+    흐름: 대상 수집 → shipmentBoxId 인덱스 확인 → 송장 일괄등록 → 시트 batch_update 1회
     """
     _log_ship.info(f"배송처리 대기 주문 확인... ({_now_kst_str()})")
 
@@ -3639,21 +4483,19 @@ async def process_shipping():
         return
 
     data_rows = rows[ORDER_START_ROW - 1 :]
-    shipped_count = 0
     pending_cell_updates: dict[str, object] = {}
     # Prevent duplicate API calls within the same run using stable business keys.
     processed_keys_in_run: set[str] = set()
 
+    # 1단계: 처리 대상 수집 (API 호출 없음)
+    targets: list[dict] = []
     for i, row in enumerate(data_rows, start=ORDER_START_ROW):
         # 컬럼 충분한지 확인
         if len(row) < COL_ORDER_SHIP_DATE:
             continue
 
         order_id = row[COL_ORDER_ID - 1].strip()
-        product_name = row[COL_ORDER_PRODUCT - 1].strip()
-        buyer_name = row[COL_ORDER_NAME - 1].strip()
         status = row[COL_ORDER_STATUS - 1].strip()
-        order_item_id = row[COL_ORDER_ITEM_ID - 1].strip()
         invoice = row[COL_ORDER_INVOICE - 1].strip()  # K열
         carrier = row[COL_ORDER_CARRIER - 1].strip()  # L열
         carrier_code = normalize_carrier_code(carrier)
@@ -3678,78 +4520,147 @@ async def process_shipping():
         dedupe_key = f"{order_id}|{invoice}|{carrier_code}"
         if dedupe_key in processed_keys_in_run:
             continue
+        processed_keys_in_run.add(dedupe_key)
 
         if ship_date:  # 이미 처리됨
-            processed_keys_in_run.add(dedupe_key)
             continue
-        # J열 비어있으면 orderId로 shipmentBoxId 실시간 조회
-        vendor_item_id = ""
-        if not order_item_id:
-            _log_ship.info(f"J열 없음 → orderId={order_id} 로 shipmentBoxId 조회")
-            order_item_id, vendor_item_id = await get_shipment_box_id(order_id)
-            if not order_item_id:
-                _log_ship.warning(f"{order_id} shipmentBoxId 조회 실패 — 스킵")
-                continue
-        else:
-            # J열이 채워진 케이스도 vendorItemId가 필요하므로 보완 조회
-            _, vendor_item_id = await get_shipment_box_id(order_id)
-            if not vendor_item_id:
-                _log_ship.warning(f"{order_id} vendorItemId 조회 실패 — 스킵")
-                continue
 
+        targets.append(
+            {
+                "row_idx": i,
+                "order_id": order_id,
+                "product_name": row[COL_ORDER_PRODUCT - 1].strip(),
+                "buyer_name": row[COL_ORDER_NAME - 1].strip(),
+                "sheet_box_id": row[COL_ORDER_ITEM_ID - 1].strip(),
+                "invoice": invoice,
+                "carrier_code": carrier_code,
+            }
+        )
+
+    if not targets:
+        _log_ship.info("처리할 배송 없음")
+        return
+
+    # 2단계: shipmentBoxId/vendorItemId 확인 (인덱스 우선, 미스만 API 조회)
+    resolved = await _resolve_order_shipments(
+        list(dict.fromkeys(t["order_id"] for t in targets))
+    )
+    ship_targets: list[dict] = []
+    for target in targets:
+        box_id, vendor_item_id = resolved.get(target["order_id"], ("", ""))
+        # J열 값이 있으면 그대로 사용 (인덱스는 vendorItemId 보완용)
+        box_id = target["sheet_box_id"] or box_id
+        if not box_id or not vendor_item_id:
+            _log_ship.warning(
+                f"{target['order_id']} shipmentBoxId/vendorItemId 조회 실패 — 스킵"
+            )
+            continue
+        if (
+            not target["order_id"].isdigit()
+            or not box_id.isdigit()
+            or not vendor_item_id.isdigit()
+        ):
+            _log_ship.error(
+                f"주문 형식오류 — orderId={target['order_id']} "
+                f"shipmentBoxId={box_id} vendorItemId={vendor_item_id}"
+            )
+            continue
+        target["shipment_box_id"] = box_id
+        target["vendor_item_id"] = vendor_item_id
         _log_ship.info(
-            f"배송처리: {order_id} | {product_name} | 송장={invoice} ({carrier_code})"
+            f"배송처리: {target['order_id']} | {target['product_name']} | "
+            f"송장={target['invoice']} ({target['carrier_code']})"
         )
+        ship_targets.append(target)
+
+    # 3단계: 송장 일괄등록
+    ship_results = await ship_orders_api(ship_targets) if ship_targets else {}
+    ts = _now_kst_str()
 
-        # 쿠팡 송장등록 API
-        success = await ship_order_api(
-            order_item_id,
-            invoice,
-            carrier_code,
-            order_id=order_id,
-            vendor_item_id=vendor_item_id,
+    # 4단계: 시트 갱신 + 알림
+    shipped: list[dict] = []
+    for target in ship_targets:
+        if not ship_results.get(target["shipment_box_id"]):
+            continue
+        # 시트 갱신: 쿠팡은 배송처리 API 호출 시 '배송지시' 상태로 변경됨
+        _queue_sheet_cell_update(
+            pending_cell_updates, target["row_idx"], COL_ORDER_STATUS, "배송지시"
         )
-        ts = _now_kst_str()
+        _queue_sheet_cell_update(
+            pending_cell_updates, target["row_idx"], COL_ORDER_SHIP_DATE, ts
+        )
+        shipped.append(target)
 
-        if success:
-            # 시트 갱신: 쿠팡은 배송처리 API 호출 시 '배송지시' 상태로 변경됨
-            _queue_sheet_cell_update(
-                pending_cell_updates, i, COL_ORDER_STATUS, "배송지시"
-            )
-            _queue_sheet_cell_update(pending_cell_updates, i, COL_ORDER_SHIP_DATE, ts)
+    _flush_sheet_cell_updates(ws, pending_cell_updates)
+    job_metrics.add(items_processed=len(ship_targets), items_changed=len(shipped))
+
+    if not shipped:
+        _log_ship.info("처리할 배송 없음")
+        return
+
+    _log_ship.info(f"총 {len(shipped)}건 배송처리 완료")
+    await _notify_shipped(shipped, ts)
 
-            # Discord 알림
+
+async def _notify_shipped(shipped: list[dict], ts: str) -> None:
+    """배송처리 완료 알림. 소량은 건별, 대량은 요약 1건으로 보낸다."""
+    if len(shipped) <= _SHIP_NOTIFY_DETAIL_LIMIT:
+        for target in shipped:
             embeds = [
                 {
                     "title": "🚚 배송처리 완료",
                     "color": 5763719,
                     "fields": [
-                        {"name": "주문 ID", "value": order_id, "inline": True},
-                        {"name": "상품", "value": product_name, "inline": True},
+                        {
+                            "name": "주문 ID",
+                            "value": target["order_id"],
+                            "inline": True,
+                        },
+                        {
+                            "name": "상품",
+                            "value": target["product_name"],
+                            "inline": True,
+                        },
                         {
                             "name": "구매자",
-                            "value": _mask_name(buyer_name),
+                            "value": _mask_name(target["buyer_name"]),
                             "inline": True,
                         },
-                        {"name": "택배사", "value": carrier_code, "inline": True},
-                        {"name": "송장번호", "value": invoice, "inline": True},
-                        {"name": "처리시각", "value": ts, "inline": True},
+                        {
+                            "name": "택배사",
+                            "value": target["carrier_code"],
+                            "inline": True,
+                        },
+                        {
+                            "name": "송장번호",
+                            "value": target["invoice"],
+                            "inline": True,
+                        },
+                        {"name": "처리시각", "value": ts, "inline": True},
                     ],
                 }
             ]
             await post_webhook(COUPANG_ORDER_WEBHOOK, "배송처리 완료", embeds=embeds)
+        return
 
-            processed_keys_in_run.add(dedupe_key)
-            shipped_count += 1
-
-        await asyncio.sleep(0.5)
-
-    _flush_sheet_cell_updates(ws, pending_cell_updates)
-
-    if shipped_count == 0:
-        _log_ship.info("처리할 배송 없음")
-    else:
-        _log_ship.info(f"총 {shipped_count}건 배송처리 완료")
+    lines = [
+        f"• {t['order_id']} | {t['product_name']} | {t['carrier_code']} {t['invoice']}"
+        for t in shipped[:20]
+    ]
+    if len(shipped) > 20:
+        lines.append(f"… 외 {len(shipped) - 20}건")
+    embeds = [
+        {
+            "title": "🚚 배송처리 완료",
+            "description": "\n".join(lines),
+            "color": 5763719,
+            "fields": [
+                {"name": "처리 건수", "value": f"{len(shipped)}건", "inline": True},
+                {"name": "처리시각", "value": ts, "inline": True},
+            ],
+        }
+    ]
+    await post_webhook(COUPANG_ORDER_WEBHOOK, "배송처리 완료", embeds=embeds)
 
 
 # ──────────────────────────────────────────────
@@ -3757,18 +4668,25 @@ async def process_shipping():
 # ──────────────────────────────────────────────
 
 _stock_status: dict[str, bool] = {}  # {vendorItemId: is_on_sale}
+STOCK_SCAN_WORKERS = _env_int("COUPANG_STOCK_SCAN_WORKERS", 6)
 
+# inventories 응답 캐시 (상품 lane 잡들이 같은 vendorItemId를 몇 분 안에 반복 조회)
+INVENTORY_CACHE_TTL_SECONDS = _env_int("COUPANG_INVENTORY_CACHE_TTL_SECONDS", 120)
+_inventory_cache: dict[str, tuple[float, dict]] = {}  # {vid: (조회시각, data)}
+_inventory_inflight: dict[str, asyncio.Task] = {}  # {vid: 진행 중인 조회}
 
-async def get_vendor_item_stock(vendor_item_id: str) -> dict:
-    """단일 vendorItemId 재고·상태 조회"""
-    normalized_vendor_item_id = _normalize_vendor_item_id(vendor_item_id)
-    if not normalized_vendor_item_id:
-        if str(vendor_item_id or "").strip():
-            _log_stock.warning(
-                f"vendorItemId 형식오류 스킵: {str(vendor_item_id).strip()}"
-            )
-        return {}
-    vendor_item_id = normalized_vendor_item_id
+
+def _invalidate_inventory_cache(vendor_item_id: str) -> None:
+    """가격/재고/판매상태 변경 후 해당 vendorItemId 캐시를 버린다.
+
+    진행 중인 조회도 목록에서 떼어내 변경 이전 응답이 캐시에 들어가지 않게 한다.
+    """
+    vid = _normalize_vendor_item_id(vendor_item_id) or str(vendor_item_id).strip()
+    _inventory_cache.pop(vid, None)
+    _inventory_inflight.pop(vid, None)
+
+
+async def _fetch_vendor_item_inventory(vendor_item_id: str) -> dict:
     path = f"{COUPANG_SELLER_MARKETPLACE}/vendor-items/{vendor_item_id}/inventories"
     try:
         result = await _coupang_get(path)
@@ -3786,11 +4704,126 @@ async def get_vendor_item_stock(vendor_item_id: str) -> dict:
         return {}
 
 
+async def get_vendor_item_stock(vendor_item_id: str, *, fresh: bool = False) -> dict:
+    """단일 vendorItemId 재고·상태 조회
+
+    INVENTORY_CACHE_TTL_SECONDS 동안 응답을 재사용하고, 같은 ID의 동시 요청은
+    하나의 API 호출로 합친다. fresh=True면 캐시를 건너뛰고 새로 조회한다
+    (변경 직후 읽기 검증용).
+    """
+    normalized_vendor_item_id = _normalize_vendor_item_id(vendor_item_id)
+    if not normalized_vendor_item_id:
+        if str(vendor_item_id or "").strip():
+            _log_stock.warning(
+                f"vendorItemId 형식오류 스킵: {str(vendor_item_id).strip()}"
+            )
+        return {}
+    vendor_item_id = normalized_vendor_item_id
+
+    if not fresh:
+        cached = _inventory_cache.get(vendor_item_id)
+        if cached and time.monotonic() - cached[0] < INVENTORY_CACHE_TTL_SECONDS:
+            return dict(cached[1])
+        inflight = _inventory_inflight.get(vendor_item_id)
+        if inflight is not None:
+            return dict(await asyncio.shield(inflight))
+
+    task = asyncio.ensure_future(_fetch_vendor_item_inventory(vendor_item_id))
+    _inventory_inflight[vendor_item_id] = task
+
+    def _store(done: asyncio.Task) -> None:
+        # 무효화/교체된 조회 결과는 캐시에 남기지 않는다.
+        if _inventory_inflight.get(vendor_item_id) is not done:
+            return
+        del _inventory_inflight[vendor_item_id]
+        if not done.cancelled() and done.exception() is None and done.result():
+            _inventory_cache[vendor_item_id] = (time.monotonic(), done.result())
+
+    task.add_done_callback(_store)
+    return dict(await asyncio.shield(task))
+
+
+async def _fetch_vendor_item_stocks(
+    vendor_item_ids: list[str], workers: int | None = None
+) -> dict[str, dict]:
+    """vendorItemId 목록의 재고를 워커 풀로 동시 조회한다.
+
+    실제 호출 속도는 _coupang_get의 _coupang_api_sem/_COUPANG_API_DELAY가 제한하고,
+    워커 수는 대기 중인 코루틴 수만 제한한다.
+    Returns: {vendorItemId: inventories data} (조회 실패/빈 응답은 제외)
+    """
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for vendor_item_id in vendor_item_ids:
+        queue.put_nowait(vendor_item_id)
+
+    results: dict[str, dict] = {}
+
+    async def _worker():
+        while True:
+            try:
+                vendor_item_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            item_data = await get_vendor_item_stock(vendor_item_id)
+            if item_data:
+                results[vendor_item_id] = item_data
+
+    worker_count = max(1, min(workers or STOCK_SCAN_WORKERS, len(vendor_item_ids)))
+    await asyncio.gather(*(_worker() for _ in range(worker_count)))
+    return results
+
+
+def _stock_from_inventory(item_data: dict) -> tuple[int, bool]:
+    """inventories 응답 → (실재고, 판매중 여부). 재고를 알 수 없으면 -1."""
+    # inventories API는 amountInStock 필드를 기본 재고로 사용
+    real_stock = item_data.get("amountInStock")
+    if real_stock is None:
+        real_stock = item_data.get("quantity")
+    if real_stock is None:
+        real_stock = item_data.get("maximumBuyCount", -1)
+    try:
+        real_stock = int(real_stock)
+    except (TypeError, ValueError):
+        real_stock = -1
+
+    on_sale_raw = item_data.get("onSale", True)
+    if isinstance(on_sale_raw, str):
+        on_sale = on_sale_raw.strip().lower() in {"true", "1", "y", "yes"}
+    else:
+        on_sale = bool(on_sale_raw)
+    return real_stock, on_sale
+
+
+async def _record_vendor_item_prices(stock_by_vid: dict[str, dict]) -> None:
+    """실재고 조회 응답의 판매가를 가격 시계열(price_series)에 기록 (best-effort)."""
+    observations = []
+    for vendor_item_id, item_data in stock_by_vid.items():
+        price = _inventory_sale_price(item_data)
+        if price is not None:
+            observations.append((price_series.vendor_item_key(vendor_item_id), price))
+    try:
+        await price_series.record_prices(observations)
+    except Exception as e:
+        _log_stock.warning(f"가격 시계열 기록 실패: {e}")
+
+
+def _queue_changed_cell(
+    pending: dict[str, object], row: list[str], row_idx: int, col: int, value: str
+) -> None:
+    """시트의 현재 값과 다를 때만 셀 변경을 누적."""
+    current = row[col - 1].strip() if len(row) >= col else ""
+    if current != value:
+        _queue_sheet_cell_update(pending, row_idx, col, value)
+
+
 async def auto_stock_out_check():
     """
     쿠팡상품관리 시트의 vendorItemId 목록을 쿠팡 API로 실재고 조회
     재고 = 0 이고 현재 판매중이면 → 자동 품절처리
     재고 > 0 이고 현재 품절(시트 상태 기준)이면 → 자동 판매재개
+
+    재고는 워커 풀로 동시 조회하고, 상태 전환이 필요한 vendorItemId에만
+    update_sale_status()를 호출하며, 값이 바뀐 셀만 시트에 쓴다.
     """
     _log_stock.info(f"실재고 자동 점검 시작... ({_now_kst_str()})")
 
@@ -3801,48 +4834,45 @@ async def auto_stock_out_check():
         _log_stock.error(f"시트 열기 실패: {e}")
         return
 
-    data_rows = rows[PRODUCT_START_ROW - 1 :]
-    alerts = []
-    pending_cell_updates: dict[str, object] = {}
-
-    for i, row in enumerate(data_rows, start=PRODUCT_START_ROW):
+    # vendorItemId → 시트 행 목록 (같은 vid가 여러 행이면 조회/상태변경은 1회)
+    rows_by_vid: dict[str, list[tuple[int, list[str]]]] = {}
+    for i, row in enumerate(rows[PRODUCT_START_ROW - 1 :], start=PRODUCT_START_ROW):
         if not row or not row[COL_VENDOR_ITEM_ID - 1].strip():
             continue
-
         vendor_item_id = _normalize_vendor_item_id(row[COL_VENDOR_ITEM_ID - 1])
         if not vendor_item_id:
             continue
-        product_name = (
-            row[COL_PRODUCT_NAME - 1].strip() if len(row) > COL_PRODUCT_NAME - 1 else ""
-        )
-        sale_status = (
-            row[COL_SALE_STATUS - 1].strip() if len(row) > COL_SALE_STATUS - 1 else ""
-        )
-        is_manual_stop = _is_manual_stop_status(sale_status)
-        is_soldout_row = _is_soldout_status(sale_status)
+        rows_by_vid.setdefault(vendor_item_id, []).append((i, row))
+
+    # 쿠팡 API에서 실재고 동시 조회
+    stock_by_vid = await _fetch_vendor_item_stocks(list(rows_by_vid.keys()))
+    _log_stock.info(
+        f"실재고 조회 완료: {len(stock_by_vid)}/{len(rows_by_vid)}개 vendorItemId"
+    )
+    await _record_vendor_item_prices(stock_by_vid)
 
-        # 쿠팡 API에서 실재고 조회
-        item_data = await get_vendor_item_stock(vendor_item_id)
+    alerts = []
+    pending_cell_updates: dict[str, object] = {}
+
+    for vendor_item_id, vid_rows in rows_by_vid.items():
+        item_data = stock_by_vid.get(vendor_item_id)
         if not item_data:
-            await asyncio.sleep(0.3)
             continue
 
-        # inventories API는 amountInStock 필드를 기본 재고로 사용
-        real_stock = item_data.get("amountInStock")
-        if real_stock is None:
-            real_stock = item_data.get("quantity")
-        if real_stock is None:
-            real_stock = item_data.get("maximumBuyCount", -1)
-        try:
-            real_stock = int(real_stock)
-        except (TypeError, ValueError):
-            real_stock = -1
+        first_row = vid_rows[0][1]
+        product_name = (
+            first_row[COL_PRODUCT_NAME - 1].strip()
+            if len(first_row) > COL_PRODUCT_NAME - 1
+            else ""
+        )
+        sale_statuses = [
+            row[COL_SALE_STATUS - 1].strip() if len(row) > COL_SALE_STATUS - 1 else ""
+            for _, row in vid_rows
+        ]
+        is_manual_stop = any(_is_manual_stop_status(s) for s in sale_statuses)
+        is_soldout_row = any(_is_soldout_status(s) for s in sale_statuses)
 
-        on_sale_raw = item_data.get("onSale", True)
-        if isinstance(on_sale_raw, str):
-            on_sale = on_sale_raw.strip().lower() in {"true", "1", "y", "yes"}
-        else:
-            on_sale = bool(on_sale_raw)
+        real_stock, on_sale = _stock_from_inventory(item_data)
         ts = _now_kst_str()
 
         prev_on_sale = _stock_status.get(vendor_item_id, None)
@@ -3855,11 +4885,14 @@ async def auto_stock_out_check():
             success = await update_sale_status(vendor_item_id, False)
             if success:
                 _stock_status[vendor_item_id] = False
-                _queue_sheet_cell_update(
-                    pending_cell_updates, i, COL_SALE_STATUS, "품절"
-                )
-                _queue_sheet_cell_update(pending_cell_updates, i, COL_STOCK, "0")
-                _queue_sheet_cell_update(pending_cell_updates, i, COL_UPDATED_AT, ts)
+                for i, row in vid_rows:
+                    _queue_changed_cell(
+                        pending_cell_updates, row, i, COL_SALE_STATUS, "품절"
+                    )
+                    _queue_changed_cell(pending_cell_updates, row, i, COL_STOCK, "0")
+                    _queue_sheet_cell_update(
+                        pending_cell_updates, i, COL_UPDATED_AT, ts
+                    )
                 alerts.append(
                     {"type": "품절", "name": product_name, "vid": vendor_item_id}
                 )
@@ -3876,13 +4909,16 @@ async def auto_stock_out_check():
             success = await update_sale_status(vendor_item_id, True)
             if success:
                 _stock_status[vendor_item_id] = True
-                _queue_sheet_cell_update(
-                    pending_cell_updates, i, COL_SALE_STATUS, "판매중"
-                )
-                _queue_sheet_cell_update(
-                    pending_cell_updates, i, COL_STOCK, str(real_stock)
-                )
-                _queue_sheet_cell_update(pending_cell_updates, i, COL_UPDATED_AT, ts)
+                for i, row in vid_rows:
+                    _queue_changed_cell(
+                        pending_cell_updates, row, i, COL_SALE_STATUS, "판매중"
+                    )
+                    _queue_changed_cell(
+                        pending_cell_updates, row, i, COL_STOCK, str(real_stock)
+                    )
+                    _queue_sheet_cell_update(
+                        pending_cell_updates, i, COL_UPDATED_AT, ts
+                    )
                 alerts.append(
                     {"type": "판매재개", "name": product_name, "stock": real_stock}
                 )
@@ -3896,9 +4932,8 @@ async def auto_stock_out_check():
         else:
             _stock_status[vendor_item_id] = on_sale
 
-        await asyncio.sleep(0.3)  # API 속도제한
-
     _flush_sheet_cell_updates(ws, pending_cell_updates)
+    job_metrics.add(items_processed=len(rows_by_vid), items_changed=len(alerts))
 
     if alerts:
         lines = []
@@ -3931,6 +4966,330 @@ async def auto_stock_out_check():
 # ──────────────────────────────────────────────
 
 SETTLEMENT_SHEET = "정산집계"
+SETTLEMENT_EXCLUDED_STATUSES = ("취소", "반품", "환불", ORDER_STATUS_PRICE_HOLD)
+_SETTLEMENT_SQL_CHUNK = 500
+# 평소에는 최근 월(취소/반품 등 상태 변경이 생기는 기간) + 새로 추가된 행만 미러와
+# 비교하고, 오래된 주문의 수정/삭제는 SETTLEMENT_FULL_SCAN_HOURS마다 전체 비교로 반영.
+SETTLEMENT_ACTIVE_DAYS = 62
+SETTLEMENT_FULL_SCAN_HOURS = _env_int("SETTLEMENT_FULL_SCAN_HOURS", 24)
+
+
+def _parse_settlement_records(
+    rows: list[list[str]], first_row: int = 1
+) -> dict[str, tuple]:
+    """주문시트 행 → {주문ID: (월, 상품명, 수량, 집계포함여부)}.
+
+    rows[0]은 시트의 first_row행. 같은 주문ID가 여러 행에 있으면 마지막 행을 사용한다.
+    """
+    records: dict[str, tuple] = {}
+    for row in rows[max(ORDER_START_ROW - first_row, 0) :]:
+        if not row or not row[COL_ORDER_ID - 1].strip():
+            continue
+
+        order_id = row[COL_ORDER_ID - 1].strip()
+        product = (
+            row[COL_ORDER_PRODUCT - 1].strip() if len(row) >= COL_ORDER_PRODUCT else ""
+        )
+        qty_str = row[COL_ORDER_QTY - 1].strip() if len(row) >= COL_ORDER_QTY else "1"
+        date_str = row[COL_ORDER_DATE - 1].strip() if len(row) >= COL_ORDER_DATE else ""
+        status = (
+            row[COL_ORDER_STATUS - 1].strip() if len(row) >= COL_ORDER_STATUS else ""
+        )
+
+        try:
+            qty = int(re.sub(r"[^0-9]", "", qty_str)) if qty_str else 1
+        except ValueError:
+            qty = 1
+
+        # 월 추출 (날짜 형식: YYYY-MM-DD 또는 YYYY-MM-DDTHH:MM:SS)
+        month_key = date_str[:7] if date_str else ""
+
+        # 취소/반품/환불 및 가격미달보류 제외
+        included = status not in SETTLEMENT_EXCLUDED_STATUSES
+        records[order_id] = (month_key, product, qty, included)
+    return records
+
+
+def _aggregate_settlement_in_memory(
+    records: dict[str, tuple],
+) -> tuple[dict[str, dict], dict[str, dict]]:
+    """DB를 쓸 수 없을 때의 전체 재집계 경로."""
+    monthly: dict[str, dict] = {}  # {"2025-01": {"count": N, "qty": M}}
+    by_product: dict[str, dict] = {}  # {product_name: {"count": N, "qty": M}}
+    for month_key, product, qty, included in records.values():
+        if not included:
+            continue
+        if month_key:
+            m = monthly.setdefault(month_key, {"count": 0, "qty": 0})
+            m["count"] += 1
+            m["qty"] += qty
+        if product:
+            p = by_product.setdefault(product, {"count": 0, "qty": 0})
+            p["count"] += 1
+            p["qty"] += qty
+    return monthly, by_product
+
+
+def _settlement_row_hash(record: tuple) -> str:
+    month_key, product, qty, included = record
+    raw = f"{month_key}\x1f{product}\x1f{qty}\x1f{int(included)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+async def _refresh_settlement_rollup(
+    conn, table: str, key_col: str, keys: set[str], now: str
+) -> None:
+    """변경된 키(월/상품)만 GROUP BY로 재계산해 롤업 테이블에 반영."""
+    keys = {k for k in keys if k}
+    key_list = sorted(keys)
+    for i in range(0, len(key_list), _SETTLEMENT_SQL_CHUNK):
+        chunk = key_list[i : i + _SETTLEMENT_SQL_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        await conn.execute(f"DELETE FROM {table} WHERE {key_col} IN ({marks})", chunk)
+        await conn.execute(
+            f"INSERT INTO {table}({key_col}, order_count, qty, updated_at) "
+            f"SELECT {key_col}, COUNT(*), SUM(qty), ? FROM settlement_orders "
+            f"WHERE included = 1 AND {key_col} IN ({marks}) GROUP BY {key_col}",
+            [now, *chunk],
+        )
+
+
+_SettlementMarker = tuple[int, str, int | None, str]
+
+
+async def _load_settlement_marker() -> _SettlementMarker | None:
+    """주문시트의 (마지막 동기화 행 수, 마지막 전체 비교 시각, 최근 구간 첫 행,
+    그 행의 주문ID). 없으면 None."""
+    async with db.get_read_conn() as conn:
+        async with conn.execute(
+            "SELECT last_row, full_scan_at, window_row, window_order_id"
+            " FROM settlement_sync_state WHERE sheet = ?",
+            (COUPANG_ORDER_SHEET,),
+        ) as cur:
+            row = await cur.fetchone()
+    return None if row is None else (row[0], row[1], row[2], row[3] or "")
+
+
+def _settlement_read_start(marker: _SettlementMarker | None) -> int:
+    """이번 실행에서 주문시트를 읽기 시작할 행. 1이면 전체 읽기 + 전체 비교."""
+    full_scan_before = (
+        datetime.now(KST) - timedelta(hours=SETTLEMENT_FULL_SCAN_HOURS)
+    ).isoformat()
+    if marker is None or marker[2] is None or marker[1] < full_scan_before:
+        return 1
+    return marker[2]
+
+
+def _settlement_tail_ok(tail: list[list[str]], marker: _SettlementMarker) -> bool:
+    """최근 구간부터 읽은 행이 저장된 위치와 맞는지 (위쪽 행 삭제/삽입·축소 감지)."""
+    last_row, _, window_row, window_order_id = marker
+    head = tail[0][COL_ORDER_ID - 1].strip() if tail and tail[0] else ""
+    return head == window_order_id and window_row - 1 + len(tail) >= last_row
+
+
+def _settlement_window_start(
+    rows: list[list[str]], active_month: str
+) -> tuple[int, str]:
+    """최근 월(또는 월 없음) 주문이 처음 나오는 (행 번호, 주문ID).
+
+    없으면 마지막 행 다음 행. 주문은 아래로 추가되므로 이후 행만 읽으면 된다.
+    """
+    for row_num, row in enumerate(rows[ORDER_START_ROW - 1 :], start=ORDER_START_ROW):
+        order_id = row[COL_ORDER_ID - 1].strip() if row else ""
+        if not order_id:
+            continue
+        date_str = row[COL_ORDER_DATE - 1].strip() if len(row) >= COL_ORDER_DATE else ""
+        if not date_str or date_str[:7] >= active_month:
+            return row_num, order_id
+    return max(len(rows) + 1, ORDER_START_ROW), ""
+
+
+def _settlement_scan_plan(
+    rows: list[list[str]], first_row: int, marker: _SettlementMarker | None
+) -> tuple[set[str] | None, _SettlementMarker]:
+    """이번 실행의 비교 범위와 저장할 새 marker를 정한다.
+
+    rows[0]은 시트의 first_row행이다. first_row가 1이면 전체 비교.
+    Returns: (새로 추가된 행의 주문ID — 전체 비교면 None, 새 marker)
+    """
+    total = first_row - 1 + len(rows)
+    if first_row == 1 or marker is None:
+        now = datetime.now(KST)
+        active_month = (now - timedelta(days=SETTLEMENT_ACTIVE_DAYS)).strftime("%Y-%m")
+        return None, (
+            total,
+            now.isoformat(),
+            *_settlement_window_start(rows, active_month),
+        )
+    last_row, full_scan_at, window_row, window_order_id = marker
+    new_order_ids = {
+        row[COL_ORDER_ID - 1].strip()
+        for row in rows[max(last_row - first_row + 1, 0) :]
+        if row and row[COL_ORDER_ID - 1].strip()
+    }
+    return new_order_ids, (total, full_scan_at, window_row, window_order_id)
+
+
+async def _select_settlement_mirror(
+    new_order_ids: set[str] | None, active_month: str
+) -> dict[str, tuple]:
+    """비교 범위에 드는 미러 행 {주문ID: (월, 상품명, row_hash)} (읽기 연결)."""
+    async with db.get_read_conn() as conn:
+        if new_order_ids is None:
+            cur = await conn.execute(
+                "SELECT order_id, month, product, row_hash FROM settlement_orders"
+            )
+            return {r[0]: (r[1], r[2], r[3]) for r in await cur.fetchall()}
+
+        cur = await conn.execute(
+            "SELECT order_id, month, product, row_hash FROM settlement_orders "
+            "WHERE month >= ? OR month = ''",
+            (active_month,),
+        )
+        existing = {r[0]: (r[1], r[2], r[3]) for r in await cur.fetchall()}
+        id_list = sorted(new_order_ids - existing.keys())
+        for i in range(0, len(id_list), _SETTLEMENT_SQL_CHUNK):
+            chunk = id_list[i : i + _SETTLEMENT_SQL_CHUNK]
+            cur = await conn.execute(
+                "SELECT order_id, month, product, row_hash FROM settlement_orders "
+                f"WHERE order_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            existing.update((r[0], (r[1], r[2], r[3])) for r in await cur.fetchall())
+        return existing
+
+
+async def _aggregate_settlement_via_mirror(
+    records: dict[str, tuple],
+    new_order_ids: set[str] | None = None,
+    marker: _SettlementMarker | None = None,
+) -> tuple[dict[str, dict], dict[str, dict]]:
+    """주문시트를 SQLite 미러(settlement_orders)와 비교해 변경분만 반영하고,
+    변경된 월/상품만 롤업을 재계산한 뒤 롤업 테이블을 반환한다.
+
+    new_order_ids가 None이면 전체 주문을 미러 전체와 비교한다. 아니면 최근
+    SETTLEMENT_ACTIVE_DAYS 안의 월·월 없음·새로 추가된 주문만 비교한다.
+    marker(_load_settlement_marker 형식)는 변경분과 같은 트랜잭션으로 저장된다.
+    """
+    now = datetime.now(KST).isoformat()
+    active_month = (
+        datetime.now(KST) - timedelta(days=SETTLEMENT_ACTIVE_DAYS)
+    ).strftime("%Y-%m")
+
+    # 미러 조회와 비교는 읽기 연결에서 — 쓰기 잠금은 트랜잭션 동안만 잡는다.
+    existing = await _select_settlement_mirror(new_order_ids, active_month)
+    if new_order_ids is None:
+        candidates = set(records)
+    else:
+        candidates = {
+            order_id
+            for order_id, (month_key, _, _, _) in records.items()
+            if month_key >= active_month or not month_key
+        }
+        candidates |= new_order_ids & records.keys()
+    candidates |= existing.keys()
+
+    upserts: list[tuple] = []
+    removed: list[str] = []
+    dirty_months: set[str] = set()
+    dirty_products: set[str] = set()
+    for order_id in candidates:
+        record = records.get(order_id)
+        prev = existing.get(order_id)
+        if record is None:
+            # 시트에서 사라진 주문
+            removed.append(order_id)
+            dirty_months.add(prev[0])
+            dirty_products.add(prev[1])
+            continue
+        row_hash = _settlement_row_hash(record)
+        if prev is not None:
+            if prev[2] == row_hash:
+                continue
+            dirty_months.add(prev[0])
+            dirty_products.add(prev[1])
+        month_key, product, qty, included = record
+        dirty_months.add(month_key)
+        dirty_products.add(product)
+        upserts.append(
+            (order_id, month_key, product, qty, int(included), row_hash, now)
+        )
+
+    if upserts or removed or marker is not None:
+        conn = db.get_conn()
+        async with db._write_lock:
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO settlement_orders"
+                    "(order_id, month, product, qty, included, row_hash, synced_at)"
+                    " VALUES (?,?,?,?,?,?,?)",
+                    upserts,
+                )
+                await conn.executemany(
+                    "DELETE FROM settlement_orders WHERE order_id = ?",
+                    [(order_id,) for order_id in removed],
+                )
+                await _refresh_settlement_rollup(
+                    conn, "settlement_monthly", "month", dirty_months, now
+                )
+                await _refresh_settlement_rollup(
+                    conn, "settlement_product", "product", dirty_products, now
+                )
+                if marker is not None:
+                    await conn.execute(
+                        "INSERT OR REPLACE INTO settlement_sync_state"
+                        "(sheet, last_row, full_scan_at, window_row,"
+                        " window_order_id, updated_at) VALUES (?,?,?,?,?,?)",
+                        (COUPANG_ORDER_SHEET, *marker, now),
+                    )
+                await conn.commit()
+            except Exception:
+                await conn.execute("ROLLBACK")
+                raise
+
+    _log_settlement.info(
+        f"주문 미러 동기화({'전체' if new_order_ids is None else '최근/신규'}): "
+        f"비교 {len(candidates)}건 / 변경 {len(upserts)}건 / 삭제 {len(removed)}건 / "
+        f"재집계 {len(dirty_months - {''})}개월"
+    )
+
+    async with db.get_read_conn() as conn:
+        cur = await conn.execute(
+            "SELECT month, order_count, qty FROM settlement_monthly"
+        )
+        monthly = {r[0]: {"count": r[1], "qty": r[2]} for r in await cur.fetchall()}
+        cur = await conn.execute(
+            "SELECT product, order_count, qty FROM settlement_product"
+        )
+        by_product = {r[0]: {"count": r[1], "qty": r[2]} for r in await cur.fetchall()}
+    return monthly, by_product
+
+
+def _write_settlement_diff(settle_ws, output: list[list[str]]) -> int:
+    """정산집계 탭을 기존 값과 비교해 바뀐 셀만 기록한다.
+
+    Returns: 변경된 셀 수 (남는 행 정리는 제외)
+    """
+    existing = settle_ws.get_all_values()
+    normalized_output = [row[:5] + [""] * max(0, 5 - len(row)) for row in output]
+    required_rows = len(normalized_output)
+
+    if settle_ws.row_count < required_rows:
+        settle_ws.add_rows(required_rows - settle_ws.row_count)
+
+    pending: dict[str, object] = {}
+    for row_idx, row in enumerate(normalized_output, start=1):
+        current = existing[row_idx - 1] if row_idx <= len(existing) else []
+        for col_idx, value in enumerate(row, start=1):
+            current_value = current[col_idx - 1] if col_idx <= len(current) else ""
+            if current_value != value:
+                _queue_sheet_cell_update(pending, row_idx, col_idx, value)
+    _flush_sheet_cell_updates(settle_ws, pending)
+
+    if len(existing) > required_rows:
+        settle_ws.batch_clear([f"A{required_rows + 1}:E{len(existing)}"])
+    return len(pending)
 
 
 async def update_settlement():
@@ -3939,6 +5298,12 @@ async def update_settlement():
     - 월별 총주문수 / 총매출 집계
     - 상품별 판매수량 / 매출 집계
     - 마지막 갱신 시각 기록
+
+    주문 행은 ops.db의 미러와 비교해 바뀐 주문만 반영하고, 영향받은 월/상품만
+    GROUP BY로 재집계한다. 평소에는 최근 월이 시작되는 행부터만 읽어 최근 월과
+    새로 추가된 행만 비교하고, 전체 읽기/비교는 SETTLEMENT_FULL_SCAN_HOURS마다
+    (또는 위쪽 행 변경 감지 시, DB를 쓸 수 없을 때) 한다. 시트에는 값이 달라진
+    셀만 쓴다.
     """
     _log_settlement.info(f"정산 집계 시작... ({_now_kst_str()})")
 
@@ -3946,11 +5311,33 @@ async def update_settlement():
         gc = gspread.authorize(_google_creds())
         sh = gc.open_by_key(COUPANG_SHEET_ID)
         order_ws = sh.worksheet(COUPANG_ORDER_SHEET)
-        rows = order_ws.get_all_values()
     except Exception as e:
         _log_settlement.error(f"주문시트 열기 실패: {e}")
         return
 
+    try:
+        marker = await _load_settlement_marker()
+        use_mirror = True
+    except Exception as e:
+        _log_settlement.warning(f"정산 동기화 위치 로드 실패 — 전체 재집계: {e}")
+        marker, use_mirror = None, False
+
+    # 최근 구간 첫 행부터만 읽고, 그 행이 저장된 주문이 아니면 전체 읽기
+    first_row = _settlement_read_start(marker) if use_mirror else 1
+    rows: list[list[str]] | None = None
+    try:
+        if first_row > 1:
+            last_col = rowcol_to_a1(1, COL_ORDER_DATE).rstrip("0123456789")
+            rows = order_ws.get(f"A{first_row}:{last_col}")
+            if not _settlement_tail_ok(rows, marker):
+                _log_settlement.info("주문시트 행 변경 감지 → 전체 비교")
+                first_row, rows = 1, None
+        if rows is None:
+            rows = order_ws.get_all_values()
+    except Exception as e:
+        _log_settlement.error(f"주문시트 읽기 실패: {e}")
+        return
+
     # 정산집계 탭 없으면 자동 생성
     try:
         settle_ws = sh.worksheet(SETTLEMENT_SHEET)
@@ -3958,53 +5345,27 @@ async def update_settlement():
         settle_ws = sh.add_worksheet(title=SETTLEMENT_SHEET, rows=500, cols=10)
         _log_settlement.info(f"'{SETTLEMENT_SHEET}' 탭 자동 생성")
 
-    # ── 주문 데이터 파싱 ──
-    data_rows = rows[ORDER_START_ROW - 1 :]
-
-    monthly: dict[str, dict] = {}  # {"2025-01": {"count": N, "total": M}}
-    by_product: dict[str, dict] = {}  # {product_name: {"count": N}}
-
-    for row in data_rows:
-        if not row or not row[COL_ORDER_ID - 1].strip():
-            continue
-
-        product = (
-            row[COL_ORDER_PRODUCT - 1].strip() if len(row) >= COL_ORDER_PRODUCT else ""
-        )
-        qty_str = row[COL_ORDER_QTY - 1].strip() if len(row) >= COL_ORDER_QTY else "1"
-        date_str = row[COL_ORDER_DATE - 1].strip() if len(row) >= COL_ORDER_DATE else ""
-        status = (
-            row[COL_ORDER_STATUS - 1].strip() if len(row) >= COL_ORDER_STATUS else ""
+    # ── 주문 데이터 파싱 + 집계 ──
+    try:
+        if not use_mirror:
+            raise RuntimeError("정산 동기화 위치 없음")
+        new_order_ids, next_marker = _settlement_scan_plan(rows, first_row, marker)
+        monthly, by_product = await _aggregate_settlement_via_mirror(
+            _parse_settlement_records(rows, first_row),
+            new_order_ids,
+            None if next_marker == marker else next_marker,
         )
-
-        # 취소/반품/환불 및 가격미달보류 제외
-        if status in ("취소", "반품", "환불", ORDER_STATUS_PRICE_HOLD):
-            continue
-
-        try:
-            qty = int(re.sub(r"[^0-9]", "", qty_str)) if qty_str else 1
-        except ValueError:
-            qty = 1
-
-        # 월 추출 (날짜 형식: YYYY-MM-DD 또는 YYYY-MM-DDTHH:MM:SS)
-        month_key = ""
-        if date_str:
+    except Exception as e:
+        _log_settlement.warning(f"DB 증분 집계 불가 — 전체 재집계로 대체: {e}")
+        if first_row > 1:
             try:
-                month_key = date_str[:7]  # YYYY-MM
-            except Exception:
-                pass
-
-        if month_key:
-            if month_key not in monthly:
-                monthly[month_key] = {"count": 0, "qty": 0}
-            monthly[month_key]["count"] += 1
-            monthly[month_key]["qty"] += qty
-
-        if product:
-            if product not in by_product:
-                by_product[product] = {"count": 0, "qty": 0}
-            by_product[product]["count"] += 1
-            by_product[product]["qty"] += qty
+                rows = order_ws.get_all_values()
+            except Exception as read_error:
+                _log_settlement.error(f"주문시트 읽기 실패: {read_error}")
+                return
+        monthly, by_product = _aggregate_settlement_in_memory(
+            _parse_settlement_records(rows)
+        )
 
     # ── 정산집계 탭 작성 ──
     output = []
@@ -4023,29 +5384,15 @@ async def update_settlement():
 
     # 상품별 집계
     output.append(["[상품별 집계]", "주문건수", "총수량", "", ""])
-    for product, data in sorted(by_product.items(), key=lambda x: -x[1]["qty"]):
+    for product, data in sorted(by_product.items(), key=lambda x: (-x[1]["qty"], x[0])):
         output.append([product, str(data["count"]), str(data["qty"]), "", ""])
 
-    # 시트 전체 갱신 (clear-then-write를 피해서 실패 시 기존 데이터 보존)
+    # 바뀐 셀만 갱신 (clear-then-write를 피해서 실패 시 기존 데이터 보존)
     try:
-        existing_data_rows = len(settle_ws.get_all_values())
-        normalized_output = [row[:5] + [""] * max(0, 5 - len(row)) for row in output]
-        required_rows = len(normalized_output)
-
-        if settle_ws.row_count < required_rows:
-            settle_ws.add_rows(required_rows - settle_ws.row_count)
-
-        settle_ws.update(
-            f"A1:E{required_rows}",
-            normalized_output,
-            value_input_option="USER_ENTERED",
-        )
-
-        if existing_data_rows > required_rows:
-            settle_ws.batch_clear([f"A{required_rows + 1}:E{existing_data_rows}"])
-
+        changed_cells = _write_settlement_diff(settle_ws, output)
         _log_settlement.info(
-            f"정산집계 갱신 완료 | 월별 {len(monthly)}개월 / 상품 {len(by_product)}종"
+            f"정산집계 갱신 완료 | 월별 {len(monthly)}개월 / 상품 {len(by_product)}종 "
+            f"| 변경 셀 {changed_cells}개"
         )
     except Exception as e:
         _log_settlement.error(f"시트 기록 실패: {e}")
@@ -4102,6 +5449,138 @@ _SOURCING_TAB_PRODUCT_COL = 7  # G열: 상품명
 _SOURCING_TAB_ORDER_ID_COL = 11  # K열: 쿠팡주문ID
 
 
+SOURCING_ORDER_FULL_SCAN_HOURS = _env_int("SOURCING_ORDER_FULL_SCAN_HOURS", 24)
+
+
+def _orderer_key(name: str) -> str:
+    """주문자/수신자 이름 비교 키 (공백 제거)."""
+    return re.sub(r"\s+", "", name or "")
+
+
+def _parse_sourcing_order_rows(
+    rows: list[list[str]], start_row: int
+) -> list[tuple[int, str, str, str]]:
+    """소싱처 탭 행 → (행번호, orderId, 이름키, 정규화 상품명).
+
+    orderId도 (이름, 상품명)도 없는 행은 아직 입력 중으로 보고 제외한다.
+    """
+    entries: list[tuple[int, str, str, str]] = []
+    for row_num, tab_row in enumerate(rows, start=start_row):
+        oid = (
+            tab_row[_SOURCING_TAB_ORDER_ID_COL - 1].strip()
+            if len(tab_row) >= _SOURCING_TAB_ORDER_ID_COL
+            else ""
+        )
+        if oid:
+            entries.append((row_num, oid, "", ""))
+            continue
+        # orderId 없는 행(수동 입력) → (이름, 상품명) 폴백
+        name = _orderer_key(
+            tab_row[_SOURCING_TAB_ORDERER_COL - 1]
+            if len(tab_row) >= _SOURCING_TAB_ORDERER_COL
+            else ""
+        )
+        product = _normalize_product_name(
+            tab_row[_SOURCING_TAB_PRODUCT_COL - 1]
+            if len(tab_row) >= _SOURCING_TAB_PRODUCT_COL
+            else ""
+        )
+        if name and product:
+            entries.append((row_num, "", name, product))
+    return entries
+
+
+def _read_sourcing_tabs(sh, start_rows: dict[str, int]) -> dict[str, list[list[str]]]:
+    """탭별 start_row 행부터 A~K열을 values.batchGet 1회로 읽는다."""
+    if not start_rows:
+        return {}
+    end_col = rowcol_to_a1(1, _SOURCING_TAB_ORDER_ID_COL).rstrip("0123456789")
+    tabs = list(start_rows)
+    ranges = [
+        "'{}'!A{}:{}".format(tab.replace("'", "''"), start_rows[tab], end_col)
+        for tab in tabs
+    ]
+    resp = sh.values_batch_get(ranges)
+    return {
+        tab: value_range.get("values", [])
+        for tab, value_range in zip(tabs, resp.get("valueRanges", []))
+    }
+
+
+async def _load_sourcing_tab_markers() -> (
+    dict[str, tuple[int, str, tuple[str, str, str] | None]] | None
+):
+    """탭별 (마지막 처리 행, 마지막 전체 스캔 시각, 그 행의 저장된 키).
+
+    DB를 쓸 수 없으면 None.
+    """
+    try:
+        async with db.get_read_conn() as conn:
+            async with conn.execute(
+                "SELECT s.tab, s.last_row, s.full_scan_at,"
+                " k.order_id, k.name, k.product_key"
+                " FROM sourcing_order_tab_state s"
+                " LEFT JOIN sourcing_order_keys k"
+                " ON k.tab = s.tab AND k.row_num = s.last_row"
+            ) as cur:
+                return {
+                    tab: (last_row, full_scan_at, None if oid is None else (oid, n, p))
+                    for tab, last_row, full_scan_at, oid, n, p in await cur.fetchall()
+                }
+    except Exception as e:
+        _log_order.warning(f"소싱처 탭 처리 위치 로드 실패 — 전체 스캔: {e}")
+        return None
+
+
+async def _save_sourcing_order_keys(
+    new_entries: dict[str, list[tuple[int, str, str, str]]],
+    markers: dict[str, tuple[int, str]],
+    full_scanned: set[str],
+) -> tuple[set[str], set[tuple[str, str]]] | None:
+    """새 행 키와 탭별 처리 위치를 한 트랜잭션으로 저장하고 전체 매칭 인덱스를 반환."""
+    now = datetime.now(KST).isoformat()
+    try:
+        conn = db.get_conn()
+        async with db._write_lock:
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                await conn.executemany(
+                    "DELETE FROM sourcing_order_keys WHERE tab = ?",
+                    [(tab,) for tab in full_scanned],
+                )
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO sourcing_order_keys"
+                    "(tab, row_num, order_id, name, product_key) VALUES (?,?,?,?,?)",
+                    [
+                        (tab, row_num, oid, name, product)
+                        for tab, entries in new_entries.items()
+                        for row_num, oid, name, product in entries
+                    ],
+                )
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO sourcing_order_tab_state"
+                    "(tab, last_row, full_scan_at, updated_at) VALUES (?,?,?,?)",
+                    [
+                        (tab, last_row, full_scan_at, now)
+                        for tab, (last_row, full_scan_at) in markers.items()
+                    ],
+                )
+                await conn.commit()
+            except Exception:
+                await conn.execute("ROLLBACK")
+                raise
+            async with conn.execute(
+                "SELECT order_id, name, product_key FROM sourcing_order_keys"
+            ) as cur:
+                rows = await cur.fetchall()
+    except Exception as e:
+        _log_order.warning(f"소싱처 주문 인덱스 저장 실패: {e}")
+        return None
+    order_id_set = {oid for oid, _, _ in rows if oid}
+    name_product_pairs = {(name, product) for oid, name, product in rows if not oid}
+    return order_id_set, name_product_pairs
+
+
 async def match_sourcing_orders_to_coupang() -> None:
     """소싱처 주문 ↔ 쿠팡 주문 매칭 → '주문완료' 처리.
 
@@ -4109,58 +5588,97 @@ async def match_sourcing_orders_to_coupang() -> None:
       1순위: orderId 정확 매칭 (소싱처 K열 ↔ 쿠팡 A열)
       2순위: (이름 + 상품명) 쌍 매칭 (수동 입력 건, K열 없는 행)
     이름만으로는 매칭하지 않아 동명이인 오매칭을 방지한다.
+
+    소싱처 탭은 batchGet 1회로 마지막 처리 행 이후만 읽고, 매칭 키는 ops.db에
+    누적한다. 기존 행 수정/삭제는 SOURCING_ORDER_FULL_SCAN_HOURS마다 전체
+    스캔으로 반영한다 (DB를 쓸 수 없으면 매번 전체 스캔).
     """
+    global _awaiting_invoice_rows
     _log_order.info(f"소싱처 주문 매칭 시작... ({_now_kst_str()})")
 
     try:
         gc = gspread.authorize(_google_creds())
         sh = gc.open_by_key(COUPANG_SHEET_ID)
+        existing_tabs = {ws.title for ws in sh.worksheets()}
     except Exception as e:
         _log_order.error(f"시트 열기 실패: {e}")
         return
 
-    # 1) 모든 소싱처 탭에서 매칭 인덱스 구축
-    order_id_set: set[str] = set()
-    name_product_pairs: set[tuple[str, str]] = set()
+    # 1) 소싱처 탭은 마지막 처리 행부터 batchGet 1회로 읽는다.
+    #    마지막 처리 행을 함께 읽어 저장된 키와 다르면(위쪽 행 삭제/이동) 전체 스캔.
+    tabs = [tab for tab in _SOURCING_ORDER_TABS if tab in existing_tabs]
+    stored_markers = await _load_sourcing_tab_markers()
+    now = datetime.now(KST)
+    full_scan_before = (
+        now - timedelta(hours=SOURCING_ORDER_FULL_SCAN_HOURS)
+    ).isoformat()
+    markers: dict[str, tuple[int, str]] = {}
+    sentinels: dict[str, tuple[str, str, str]] = {}
+    full_scanned: set[str] = set()
+    start_rows: dict[str, int] = {}
+    for tab in tabs:
+        last_row, full_scan_at, sentinel = (stored_markers or {}).get(
+            tab, (1, "", None)
+        )
+        if sentinel is None or not full_scan_at or full_scan_at < full_scan_before:
+            last_row, full_scan_at = 1, now.isoformat()
+            full_scanned.add(tab)
+        else:
+            sentinels[tab] = sentinel
+        markers[tab] = (last_row, full_scan_at)
+        start_rows[tab] = max(last_row, 2)  # 1행은 헤더
 
-    for tab_name in _SOURCING_ORDER_TABS:
-        try:
-            ws = sh.worksheet(tab_name)
-            tab_rows = ws.get_all_values()
-            for tab_row in tab_rows[1:]:  # 헤더 제외
-                oid = (
-                    tab_row[_SOURCING_TAB_ORDER_ID_COL - 1].strip()
-                    if len(tab_row) >= _SOURCING_TAB_ORDER_ID_COL
-                    else ""
-                )
-                if oid:
-                    order_id_set.add(oid)
-                else:
-                    # orderId 없는 행(수동 입력) → (이름, 상품명) 폴백
-                    name = (
-                        tab_row[_SOURCING_TAB_ORDERER_COL - 1].strip()
-                        if len(tab_row) >= _SOURCING_TAB_ORDERER_COL
-                        else ""
-                    )
-                    product = (
-                        tab_row[_SOURCING_TAB_PRODUCT_COL - 1].strip()
-                        if len(tab_row) >= _SOURCING_TAB_PRODUCT_COL
-                        else ""
-                    )
-                    if name and product:
-                        name_product_pairs.add((name, _normalize_product_name(product)))
-        except gspread.exceptions.WorksheetNotFound:
-            pass
-        except Exception as e:
-            _log_order.warning(f"'{tab_name}' 탭 읽기 실패: {e}")
+    try:
+        tab_rows = _read_sourcing_tabs(sh, start_rows)
+        shifted: dict[str, int] = {}
+        for tab, sentinel in sentinels.items():
+            head = _parse_sourcing_order_rows(
+                tab_rows.get(tab, [])[:1], start_rows[tab]
+            )
+            if not head or head[0][1:] != sentinel:
+                shifted[tab] = 2
+        if shifted:
+            _log_order.info(f"소싱처 탭 행 변경 감지 → 전체 스캔: {', '.join(shifted)}")
+            tab_rows.update(_read_sourcing_tabs(sh, shifted))
+            for tab in shifted:
+                start_rows[tab] = 2
+                markers[tab] = (1, now.isoformat())
+                full_scanned.add(tab)
+    except Exception as e:
+        _log_order.error(f"소싱처 탭 읽기 실패: {e}")
+        return
+
+    new_entries: dict[str, list[tuple[int, str, str, str]]] = {}
+    for tab in tabs:
+        entries = _parse_sourcing_order_rows(tab_rows.get(tab, []), start_rows[tab])
+        if tab not in full_scanned:
+            entries = [entry for entry in entries if entry[0] > markers[tab][0]]
+        new_entries[tab] = entries
+        # 입력 중인 끝 행은 다음 실행에서 다시 읽도록 완성된 마지막 행까지만 전진
+        if entries:
+            markers[tab] = (entries[-1][0], markers[tab][1])
+
+    if stored_markers is not None:
+        # 누적 인덱스를 저장하지 못하면 이번 실행은 건너뛰고 같은 위치부터 다시 읽는다.
+        index = await _save_sourcing_order_keys(new_entries, markers, full_scanned)
+        if index is None:
+            return
+    else:
+        index = (
+            {oid for es in new_entries.values() for _, oid, _, _ in es if oid},
+            {(n, p) for es in new_entries.values() for _, oid, n, p in es if not oid},
+        )
+    order_id_set, name_product_pairs = index
 
     if not order_id_set and not name_product_pairs:
         _log_order.warning("소싱처 매칭 대상 없음 → 스킵")
         return
 
     _log_order.info(
-        f"소싱처 인덱스 구축: orderId {len(order_id_set)}건, "
-        f"이름+상품 {len(name_product_pairs)}건"
+        f"소싱처 인덱스: orderId {len(order_id_set)}건, "
+        f"이름+상품 {len(name_product_pairs)}건 "
+        f"(신규 {sum(len(es) for es in new_entries.values())}행, "
+        f"전체 스캔 {len(full_scanned)}개 탭)"
     )
 
     # 2) 쿠팡주문관리 탭 읽기
@@ -4199,12 +5717,14 @@ async def match_sourcing_orders_to_coupang() -> None:
             matched_by_oid += 1
         # 2순위: (이름 + 상품명) 매칭
         elif recipient and product:
-            pair = (recipient, _normalize_product_name(product))
+            pair = (_orderer_key(recipient), _normalize_product_name(product))
             if pair in name_product_pairs:
                 _queue_sheet_cell_update(pending, row_idx, COL_ORDER_STATUS, "주문완료")
                 matched_by_name_product += 1
 
     if pending:
+        # 송장 입력 대기 행이 생겼으므로 발송 probe가 다시 시트를 읽게 한다.
+        _awaiting_invoice_rows = None
         _flush_sheet_cell_updates(order_ws, pending)
 
     total = matched_by_oid + matched_by_name_product
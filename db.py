@@ -1,36 +1,179 @@
 """
 db.py
-aiosqlite singleton connection, WAL mode, 7-table schema initialization.
+aiosqlite singleton connection, WAL mode, schema initialization.
 
 Dependency chain: config ← db (no other project imports)
 
 Public API:
-  open_db()    — connect, set WAL pragmas, init schema (idempotent)
+  open_db()    — connect, set WAL pragmas, init schema, open read pool (idempotent)
   close_db()   — close connection, set _conn to None (idempotent)
   get_conn()   — return live connection or raise RuntimeError
-  _write_lock  — asyncio.Lock for serializing writes
+  get_write_conn() — the single write connection (alias of get_conn)
+  get_read_conn()  — async context manager lending a read-only pooled connection
+  execute_write()  — queue a write for the group-commit writer, await lastrowid
+  intern_urls()    — {url: urls.id}, inserting unseen URLs
+  run_retention() — roll old log rows into daily tables, prune, vacuum
+  run_maintenance() — WAL checkpoint(TRUNCATE), PRAGMA optimize, size report
+  rollback_to()   — undo schema migrations newer than a version
+  job_run_stats() — per-job run/wait p50/p95 and counter totals from job_runs
+  _write_lock  — asyncio.Lock for serializing writes (multi-statement transactions)
 """
 
 import asyncio
+import hashlib
 import logging
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlparse
 
 import aiosqlite
 
-from config import DB_FILE
+from config import DB_FILE, settings
 
 logger = logging.getLogger("musinsa_bot.db")
 
 _conn: aiosqlite.Connection | None = None
 _write_lock = asyncio.Lock()
 
+# Read-only connections (own threads) so reads never queue behind the writer.
+READ_POOL_SIZE = settings.db_read_pool_size
+_readers: list[aiosqlite.Connection] = []
+_read_pool: asyncio.Queue[aiosqlite.Connection] | None = None
+
+# Group-commit writer: queued statements are committed together once the first
+# one has waited WRITE_GROUP_WINDOW_SECONDS or WRITE_GROUP_MAX_STATEMENTS pile up.
+WRITE_GROUP_WINDOW_SECONDS = 0.02
+WRITE_GROUP_MAX_STATEMENTS = 200
+_write_queue: "asyncio.Queue[_WriteRequest | None] | None" = None
+_writer_task: asyncio.Task | None = None
+_writer_stats = {"commits": 0, "statements": 0}
+
+# Migration backfills beyond their first chunk run in this task after open_db().
+_pending_backfills: list[tuple["Migration", str]] = []
+_backfill_task: asyncio.Task | None = None
+_backfills_stopping = False
+
 # ── Schema ────────────────────────────────────────────────────────────────────
 
 _SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS schema_version (
     version     INTEGER NOT NULL,
-    applied_at  TEXT    NOT NULL
+    applied_at  TEXT    NOT NULL,
+    name        TEXT,
+    checksum    TEXT
+);
+
+CREATE TABLE IF NOT EXISTS schema_backfills (
+    version     INTEGER PRIMARY KEY,
+    cursor      TEXT    NOT NULL,
+    chunks      INTEGER NOT NULL,
+    updated_at  TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS job_runs (
+    id          INTEGER PRIMARY KEY,
+    job_name    TEXT    NOT NULL,
+    started_at  TEXT    NOT NULL,
+    finished_at TEXT,
+    status      TEXT    NOT NULL,
+    error       TEXT
+);
+
+CREATE TABLE IF NOT EXISTS discovery_candidates (
+    id            INTEGER PRIMARY KEY,
+    source        TEXT    NOT NULL,
+    name          TEXT,
+    url           TEXT    NOT NULL,
+    price         INTEGER,
+    margin_pct    REAL,
+    score         REAL,
+    discovered_at TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS settlement_orders (
+    order_id    TEXT    PRIMARY KEY,
+    month       TEXT    NOT NULL,
+    product     TEXT    NOT NULL,
+    qty         INTEGER NOT NULL,
+    included    INTEGER NOT NULL,
+    row_hash    TEXT    NOT NULL,
+    synced_at   TEXT    NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_settlement_orders_month
+    ON settlement_orders(month);
+CREATE INDEX IF NOT EXISTS idx_settlement_orders_product
+    ON settlement_orders(product);
+
+CREATE TABLE IF NOT EXISTS settlement_monthly (
+    month       TEXT    PRIMARY KEY,
+    order_count INTEGER NOT NULL,
+    qty         INTEGER NOT NULL,
+    updated_at  TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sourcing_row_state (
+    row_key     TEXT    PRIMARY KEY,
+    input_hash  TEXT    NOT NULL,
+    synced_at   TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sourcing_order_keys (
+    tab         TEXT    NOT NULL,
+    row_num     INTEGER NOT NULL,
+    order_id    TEXT    NOT NULL,
+    name        TEXT    NOT NULL,
+    product_key TEXT    NOT NULL,
+    PRIMARY KEY (tab, row_num)
+);
+
+CREATE TABLE IF NOT EXISTS sourcing_order_tab_state (
+    tab          TEXT    PRIMARY KEY,
+    last_row     INTEGER NOT NULL,
+    full_scan_at TEXT    NOT NULL,
+    updated_at   TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sourcing_match_cache (
+    source_name   TEXT    NOT NULL,
+    index_version TEXT    NOT NULL,
+    vids          TEXT    NOT NULL,
+    matched_key   TEXT    NOT NULL,
+    score         INTEGER NOT NULL,
+    match_mode    TEXT    NOT NULL,
+    price_vid     TEXT    NOT NULL,
+    updated_at    TEXT    NOT NULL,
+    PRIMARY KEY (source_name, index_version)
+);
+
+CREATE TABLE IF NOT EXISTS sourcing_price_state (
+    row_key     TEXT    PRIMARY KEY,
+    min_price   INTEGER NOT NULL,
+    updated_at  TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS coupang_order_shipments (
+    order_id        TEXT    PRIMARY KEY,
+    shipment_box_id TEXT    NOT NULL,
+    vendor_item_id  TEXT    NOT NULL,
+    updated_at      TEXT    NOT NULL
 );
 
+CREATE TABLE IF NOT EXISTS settlement_product (
+    product     TEXT    PRIMARY KEY,
+    order_count INTEGER NOT NULL,
+    qty         INTEGER NOT NULL,
+    updated_at  TEXT    NOT NULL
+);
+"""
+
+
+# Schema v1 baseline: the original log tables, keyed by URL text. Created only
+# on a DB that has no schema_version yet; migration v4 moves them to url_id.
+_BASELINE_SQL = """
 CREATE TABLE IF NOT EXISTS price_state (
     url         TEXT    PRIMARY KEY,
     price       INTEGER,
@@ -62,26 +205,536 @@ CREATE TABLE IF NOT EXISTS adapter_runs (
     traceback   TEXT,
     run_at      TEXT    NOT NULL
 );
+"""
 
-CREATE TABLE IF NOT EXISTS job_runs (
+
+# ── Migrations ────────────────────────────────────────────────────────────────
+# Numbered steps applied in order on open; schema_version records each one with
+# its checksum. Never edit a released step — append a new version instead.
+
+BACKFILL_CHUNK_ROWS = 5000
+
+Backfill = Callable[[aiosqlite.Connection, str], Awaitable[str | None]]
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    """One numbered schema step.
+
+    sql runs in a single transaction together with its schema_version row.
+    backfill(conn, cursor) is then called repeatedly, one short transaction per
+    call, and returns the next cursor or None when done; the cursor is saved in
+    schema_backfills so an interrupted backfill resumes where it stopped. Only
+    the first call runs during open_db(); the rest runs in the background, so
+    later steps must not depend on the backfilled data.
+    down reverses sql for rollback_to().
+    """
+
+    version: int
+    name: str
+    sql: str
+    down: str = ""
+    backfill: Backfill | None = None
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.strip().encode("utf-8")).hexdigest()[:16]
+
+
+# ── URL interning ─────────────────────────────────────────────────────────────
+# Log tables reference urls(id) instead of repeating the URL text on every row.
+
+_URL_ID_CACHE_LIMIT = 50000
+_url_ids: dict[str, int] = {}
+
+# A known adapter name fills in a blank one but never overwrites it.
+_UPSERT_URL_SQL = """
+INSERT INTO urls(url, domain, adapter, created_at) VALUES (?, ?, ?, datetime('now'))
+ON CONFLICT(url) DO UPDATE SET adapter = excluded.adapter
+WHERE urls.adapter = '' AND excluded.adapter != ''
+"""
+
+# Schema v4 backfill stages: (table, chunk key, copy of legacy rows key in [?, ?]).
+# The bot keeps writing while these run, so a legacy row never replaces newer
+# state and legacy daily rollups are merged into the new ones.
+# price_checks_daily has no rowid and is copied in one chunk.
+_URL_ID_BACKFILL_STAGES = (
+    (
+        "price_state",
+        "rowid",
+        "INSERT OR IGNORE INTO price_state(url_id, price, updated_at) "
+        "SELECT u.id, l.price, l.updated_at FROM price_state_legacy l "
+        "JOIN urls u ON u.url = l.url WHERE l.rowid BETWEEN ? AND ?",
+    ),
+    (
+        "price_checks",
+        "id",
+        "INSERT OR REPLACE INTO price_checks(id, url_id, price, kind, checked_at) "
+        "SELECT l.id, u.id, l.price, l.kind, l.checked_at FROM price_checks_legacy l "
+        "JOIN urls u ON u.url = l.url WHERE l.id BETWEEN ? AND ?",
+    ),
+    (
+        "price_events",
+        "id",
+        "INSERT OR REPLACE INTO price_events"
+        "(id, url_id, old_price, new_price, event_type, detected_at) "
+        "SELECT l.id, u.id, l.old_price, l.new_price, l.event_type, l.detected_at "
+        "FROM price_events_legacy l "
+        "JOIN urls u ON u.url = l.url WHERE l.id BETWEEN ? AND ?",
+    ),
+    (
+        "adapter_runs",
+        "id",
+        "INSERT OR REPLACE INTO adapter_runs"
+        "(id, adapter, url_id, error, traceback, run_at) "
+        "SELECT l.id, l.adapter, u.id, l.error, l.traceback, l.run_at "
+        "FROM adapter_runs_legacy l "
+        "JOIN urls u ON u.url = l.url WHERE l.id BETWEEN ? AND ?",
+    ),
+    (
+        "price_checks_daily",
+        None,
+        "INSERT INTO price_checks_daily"
+        "(url_id, day, kind, checks, min_price, max_price) "
+        "SELECT u.id, l.day, l.kind, l.checks, l.min_price, l.max_price "
+        "FROM price_checks_daily_legacy l JOIN urls u ON u.url = l.url WHERE true "
+        "ON CONFLICT(url_id, day, kind) DO UPDATE SET "
+        "checks = checks + excluded.checks, "
+        "min_price = MIN(COALESCE(min_price, excluded.min_price), "
+        "COALESCE(excluded.min_price, min_price)), "
+        "max_price = MAX(COALESCE(max_price, excluded.max_price), "
+        "COALESCE(excluded.max_price, max_price))",
+    ),
+)
+
+
+def url_domain(url: str) -> str:
+    """Host part of a URL (lower-cased); "coupang" for coupang:* series keys."""
+    if url.startswith("coupang:"):
+        return "coupang"
+    try:
+        return (urlparse(url).netloc or "").lower()
+    except Exception:
+        return ""
+
+
+async def _backfill_url_ids(conn: aiosqlite.Connection, cursor: str) -> str | None:
+    """Copy one chunk of a *_legacy table into its url_id table (schema v4).
+
+    cursor is "<stage index>:<last key>"; a drained legacy table is dropped in
+    the same transaction that moves on to the next stage.
+    """
+    stage, _, last_key = (cursor or "0:0").partition(":")
+    index, last = int(stage), int(last_key or 0)
+    # Copy each remaining table's highest legacy id first so rows the bot logs
+    # meanwhile are numbered above it and no later chunk replaces them. This is
+    # idempotent and cheap, so every chunk repeats it rather than only the first.
+    for table, key, copy_sql in _URL_ID_BACKFILL_STAGES[index:]:
+        if key == "id":
+            await _copy_legacy_rows(
+                conn, table, key, copy_sql, "ORDER BY id DESC LIMIT 1", ()
+            )
+    while True:
+        table, key, copy_sql = _URL_ID_BACKFILL_STAGES[index]
+        if key is None:
+            keys = await _copy_legacy_rows(conn, table, key, copy_sql, "", ())
+        else:
+            keys = await _copy_legacy_rows(
+                conn,
+                table,
+                key,
+                copy_sql,
+                f"WHERE {key} > ? ORDER BY {key} LIMIT ?",
+                (last, BACKFILL_CHUNK_ROWS),
+            )
+        if key is not None and len(keys) == BACKFILL_CHUNK_ROWS:
+            return f"{index}:{keys[-1]}"
+
+        await conn.execute(f"DROP TABLE {table}_legacy")
+        index, last = index + 1, 0
+        if index == len(_URL_ID_BACKFILL_STAGES):
+            return None
+        if keys:
+            return f"{index}:0"
+        # Empty legacy tables (e.g. a fresh DB) are dropped in the same chunk.
+
+
+async def _copy_legacy_rows(
+    conn: aiosqlite.Connection,
+    table: str,
+    key: str | None,
+    copy_sql: str,
+    clause: str,
+    params: tuple,
+) -> list:
+    """Intern the URLs of the {table}_legacy rows selected by clause and copy them.
+
+    Returns: the copied rows' chunk keys in order (None for unkeyed tables).
+    """
+    adapter_col = "adapter" if table == "adapter_runs" else "''"
+    async with conn.execute(
+        f"SELECT {key or 'NULL'}, url, {adapter_col} FROM {table}_legacy {clause}",
+        params,
+    ) as cur:
+        rows = await cur.fetchall()
+    if not rows:
+        return []
+    await conn.executemany(
+        _UPSERT_URL_SQL,
+        {(url, url_domain(url), adapter) for _, url, adapter in rows},
+    )
+    if key is None:
+        await conn.execute(copy_sql)
+    else:
+        await conn.execute(copy_sql, (rows[0][0], rows[-1][0]))
+    return [row[0] for row in rows]
+
+
+_MIGRATIONS: list[Migration] = [
+    Migration(
+        version=2,
+        name="log_indexes_and_daily_rollups",
+        sql="""
+CREATE INDEX IF NOT EXISTS idx_price_checks_url_time
+    ON price_checks(url, checked_at, price);
+CREATE INDEX IF NOT EXISTS idx_price_events_url_time
+    ON price_events(url, detected_at);
+CREATE INDEX IF NOT EXISTS idx_job_runs_job_started
+    ON job_runs(job_name, started_at, status);
+CREATE INDEX IF NOT EXISTS idx_adapter_runs_adapter_time
+    ON adapter_runs(adapter, run_at);
+
+CREATE TABLE IF NOT EXISTS price_checks_daily (
+    url         TEXT    NOT NULL,
+    day         TEXT    NOT NULL,
+    kind        TEXT    NOT NULL,
+    checks      INTEGER NOT NULL,
+    min_price   INTEGER,
+    max_price   INTEGER,
+    PRIMARY KEY (url, day, kind)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS job_runs_daily (
+    job_name      TEXT    NOT NULL,
+    day           TEXT    NOT NULL,
+    status        TEXT    NOT NULL,
+    runs          INTEGER NOT NULL,
+    total_seconds REAL    NOT NULL,
+    PRIMARY KEY (job_name, day, status)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS adapter_runs_daily (
+    adapter     TEXT    NOT NULL,
+    day         TEXT    NOT NULL,
+    errors      INTEGER NOT NULL,
+    PRIMARY KEY (adapter, day)
+) WITHOUT ROWID;
+""",
+        down="""
+DROP INDEX IF EXISTS idx_price_checks_url_time;
+DROP INDEX IF EXISTS idx_price_events_url_time;
+DROP INDEX IF EXISTS idx_job_runs_job_started;
+DROP INDEX IF EXISTS idx_adapter_runs_adapter_time;
+DROP TABLE IF EXISTS price_checks_daily;
+DROP TABLE IF EXISTS job_runs_daily;
+DROP TABLE IF EXISTS adapter_runs_daily;
+""",
+    ),
+    Migration(
+        version=3,
+        name="price_series",
+        sql="""
+CREATE TABLE IF NOT EXISTS urls (
     id          INTEGER PRIMARY KEY,
-    job_name    TEXT    NOT NULL,
-    started_at  TEXT    NOT NULL,
-    finished_at TEXT,
-    status      TEXT    NOT NULL,
-    error       TEXT
+    url         TEXT    NOT NULL UNIQUE,
+    domain      TEXT    NOT NULL,
+    created_at  TEXT    NOT NULL
 );
 
-CREATE TABLE IF NOT EXISTS discovery_candidates (
-    id            INTEGER PRIMARY KEY,
-    source        TEXT    NOT NULL,
-    name          TEXT,
-    url           TEXT    NOT NULL,
-    price         INTEGER,
-    margin_pct    REAL,
-    score         REAL,
-    discovered_at TEXT    NOT NULL
+CREATE TABLE IF NOT EXISTS price_series (
+    url_id      INTEGER NOT NULL,
+    ts          INTEGER NOT NULL,
+    price       INTEGER,
+    PRIMARY KEY (url_id, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS price_series_hourly (
+    url_id      INTEGER NOT NULL,
+    bucket      INTEGER NOT NULL,
+    min_price   INTEGER,
+    max_price   INTEGER,
+    last_ts     INTEGER NOT NULL,
+    last_price  INTEGER,
+    samples     INTEGER NOT NULL,
+    PRIMARY KEY (url_id, bucket)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS price_series_daily (
+    url_id      INTEGER NOT NULL,
+    bucket      INTEGER NOT NULL,
+    min_price   INTEGER,
+    max_price   INTEGER,
+    last_ts     INTEGER NOT NULL,
+    last_price  INTEGER,
+    samples     INTEGER NOT NULL,
+    PRIMARY KEY (url_id, bucket)
+) WITHOUT ROWID;
+""",
+        down="""
+DROP TABLE IF EXISTS price_series_daily;
+DROP TABLE IF EXISTS price_series_hourly;
+DROP TABLE IF EXISTS price_series;
+DROP TABLE IF EXISTS urls;
+""",
+    ),
+    Migration(
+        version=4,
+        name="intern_log_urls",
+        sql="""
+ALTER TABLE urls ADD COLUMN adapter TEXT NOT NULL DEFAULT '';
+
+DROP INDEX IF EXISTS idx_price_checks_url_time;
+DROP INDEX IF EXISTS idx_price_events_url_time;
+DROP INDEX IF EXISTS idx_adapter_runs_adapter_time;
+
+ALTER TABLE price_state RENAME TO price_state_legacy;
+ALTER TABLE price_checks RENAME TO price_checks_legacy;
+ALTER TABLE price_events RENAME TO price_events_legacy;
+ALTER TABLE adapter_runs RENAME TO adapter_runs_legacy;
+ALTER TABLE price_checks_daily RENAME TO price_checks_daily_legacy;
+
+CREATE TABLE price_state (
+    url_id      INTEGER PRIMARY KEY REFERENCES urls(id),
+    price       INTEGER,
+    updated_at  TEXT    NOT NULL
+);
+
+CREATE TABLE price_checks (
+    id          INTEGER PRIMARY KEY,
+    url_id      INTEGER NOT NULL REFERENCES urls(id),
+    price       INTEGER,
+    kind        TEXT    NOT NULL,
+    checked_at  TEXT    NOT NULL
+);
+
+CREATE TABLE price_events (
+    id          INTEGER PRIMARY KEY,
+    url_id      INTEGER NOT NULL REFERENCES urls(id),
+    old_price   INTEGER,
+    new_price   INTEGER,
+    event_type  TEXT    NOT NULL,
+    detected_at TEXT    NOT NULL
+);
+
+CREATE TABLE adapter_runs (
+    id          INTEGER PRIMARY KEY,
+    adapter     TEXT    NOT NULL,
+    url_id      INTEGER NOT NULL REFERENCES urls(id),
+    error       TEXT,
+    traceback   TEXT,
+    run_at      TEXT    NOT NULL
+);
+
+CREATE TABLE price_checks_daily (
+    url_id      INTEGER NOT NULL,
+    day         TEXT    NOT NULL,
+    kind        TEXT    NOT NULL,
+    checks      INTEGER NOT NULL,
+    min_price   INTEGER,
+    max_price   INTEGER,
+    PRIMARY KEY (url_id, day, kind)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_price_checks_url_time
+    ON price_checks(url_id, checked_at, price);
+CREATE INDEX idx_price_events_url_time
+    ON price_events(url_id, detected_at);
+CREATE INDEX idx_adapter_runs_adapter_time
+    ON adapter_runs(adapter, run_at);
+""",
+        # Rows not yet backfilled are still in the *_legacy tables; merge both.
+        down="""
+CREATE TABLE IF NOT EXISTS price_state_legacy (
+    url         TEXT    PRIMARY KEY,
+    price       INTEGER,
+    updated_at  TEXT    NOT NULL
+);
+INSERT OR REPLACE INTO price_state_legacy(url, price, updated_at)
+SELECT u.url, s.price, s.updated_at FROM price_state s JOIN urls u ON u.id = s.url_id;
+DROP TABLE price_state;
+ALTER TABLE price_state_legacy RENAME TO price_state;
+
+CREATE TABLE IF NOT EXISTS price_checks_legacy (
+    id          INTEGER PRIMARY KEY,
+    url         TEXT    NOT NULL,
+    price       INTEGER,
+    kind        TEXT    NOT NULL,
+    checked_at  TEXT    NOT NULL
+);
+INSERT OR REPLACE INTO price_checks_legacy(id, url, price, kind, checked_at)
+SELECT c.id, u.url, c.price, c.kind, c.checked_at
+FROM price_checks c JOIN urls u ON u.id = c.url_id;
+DROP TABLE price_checks;
+ALTER TABLE price_checks_legacy RENAME TO price_checks;
+
+CREATE TABLE IF NOT EXISTS price_events_legacy (
+    id          INTEGER PRIMARY KEY,
+    url         TEXT    NOT NULL,
+    old_price   INTEGER,
+    new_price   INTEGER,
+    event_type  TEXT    NOT NULL,
+    detected_at TEXT    NOT NULL
 );
+INSERT OR REPLACE INTO price_events_legacy
+    (id, url, old_price, new_price, event_type, detected_at)
+SELECT e.id, u.url, e.old_price, e.new_price, e.event_type, e.detected_at
+FROM price_events e JOIN urls u ON u.id = e.url_id;
+DROP TABLE price_events;
+ALTER TABLE price_events_legacy RENAME TO price_events;
+
+CREATE TABLE IF NOT EXISTS adapter_runs_legacy (
+    id          INTEGER PRIMARY KEY,
+    adapter     TEXT    NOT NULL,
+    url         TEXT    NOT NULL,
+    error       TEXT,
+    traceback   TEXT,
+    run_at      TEXT    NOT NULL
+);
+INSERT OR REPLACE INTO adapter_runs_legacy(id, adapter, url, error, traceback, run_at)
+SELECT a.id, a.adapter, u.url, a.error, a.traceback, a.run_at
+FROM adapter_runs a JOIN urls u ON u.id = a.url_id;
+DROP TABLE adapter_runs;
+ALTER TABLE adapter_runs_legacy RENAME TO adapter_runs;
+
+CREATE TABLE IF NOT EXISTS price_checks_daily_legacy (
+    url         TEXT    NOT NULL,
+    day         TEXT    NOT NULL,
+    kind        TEXT    NOT NULL,
+    checks      INTEGER NOT NULL,
+    min_price   INTEGER,
+    max_price   INTEGER,
+    PRIMARY KEY (url, day, kind)
+) WITHOUT ROWID;
+INSERT OR REPLACE INTO price_checks_daily_legacy
+    (url, day, kind, checks, min_price, max_price)
+SELECT u.url, d.day, d.kind, d.checks, d.min_price, d.max_price
+FROM price_checks_daily d JOIN urls u ON u.id = d.url_id;
+DROP TABLE price_checks_daily;
+ALTER TABLE price_checks_daily_legacy RENAME TO price_checks_daily;
+
+CREATE INDEX IF NOT EXISTS idx_price_checks_url_time
+    ON price_checks(url, checked_at, price);
+CREATE INDEX IF NOT EXISTS idx_price_events_url_time
+    ON price_events(url, detected_at);
+CREATE INDEX IF NOT EXISTS idx_adapter_runs_adapter_time
+    ON adapter_runs(adapter, run_at);
+
+ALTER TABLE urls DROP COLUMN adapter;
+""",
+        backfill=_backfill_url_ids,
+    ),
+    Migration(
+        version=5,
+        name="job_run_metrics",
+        sql="""
+ALTER TABLE job_runs ADD COLUMN lane TEXT;
+ALTER TABLE job_runs ADD COLUMN wait_ms INTEGER;
+ALTER TABLE job_runs ADD COLUMN run_ms INTEGER;
+ALTER TABLE job_runs ADD COLUMN items_processed INTEGER;
+ALTER TABLE job_runs ADD COLUMN items_changed INTEGER;
+ALTER TABLE job_runs ADD COLUMN api_calls INTEGER;
+ALTER TABLE job_runs ADD COLUMN sheet_calls INTEGER;
+""",
+        down="""
+ALTER TABLE job_runs DROP COLUMN sheet_calls;
+ALTER TABLE job_runs DROP COLUMN api_calls;
+ALTER TABLE job_runs DROP COLUMN items_changed;
+ALTER TABLE job_runs DROP COLUMN items_processed;
+ALTER TABLE job_runs DROP COLUMN run_ms;
+ALTER TABLE job_runs DROP COLUMN wait_ms;
+ALTER TABLE job_runs DROP COLUMN lane;
+""",
+    ),
+    Migration(
+        version=6,
+        name="settlement_sync_state",
+        sql="""
+CREATE TABLE IF NOT EXISTS settlement_sync_state (
+    sheet        TEXT    PRIMARY KEY,
+    last_row     INTEGER NOT NULL,
+    full_scan_at TEXT    NOT NULL,
+    updated_at   TEXT    NOT NULL
+);
+""",
+        down="""
+DROP TABLE IF EXISTS settlement_sync_state;
+""",
+    ),
+    Migration(
+        version=7,
+        name="import_progress",
+        sql="""
+CREATE TABLE IF NOT EXISTS import_progress (
+    source      TEXT    PRIMARY KEY,
+    fingerprint TEXT    NOT NULL,
+    items       INTEGER NOT NULL,
+    done        INTEGER NOT NULL,
+    updated_at  TEXT    NOT NULL
+);
+""",
+        down="""
+DROP TABLE IF EXISTS import_progress;
+""",
+    ),
+    Migration(
+        version=8,
+        name="settlement_sync_window",
+        sql="""
+ALTER TABLE settlement_sync_state ADD COLUMN window_row INTEGER;
+ALTER TABLE settlement_sync_state ADD COLUMN window_order_id TEXT;
+""",
+        down="""
+ALTER TABLE settlement_sync_state DROP COLUMN window_order_id;
+ALTER TABLE settlement_sync_state DROP COLUMN window_row;
+""",
+    ),
+]
+
+# Rollups add to existing daily rows, so retention can fold and delete a table
+# batch by batch (rows up to a rowid bound) and a re-run after a partial prune
+# is safe.
+RETENTION_BATCH_ROWS = 5000
+
+_ROLLUP_PRICE_CHECKS_SQL = """
+INSERT INTO price_checks_daily(url_id, day, kind, checks, min_price, max_price)
+SELECT url_id, date(checked_at), kind, COUNT(*), MIN(price), MAX(price)
+FROM price_checks WHERE checked_at < date('now', ?) AND rowid <= ?
+GROUP BY url_id, date(checked_at), kind
+ON CONFLICT(url_id, day, kind) DO UPDATE SET
+    checks = checks + excluded.checks,
+    min_price = MIN(COALESCE(min_price, excluded.min_price),
+                    COALESCE(excluded.min_price, min_price)),
+    max_price = MAX(COALESCE(max_price, excluded.max_price),
+                    COALESCE(excluded.max_price, max_price))
+"""
+
+_ROLLUP_JOB_RUNS_SQL = """
+INSERT INTO job_runs_daily(job_name, day, status, runs, total_seconds)
+SELECT job_name, date(started_at), status, COUNT(*),
+       COALESCE(SUM((julianday(finished_at) - julianday(started_at)) * 86400), 0)
+FROM job_runs WHERE started_at < date('now', ?) AND rowid <= ?
+GROUP BY job_name, date(started_at), status
+ON CONFLICT(job_name, day, status) DO UPDATE SET
+    runs = runs + excluded.runs,
+    total_seconds = total_seconds + excluded.total_seconds
+"""
+
+_ROLLUP_ADAPTER_RUNS_SQL = """
+INSERT INTO adapter_runs_daily(adapter, day, errors)
+SELECT adapter, date(run_at), COUNT(*)
+FROM adapter_runs WHERE run_at < date('now', ?) AND rowid <= ?
+GROUP BY adapter, date(run_at)
+ON CONFLICT(adapter, day) DO UPDATE SET errors = errors + excluded.errors
 """
 
 
@@ -91,25 +744,83 @@ CREATE TABLE IF NOT EXISTS discovery_candidates (
 async def open_db() -> None:
     """Connect to DB_FILE, set WAL pragmas, and initialise schema.
 
+    Pending migrations are applied before this returns, but a backfill only
+    runs its first chunk here; the rest continues in a background task (see
+    wait_for_backfills()) and resumes from its saved cursor after a restart.
     Idempotent: calling open_db() when already open is a no-op.
     """
-    global _conn
+    global _conn, _backfill_task
     if _conn is not None:
         return
 
     _conn = await aiosqlite.connect(DB_FILE)
+    _url_ids.clear()
 
     # Pragmas MUST be set before anything else (WAL, foreign keys, timeouts).
+    # auto_vacuum only takes effect on a new, empty DB file.
+    await _conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
     await _conn.execute("PRAGMA journal_mode=WAL")
-    await _conn.execute("PRAGMA synchronous=NORMAL")
     await _conn.execute("PRAGMA foreign_keys=ON")
-    await _conn.execute("PRAGMA busy_timeout=10000")
+    for pragma in _connection_pragmas(read_only=False):
+        await _conn.execute(pragma)
     await _conn.commit()
 
     await init_schema()
+    await _open_read_pool()
+    if _pending_backfills:
+        _backfill_task = asyncio.create_task(
+            _run_pending_backfills(_conn, list(_pending_backfills))
+        )
     logger.info("DB opened: %s", DB_FILE)
 
 
+def _connection_pragmas(read_only: bool) -> list[str]:
+    """Per-connection pragma profile from settings (DB_* env vars)."""
+    pragmas = [
+        f"PRAGMA busy_timeout={settings.db_busy_timeout_ms}",
+        f"PRAGMA cache_size={-settings.db_cache_size_kib}",
+        f"PRAGMA mmap_size={settings.db_mmap_size_mib * 1024 * 1024}",
+        f"PRAGMA temp_store={settings.db_temp_store}",
+    ]
+    if read_only:
+        pragmas.insert(0, "PRAGMA query_only=ON")
+    else:
+        # WAL growth is bounded by the autocheckpoint plus journal_size_limit,
+        # which truncates the -wal file back down after each checkpoint.
+        pragmas += [
+            f"PRAGMA synchronous={settings.db_synchronous}",
+            f"PRAGMA wal_autocheckpoint={settings.db_wal_autocheckpoint_pages}",
+            "PRAGMA journal_size_limit="
+            f"{settings.db_journal_size_limit_mib * 1024 * 1024}",
+        ]
+    return pragmas
+
+
+async def _open_read_pool() -> None:
+    """Open READ_POOL_SIZE query_only connections (after the schema exists)."""
+    global _read_pool
+    await _close_read_pool()  # leftovers if _conn was reset without close_db()
+    _read_pool = asyncio.Queue()
+    for _ in range(READ_POOL_SIZE):
+        reader = await aiosqlite.connect(DB_FILE)
+        for pragma in _connection_pragmas(read_only=True):
+            await reader.execute(pragma)
+        _readers.append(reader)
+        _read_pool.put_nowait(reader)
+
+
+async def _close_read_pool() -> None:
+    global _read_pool
+    readers = list(_readers)
+    _readers.clear()
+    _read_pool = None
+    for reader in readers:
+        try:
+            await reader.close()
+        except Exception as exc:
+            logger.warning("DB reader close failed: %s", exc)
+
+
 async def close_db() -> None:
     """Close the DB connection and reset _conn to None.
 
@@ -118,11 +829,40 @@ async def close_db() -> None:
     global _conn
     if _conn is None:
         return
+    await _stop_backfills()
+    await _stop_writer()
+    await _close_read_pool()
     await _conn.close()
     _conn = None
+    _url_ids.clear()
     logger.info("DB closed")
 
 
+async def wait_for_backfills() -> None:
+    """Wait until the background backfills started by open_db() have stopped.
+
+    A failed chunk is logged, not raised; its backfill resumes on the next open.
+    """
+    task = _backfill_task
+    if task is not None and task.get_loop() is asyncio.get_running_loop():
+        await task
+
+
+async def _stop_backfills() -> None:
+    """Stop the background backfills after their current chunk."""
+    global _backfill_task, _backfills_stopping
+    task, _backfill_task = _backfill_task, None
+    if task is None or task.done():
+        return
+    if task.get_loop() is not asyncio.get_running_loop():
+        return  # left over from another event loop (tests)
+    _backfills_stopping = True
+    try:
+        await task
+    finally:
+        _backfills_stopping = False
+
+
 def get_conn() -> aiosqlite.Connection:
     """Return the active DB connection.
 
@@ -134,16 +874,665 @@ def get_conn() -> aiosqlite.Connection:
     return _conn
 
 
+def get_write_conn() -> aiosqlite.Connection:
+    """Return the single write connection (same as get_conn()).
+
+    Writes still go through _write_lock + BEGIN IMMEDIATE.
+    """
+    return get_conn()
+
+
+@asynccontextmanager
+async def get_read_conn() -> AsyncIterator[aiosqlite.Connection]:
+    """Borrow a read-only connection from the pool for the duration of the block.
+
+    WAL readers see the last committed snapshot and never wait on _write_lock.
+    Falls back to the write connection when the pool is not open.
+
+    Raises:
+        RuntimeError: if open_db() has not been called yet.
+    """
+    conn = get_conn()
+    pool = _read_pool
+    if pool is None or not _readers:
+        yield conn
+        return
+    reader = await pool.get()
+    try:
+        yield reader
+    finally:
+        if reader in _readers:
+            pool.put_nowait(reader)
+
+
+async def fetch_with_legacy(table: str, sql: str, legacy_sql: str) -> list[tuple]:
+    """Rows of legacy_sql while {table}_legacy still exists, then rows of sql.
+
+    Until the schema v4 backfill drops a *_legacy table, part of the log
+    table's rows still live there (copied rows stay until the drop). Both
+    queries read one snapshot, so callers keyed by URL let url_id rows win.
+    """
+    async with get_read_conn() as conn:
+        snapshot = conn is not _conn  # never open a transaction on the writer
+        if snapshot:
+            await conn.execute("BEGIN")
+        try:
+            async with conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                (f"{table}_legacy",),
+            ) as cur:
+                pending = await cur.fetchone() is not None
+            rows: list[tuple] = []
+            if pending:
+                async with conn.execute(legacy_sql) as cur:
+                    rows += await cur.fetchall()
+            async with conn.execute(sql) as cur:
+                rows += await cur.fetchall()
+        finally:
+            if snapshot:
+                await conn.rollback()
+    return rows
+
+
+# ── Group-commit writer ───────────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class _WriteRequest:
+    sql: str
+    params: Any
+    many: bool
+    future: asyncio.Future
+
+
+async def execute_write(sql: str, params: tuple | list = ()) -> int | None:
+    """Queue one write statement and wait until its group is committed.
+
+    Statements from all callers are committed together by a single writer task
+    (one BEGIN IMMEDIATE ... COMMIT per group). Each statement runs in its own
+    savepoint, so a failing statement raises for its caller only.
+    Must not be awaited while holding _write_lock (the writer takes it).
+
+    Returns: cursor.lastrowid
+    Raises:
+        RuntimeError: if open_db() has not been called yet.
+    """
+    return await _enqueue_write(sql, params, many=False)
+
+
+async def execute_write_many(sql: str, seq_of_params: list) -> int:
+    """executemany() variant of execute_write(); all rows commit atomically.
+
+    Returns: cursor.rowcount
+    """
+    return await _enqueue_write(sql, list(seq_of_params), many=True)
+
+
+async def intern_urls(urls, adapter: str = "") -> dict[str, int]:
+    """Return {url: urls.id} for urls, inserting the ones not seen before.
+
+    Ids are cached for the life of the connection. adapter, when given, is
+    recorded for new URLs and fills in URLs stored without one.
+    """
+    wanted = [u for u in dict.fromkeys(urls) if u]
+    missing = [u for u in wanted if u not in _url_ids]
+    if missing:
+        found = await _select_url_ids(missing)
+        pending = missing if adapter else [u for u in missing if u not in found]
+        if pending:
+            await execute_write_many(
+                _UPSERT_URL_SQL, [(u, url_domain(u), adapter) for u in pending]
+            )
+            found.update(await _select_url_ids([u for u in pending if u not in found]))
+        if len(_url_ids) + len(found) > _URL_ID_CACHE_LIMIT:
+            _url_ids.clear()
+        _url_ids.update(found)
+    return {u: _url_ids[u] for u in wanted if u in _url_ids}
+
+
+async def _select_url_ids(urls: list[str]) -> dict[str, int]:
+    found: dict[str, int] = {}
+    async with get_read_conn() as conn:
+        for start in range(0, len(urls), 500):
+            chunk = urls[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            async with conn.execute(
+                f"SELECT url, id FROM urls WHERE url IN ({placeholders})", chunk
+            ) as cursor:
+                found.update({url: url_id for url, url_id in await cursor.fetchall()})
+    return found
+
+
+def writer_stats() -> dict[str, int]:
+    """Commits and statements handled by the group-commit writer so far."""
+    return dict(_writer_stats)
+
+
+async def _enqueue_write(sql: str, params: Any, *, many: bool) -> Any:
+    global _write_queue, _writer_task
+    get_conn()  # fail fast when the DB is closed
+    loop = asyncio.get_running_loop()
+    if (
+        _write_queue is None
+        or _writer_task is None
+        or _writer_task.done()
+        or _writer_task.get_loop() is not loop
+    ):
+        _write_queue = asyncio.Queue()
+        _writer_task = loop.create_task(_writer_loop(_write_queue))
+    future = loop.create_future()
+    _write_queue.put_nowait(_WriteRequest(sql, params, many, future))
+    return await future
+
+
+async def _writer_loop(queue: "asyncio.Queue[_WriteRequest | None]") -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        first = await queue.get()
+        if first is None:
+            return
+        batch = [first]
+        deadline = loop.time() + WRITE_GROUP_WINDOW_SECONDS
+        stop = False
+        while len(batch) < WRITE_GROUP_MAX_STATEMENTS:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except TimeoutError:
+                    break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        await _commit_group(batch)
+        if stop:
+            return
+
+
+async def _commit_group(batch: list[_WriteRequest]) -> None:
+    """Run a group in one transaction; resolve each caller's future after COMMIT."""
+    results: list[tuple[bool, Any]] = []
+    try:
+        conn = get_conn()
+        async with _write_lock:
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                for req in batch:
+                    if req.future.cancelled():
+                        results.append((True, None))
+                        continue
+                    await conn.execute("SAVEPOINT group_write")
+                    try:
+                        if req.many:
+                            cursor = await conn.executemany(req.sql, req.params)
+                            value = cursor.rowcount
+                        else:
+                            cursor = await conn.execute(req.sql, req.params)
+                            value = cursor.lastrowid
+                        await conn.execute("RELEASE group_write")
+                        results.append((True, value))
+                    except Exception as exc:
+                        await conn.execute("ROLLBACK TO group_write")
+                        await conn.execute("RELEASE group_write")
+                        results.append((False, exc))
+                await conn.commit()
+            except Exception:
+                if conn.in_transaction:
+                    await conn.rollback()
+                raise
+    except Exception as exc:
+        for req in batch:
+            if not req.future.done():
+                req.future.set_exception(exc)
+        return
+
+    _writer_stats["commits"] += 1
+    _writer_stats["statements"] += len(batch)
+    for req, (ok, value) in zip(batch, results):
+        if req.future.done():
+            continue
+        if ok:
+            req.future.set_result(value)
+        else:
+            req.future.set_exception(value)
+
+
+async def _stop_writer() -> None:
+    """Drain queued writes and stop the writer task (called by close_db())."""
+    global _write_queue, _writer_task
+    queue, task = _write_queue, _writer_task
+    _write_queue = _writer_task = None
+    if task is None or task.done():
+        return
+    if task.get_loop() is not asyncio.get_running_loop():
+        return  # left over from another event loop (tests); nothing to drain
+    queue.put_nowait(None)
+    await task
+
+
 async def init_schema() -> None:
-    """Create all 7 tables (CREATE TABLE IF NOT EXISTS) and seed schema_version.
+    """Create all tables (CREATE TABLE IF NOT EXISTS) and seed schema_version.
 
     Safe to call on an already-initialized DB — all statements are idempotent.
     """
     conn = get_conn()
     await conn.executescript(_SCHEMA_SQL)
-    # Seed schema_version=1 if the table is empty.
+    # Seed schema_version=1 with the v1 baseline if the table is empty (the
+    # table has no unique key, so INSERT OR IGNORE would add a row on every
+    # restart). Migrated DBs never see the baseline DDL again.
+    async with conn.execute("SELECT 1 FROM schema_version LIMIT 1") as cursor:
+        seeded = await cursor.fetchone() is not None
+    if not seeded:
+        await conn.executescript(
+            f"BEGIN IMMEDIATE;\n{_BASELINE_SQL}\n"
+            "INSERT INTO schema_version(version, applied_at) "
+            "VALUES (1, datetime('now'));\nCOMMIT;"
+        )
+    await _apply_migrations(conn)
+
+
+async def _ensure_schema_version_columns(conn: aiosqlite.Connection) -> None:
+    """Add name/checksum columns to a schema_version table from before them."""
+    async with conn.execute("PRAGMA table_info(schema_version)") as cursor:
+        columns = {row[1] for row in await cursor.fetchall()}
+    for column in ("name", "checksum"):
+        if column not in columns:
+            await conn.execute(f"ALTER TABLE schema_version ADD COLUMN {column} TEXT")
+    await conn.commit()
+
+
+async def _apply_migrations(conn: aiosqlite.Connection) -> None:
+    """Apply pending _MIGRATIONS steps in version order.
+
+    Already-applied steps are checked against their stored checksum; rows written
+    before checksums existed are filled in. Raises RuntimeError if a released
+    step's SQL was edited.
+    A backfill runs one chunk here; if more remain it is queued in
+    _pending_backfills for open_db() to finish in the background.
+    """
+    _pending_backfills.clear()
+    await _ensure_schema_version_columns(conn)
+    async with conn.execute("SELECT version, checksum FROM schema_version") as cursor:
+        applied = {row[0]: row[1] for row in await cursor.fetchall()}
+    async with conn.execute("SELECT version, cursor FROM schema_backfills") as cursor:
+        backfills = {row[0]: row[1] for row in await cursor.fetchall()}
+
+    for migration in sorted(_MIGRATIONS, key=lambda m: m.version):
+        if migration.version in applied:
+            stored = applied[migration.version]
+            if stored is None:
+                await conn.execute(
+                    "UPDATE schema_version SET name=?, checksum=? WHERE version=?",
+                    (migration.name, migration.checksum, migration.version),
+                )
+                await conn.commit()
+            elif stored != migration.checksum:
+                raise RuntimeError(
+                    f"schema migration {migration.version} ({migration.name}) "
+                    f"checksum mismatch: applied {stored}, code {migration.checksum}"
+                )
+            continue
+
+        if migration.version in backfills:
+            cursor_value = backfills[migration.version]
+            logger.info(
+                "Resuming backfill for schema version %d at cursor %r",
+                migration.version,
+                cursor_value,
+            )
+        else:
+            await _apply_migration_step(conn, migration)
+            cursor_value = ""
+        if migration.backfill is not None:
+            cursor_value = await _run_backfill(conn, migration, cursor_value, 1)
+            if cursor_value is not None:
+                _pending_backfills.append((migration, cursor_value))
+                logger.info(
+                    "Schema version %d (%s) backfill continues in the background",
+                    migration.version,
+                    migration.name,
+                )
+                continue
+        logger.info("DB migrated to schema version %d", migration.version)
+
+
+async def _apply_migration_step(
+    conn: aiosqlite.Connection, migration: Migration
+) -> None:
+    """Run one step's DDL and record it (or its backfill cursor) atomically."""
+    async with _write_lock:
+        try:
+            # executescript() commits any pending transaction first, then runs
+            # the script; the explicit BEGIN keeps the DDL and bookkeeping together.
+            await conn.executescript(f"BEGIN IMMEDIATE;\n{migration.sql}")
+            if migration.backfill is None:
+                await _record_migration(conn, migration)
+            else:
+                await conn.execute(
+                    "INSERT OR REPLACE INTO schema_backfills"
+                    "(version, cursor, chunks, updated_at) "
+                    "VALUES (?, '', 0, datetime('now'))",
+                    (migration.version,),
+                )
+            await conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                await conn.rollback()
+            raise
+
+
+async def _run_backfill(
+    conn: aiosqlite.Connection,
+    migration: Migration,
+    cursor_value: str,
+    max_chunks: int | None = None,
+) -> str | None:
+    """Run a step's backfill chunk by chunk, releasing _write_lock in between.
+
+    Stops after max_chunks chunks or once close_db()/rollback_to() asks.
+    Returns: the cursor to resume from, or None once the backfill is done.
+    """
+    next_cursor: str | None = cursor_value
+    chunks = 0
+    while next_cursor is not None:
+        if chunks == max_chunks or _backfills_stopping:
+            return next_cursor
+        chunks += 1
+        async with _write_lock:
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                next_cursor = await migration.backfill(conn, next_cursor)
+                if next_cursor is None:
+                    await _record_migration(conn, migration)
+                    await conn.execute(
+                        "DELETE FROM schema_backfills WHERE version=?",
+                        (migration.version,),
+                    )
+                else:
+                    await conn.execute(
+                        "UPDATE schema_backfills SET cursor=?, chunks=chunks+1, "
+                        "updated_at=datetime('now') WHERE version=?",
+                        (str(next_cursor), migration.version),
+                    )
+                await conn.commit()
+            except Exception:
+                await conn.execute("ROLLBACK")
+                raise
+        if next_cursor is not None:
+            # Let other writers in between chunks.
+            await asyncio.sleep(0)
+    return None
+
+
+async def _run_pending_backfills(
+    conn: aiosqlite.Connection, pending: list[tuple[Migration, str]]
+) -> None:
+    """Background task: finish the backfills _apply_migrations() left pending."""
+    for migration, cursor_value in pending:
+        try:
+            cursor_value = await _run_backfill(conn, migration, cursor_value)
+        except Exception:
+            logger.exception(
+                "Backfill for schema version %d failed; it resumes on the next open",
+                migration.version,
+            )
+            return
+        if cursor_value is not None:
+            logger.info(
+                "Backfill for schema version %d paused at cursor %r",
+                migration.version,
+                cursor_value,
+            )
+            return
+        logger.info("DB migrated to schema version %d", migration.version)
+
+
+async def _record_migration(conn: aiosqlite.Connection, migration: Migration) -> None:
     await conn.execute(
-        "INSERT OR IGNORE INTO schema_version(version, applied_at) "
-        "VALUES (1, datetime('now'))"
+        "INSERT INTO schema_version(version, applied_at, name, checksum) "
+        "VALUES (?, datetime('now'), ?, ?)",
+        (migration.version, migration.name, migration.checksum),
     )
-    await conn.commit()
+
+
+async def current_schema_version() -> int:
+    """Highest applied schema version (a background backfill may still run)."""
+    async with get_conn().execute("SELECT MAX(version) FROM schema_version") as cur:
+        row = await cur.fetchone()
+    return row[0] or 0
+
+
+async def rollback_to(version: int) -> list[int]:
+    """Undo applied steps newer than version, newest first, one transaction each.
+
+    Raises RuntimeError (before changing anything) if a step has no down SQL.
+    A running background backfill is stopped first; a kept step's backfill
+    resumes on the next open_db().
+    Returns: the versions that were rolled back.
+    """
+    conn = get_conn()
+    await _stop_backfills()
+    async with conn.execute(
+        "SELECT version FROM schema_version WHERE version > ?", (version,)
+    ) as cursor:
+        applied = {row[0] for row in await cursor.fetchall()}
+    async with conn.execute(
+        "SELECT version FROM schema_backfills WHERE version > ?", (version,)
+    ) as cursor:
+        applied |= {row[0] for row in await cursor.fetchall()}
+    steps = sorted(
+        (m for m in _MIGRATIONS if m.version in applied),
+        key=lambda m: m.version,
+        reverse=True,
+    )
+    missing = [m.version for m in steps if not m.down.strip()]
+    if missing:
+        raise RuntimeError(f"schema migrations without down SQL: {missing}")
+
+    rolled_back: list[int] = []
+    for migration in steps:
+        async with _write_lock:
+            try:
+                await conn.executescript(f"BEGIN IMMEDIATE;\n{migration.down}")
+                await conn.execute(
+                    "DELETE FROM schema_version WHERE version=?", (migration.version,)
+                )
+                await conn.execute(
+                    "DELETE FROM schema_backfills WHERE version=?",
+                    (migration.version,),
+                )
+                await conn.commit()
+            except Exception:
+                if conn.in_transaction:
+                    await conn.rollback()
+                raise
+        rolled_back.append(migration.version)
+        logger.info("DB rolled back schema version %d", migration.version)
+    return rolled_back
+
+
+# ── Job metrics ───────────────────────────────────────────────────────────────
+
+# Nearest-rank percentiles: rank ceil(p * n / 100) within each job.
+_JOB_RUN_STATS_SQL = """
+WITH ranked AS (
+    SELECT job_name, lane, status, run_ms, COALESCE(wait_ms, 0) AS wait_ms,
+           items_processed, items_changed, api_calls, sheet_calls,
+           ROW_NUMBER() OVER (PARTITION BY job_name ORDER BY run_ms) AS run_rank,
+           ROW_NUMBER() OVER (PARTITION BY job_name ORDER BY COALESCE(wait_ms, 0))
+               AS wait_rank,
+           COUNT(*) OVER (PARTITION BY job_name) AS n
+    FROM job_runs
+    WHERE run_ms IS NOT NULL AND started_at >= datetime('now', ?)
+      AND (? IS NULL OR lane = ?)
+)
+SELECT job_name, MAX(lane), COUNT(*), SUM(status = 'error'), SUM(run_ms),
+       MAX(CASE WHEN run_rank = (50 * n + 99) / 100 THEN run_ms END),
+       MAX(CASE WHEN run_rank = (95 * n + 99) / 100 THEN run_ms END),
+       MAX(CASE WHEN wait_rank = (50 * n + 99) / 100 THEN wait_ms END),
+       MAX(CASE WHEN wait_rank = (95 * n + 99) / 100 THEN wait_ms END),
+       COALESCE(SUM(items_processed), 0), COALESCE(SUM(items_changed), 0),
+       COALESCE(SUM(api_calls), 0), COALESCE(SUM(sheet_calls), 0)
+FROM ranked
+GROUP BY job_name
+ORDER BY SUM(run_ms) DESC
+"""
+
+_JOB_RUN_STATS_KEYS = (
+    "job_name",
+    "lane",
+    "runs",
+    "errors",
+    "total_run_ms",
+    "run_p50_ms",
+    "run_p95_ms",
+    "wait_p50_ms",
+    "wait_p95_ms",
+    "items_processed",
+    "items_changed",
+    "api_calls",
+    "sheet_calls",
+)
+
+
+async def job_run_stats(days: int = 7, lane: str | None = None) -> list[dict]:
+    """Per-job run/wait p50/p95 (ms) and counter totals over the last days.
+
+    Only runs with a recorded run_ms (lane-wrapped jobs) are counted.
+    Returns: one dict per job, busiest (largest total_run_ms) first.
+    """
+    async with get_read_conn() as conn:
+        async with conn.execute(
+            _JOB_RUN_STATS_SQL, (f"-{int(days)} days", lane, lane)
+        ) as cursor:
+            rows = await cursor.fetchall()
+    return [dict(zip(_JOB_RUN_STATS_KEYS, row)) for row in rows]
+
+
+# ── Retention ─────────────────────────────────────────────────────────────────
+
+
+async def run_retention(
+    raw_days: int = 30, event_days: int = 365, vacuum_pages: int = 2000
+) -> dict[str, int]:
+    """Roll raw log rows older than raw_days into daily tables, then prune.
+
+    price_checks / job_runs / adapter_runs are folded into *_daily and deleted
+    (whole UTC days only, so a day is never split between raw and rollup).
+    price_events are low volume and kept raw for event_days.
+    Each table is processed in RETENTION_BATCH_ROWS batches, one short
+    transaction each (rollup + delete of the same rows), releasing _write_lock
+    in between so the group-commit writer keeps running. Rows still waiting in
+    a schema v4 *_legacy table are pruned by a later run, once copied.
+    Finishes with an incremental vacuum of at most vacuum_pages free pages.
+
+    Returns: deleted row counts per table plus vacuumed page count.
+    """
+    conn = get_conn()
+    raw_cutoff = f"-{int(raw_days)} days"
+    event_cutoff = f"-{int(event_days)} days"
+    stats: dict[str, int] = {}
+    for table, rollup_sql, time_col, cutoff in (
+        ("price_checks", _ROLLUP_PRICE_CHECKS_SQL, "checked_at", raw_cutoff),
+        ("job_runs", _ROLLUP_JOB_RUNS_SQL, "started_at", raw_cutoff),
+        ("adapter_runs", _ROLLUP_ADAPTER_RUNS_SQL, "run_at", raw_cutoff),
+        ("price_events", None, "detected_at", event_cutoff),
+    ):
+        stats[table] = 0
+        while True:
+            async with _write_lock:
+                await conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # Upper rowid of the next batch of expired rows.
+                    async with conn.execute(
+                        f"SELECT MAX(rowid) FROM (SELECT rowid FROM {table} "
+                        f"WHERE {time_col} < date('now', ?) ORDER BY rowid LIMIT ?)",
+                        (cutoff, RETENTION_BATCH_ROWS),
+                    ) as cur:
+                        bound = (await cur.fetchone())[0]
+                    deleted = 0
+                    if bound is not None:
+                        if rollup_sql:
+                            await conn.execute(rollup_sql, (cutoff, bound))
+                        cursor = await conn.execute(
+                            f"DELETE FROM {table} "
+                            f"WHERE {time_col} < date('now', ?) AND rowid <= ?",
+                            (cutoff, bound),
+                        )
+                        deleted = cursor.rowcount
+                    await conn.commit()
+                except Exception:
+                    await conn.execute("ROLLBACK")
+                    raise
+            stats[table] += deleted
+            if deleted < RETENTION_BATCH_ROWS:
+                break
+            # Let queued writes in between batches.
+            await asyncio.sleep(0)
+    stats["vacuumed_pages"] = await incremental_vacuum(vacuum_pages)
+    return stats
+
+
+async def run_maintenance() -> dict[str, int]:
+    """Checkpoint the WAL (TRUNCATE), run PRAGMA optimize and report file sizes.
+
+    Returns: checkpoint busy flag / frames, and db/wal sizes in bytes
+    (wal_bytes_before is the size the WAL had grown to since the last run).
+    """
+    conn = get_conn()
+    wal_path = f"{DB_FILE}-wal"
+    wal_before = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+    async with _write_lock:
+        async with conn.execute("PRAGMA wal_checkpoint(TRUNCATE)") as cursor:
+            busy, log_frames, checkpointed = await cursor.fetchone()
+        await conn.execute("PRAGMA optimize")
+    async with conn.execute("PRAGMA page_count") as cursor:
+        page_count = (await cursor.fetchone())[0]
+    async with conn.execute("PRAGMA page_size") as cursor:
+        page_size = (await cursor.fetchone())[0]
+    async with conn.execute("PRAGMA freelist_count") as cursor:
+        free_pages = (await cursor.fetchone())[0]
+    return {
+        "checkpoint_busy": busy,
+        "wal_frames": log_frames,
+        "checkpointed_frames": checkpointed,
+        "wal_bytes_before": wal_before,
+        "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+        "db_bytes": page_count * page_size,
+        "free_bytes": free_pages * page_size,
+        **{f"writer_{k}": v for k, v in writer_stats().items()},
+    }
+
+
+async def incremental_vacuum(max_pages: int = 2000) -> int:
+    """Return up to max_pages free pages to the OS. Returns pages released.
+
+    Only DBs already in auto_vacuum=INCREMENTAL mode are touched; older files
+    are skipped with a log line until converted offline with
+    `python backup.py --convert-auto-vacuum` (a full VACUUM, bot stopped).
+    """
+    conn = get_conn()
+    async with conn.execute("PRAGMA auto_vacuum") as cursor:
+        mode = (await cursor.fetchone())[0]
+    if mode != 2:
+        logger.info(
+            "incremental_vacuum skipped: auto_vacuum=%d, run "
+            "`python backup.py --convert-auto-vacuum` with the bot stopped",
+            mode,
+        )
+        return 0
+    async with conn.execute("PRAGMA freelist_count") as cursor:
+        free_before = (await cursor.fetchone())[0]
+    if not free_before:
+        return 0
+    async with _write_lock:
+        await conn.execute(f"PRAGMA incremental_vacuum({int(max_pages)})")
+        await conn.commit()
+    async with conn.execute("PRAGMA freelist_count") as cursor:
+        free_after = (await cursor.fetchone())[0]
+    return free_before - free_after
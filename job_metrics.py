@@ -0,0 +1,62 @@
+"""
+job_metrics.py
+Per-run counters that a scheduled job reports while it runs, persisted to
+job_runs by main._run_with_lane_lock().
+
+The active JobMetrics lives in a ContextVar, so helpers deep in a job (and
+tasks it gathers) can count without threading an object through every call.
+Outside a tracked run add() is a no-op.
+
+Public API:
+  JobMetrics          — items_processed / items_changed / api_calls / sheet_calls
+  track()             — context manager that activates a fresh JobMetrics
+  current()           — the active JobMetrics or None
+  add(**counts)       — increment counters on the active run
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+
+COUNTERS = ("items_processed", "items_changed", "api_calls", "sheet_calls")
+
+
+@dataclass(slots=True)
+class JobMetrics:
+    items_processed: int = 0
+    items_changed: int = 0
+    api_calls: int = 0
+    sheet_calls: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+_current: ContextVar[JobMetrics | None] = ContextVar("job_metrics", default=None)
+
+
+def current() -> JobMetrics | None:
+    return _current.get()
+
+
+def add(**counts: int) -> None:
+    """Increment counters on the active run, e.g. add(api_calls=1)."""
+    metrics = _current.get()
+    if metrics is None:
+        return
+    for name, value in counts.items():
+        if name not in COUNTERS:
+            raise ValueError(f"unknown job counter: {name}")
+        setattr(metrics, name, getattr(metrics, name) + int(value))
+
+
+@contextmanager
+def track() -> Iterator[JobMetrics]:
+    """Activate a fresh JobMetrics for the duration of the block."""
+    metrics = JobMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
@@ -14,11 +14,16 @@ from collections.abc import Awaitable, Callable
 from pathlib import Path
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from dotenv import load_dotenv
 from logging_config import setup_logging
 
+import backup
 import db
+import job_metrics
+import price_series
+from config import KST, settings
 
 PROJECT_ROOT = Path(__file__).resolve().parent
 os.chdir(PROJECT_ROOT)
@@ -35,6 +40,8 @@ _SOURCING_PRICE_JOB_DEFAULTS = {
     "max_instances": 2,
     "misfire_grace_time": 900,
 }
+# Last signature each probe fired on; stuck rows/orders are left to the safety-net poll.
+_order_probe_marks: dict[str, str] = {}
 
 
 def _configure_stdio() -> None:
@@ -143,6 +150,8 @@ from coupang_manager import (
     COUPANG_ACCESS_KEY,
     COUPANG_VENDOR_ID,
     MYMUNJA_ID,
+    probe_accept_orders,
+    probe_pending_shipments,
 )
 
 
@@ -157,38 +166,46 @@ def _resolve_bot_mode() -> str:
     return raw
 
 
-async def _try_db_job_start(job_name: str) -> int | None:
+async def _try_db_job_start(
+    job_name: str, lane: str | None = None, wait_ms: int | None = None
+) -> int | None:
     """INSERT job_runs row with status='running'. Returns rowid or None on failure."""
     try:
-        async with db._write_lock:
-            conn = db.get_conn()
-            cursor = await conn.execute(
-                "INSERT INTO job_runs(job_name, started_at, status) "
-                "VALUES (?, datetime('now'), 'running')",
-                (job_name,),
-            )
-            await conn.commit()
-            return cursor.lastrowid
+        return await db.execute_write(
+            "INSERT INTO job_runs(job_name, started_at, status, lane, wait_ms) "
+            "VALUES (?, datetime('now'), 'running', ?, ?)",
+            (job_name, lane, wait_ms),
+        )
     except Exception as exc:
         _log.error("job_runs INSERT failed for %s: %s", job_name, exc)
         return None
 
 
 async def _try_db_job_finish(
-    rowid: int | None, status: str, error: str | None = None
+    rowid: int | None,
+    status: str,
+    error: str | None = None,
+    *,
+    run_ms: int | None = None,
+    metrics: job_metrics.JobMetrics | None = None,
 ) -> None:
-    """UPDATE job_runs row by rowid. No-op if rowid is None."""
+    """UPDATE job_runs row by rowid (status, run_ms, counters). No-op if rowid is None."""
     if rowid is None:
         return
+    counts = metrics.as_dict() if metrics is not None else {}
     try:
-        async with db._write_lock:
-            conn = db.get_conn()
-            await conn.execute(
-                "UPDATE job_runs SET finished_at=datetime('now'), status=?, error=? "
-                "WHERE id=?",
-                (status, error, rowid),
-            )
-            await conn.commit()
+        await db.execute_write(
+            "UPDATE job_runs SET finished_at=datetime('now'), status=?, error=?, "
+            "run_ms=?, items_processed=?, items_changed=?, api_calls=?, sheet_calls=? "
+            "WHERE id=?",
+            (
+                status,
+                error,
+                run_ms,
+                *(counts.get(name) for name in job_metrics.COUNTERS),
+                rowid,
+            ),
+        )
     except Exception as exc:
         _log.error("job_runs UPDATE failed for rowid=%s: %s", rowid, exc)
 
@@ -225,24 +242,35 @@ async def _run_with_lane_lock(
                 f"requested_at={requested_at} wait_started={wait_started} "
                 f"wait_elapsed={wait_elapsed:.2f} run_started={run_started}"
             )
+        job_run_id = await _try_db_job_start(
+            job_name, lane_name, round(wait_elapsed * 1000)
+        )
         run_started_monotonic = asyncio.get_running_loop().time()
-        job_run_id = await _try_db_job_start(job_name)
-        try:
-            await job_func()
-        except Exception as exc:
-            await _try_db_job_finish(job_run_id, "error", str(exc))
-            raise
-        else:
-            await _try_db_job_finish(job_run_id, "success")
-            if wait_for_lock:
+        with job_metrics.track() as metrics:
+            try:
+                await job_func()
+            except Exception as exc:
                 run_elapsed = asyncio.get_running_loop().time() - run_started_monotonic
-                _log.info(
-                    f"{job_name} finished in {run_elapsed:.2f}s "
-                    f"job_name={job_name} lane_name={lane_name} "
-                    f"requested_at={requested_at} wait_started={wait_started} "
-                    f"wait_elapsed={wait_elapsed:.2f} run_started={run_started} "
-                    f"run_elapsed={run_elapsed:.2f}"
+                await _try_db_job_finish(
+                    job_run_id,
+                    "error",
+                    str(exc),
+                    run_ms=round(run_elapsed * 1000),
+                    metrics=metrics,
                 )
+                raise
+        run_elapsed = asyncio.get_running_loop().time() - run_started_monotonic
+        await _try_db_job_finish(
+            job_run_id, "success", run_ms=round(run_elapsed * 1000), metrics=metrics
+        )
+        if wait_for_lock:
+            _log.info(
+                f"{job_name} finished in {run_elapsed:.2f}s "
+                f"job_name={job_name} lane_name={lane_name} "
+                f"requested_at={requested_at} wait_started={wait_started} "
+                f"wait_elapsed={wait_elapsed:.2f} run_started={run_started} "
+                f"run_elapsed={run_elapsed:.2f}"
+            )
 
 
 async def run_order_lane_job(
@@ -302,6 +330,94 @@ async def scheduled_stock_check_job() -> None:
     await run_product_lane_job("stock_check_job", stock_check_job)
 
 
+async def scheduled_db_retention_job() -> None:
+    """Off-hours log retention: daily rollups, pruning and incremental vacuum."""
+    try:
+        stats = await db.run_retention(
+            raw_days=settings.db_retention_days,
+            event_days=settings.db_event_retention_days,
+        )
+        stats["price_series_pruned"] = await price_series.prune_raw(
+            settings.price_series_raw_days
+        )
+    except Exception as exc:
+        _log.error(f"DB retention failed: {exc}")
+        return
+    _log.info(f"DB retention done: {stats}")
+
+
+async def scheduled_db_maintenance_job() -> None:
+    """WAL checkpoint(TRUNCATE) + PRAGMA optimize, with a WAL/DB size report."""
+    try:
+        report = await db.run_maintenance()
+    except Exception as exc:
+        _log.error(f"DB maintenance failed: {exc}")
+        return
+    mib = 1024 * 1024
+    _log.info(
+        f"DB maintenance: db={report['db_bytes'] / mib:.1f}MiB "
+        f"free={report['free_bytes'] / mib:.1f}MiB "
+        f"wal={report['wal_bytes_before'] / mib:.1f}→{report['wal_bytes'] / mib:.1f}MiB "
+        f"checkpointed={report['checkpointed_frames']}/{report['wal_frames']} "
+        f"busy={report['checkpoint_busy']} "
+        f"commits={report['writer_commits']} statements={report['writer_statements']}"
+    )
+
+
+async def scheduled_db_backup_job() -> None:
+    """Online ops.db backup (page-stepped, gzip) with rotation."""
+    try:
+        report = await backup.create_backup()
+    except Exception as exc:
+        _log.error(f"DB backup failed: {exc}")
+        return
+    mib = 1024 * 1024
+    _log.info(
+        f"DB backup: {report['path']} "
+        f"db={report['db_bytes'] / mib:.1f}MiB gz={report['gz_bytes'] / mib:.1f}MiB "
+        f"pages={report['pages']} in {report['seconds']:.1f}s "
+        f"rotated={report['removed']}"
+    )
+
+
+def _probe_should_fire(kind: str, signature: str | None) -> bool:
+    """Fire once per new non-empty signal; an empty signal clears the mark."""
+    if signature is None:
+        return False
+    if not signature:
+        _order_probe_marks.pop(kind, None)
+        return False
+    if _order_probe_marks.get(kind) == signature:
+        return False
+    _order_probe_marks[kind] = signature
+    return True
+
+
+def _run_job_now(sched, job_id: str) -> None:
+    """Pull a scheduled job forward; its interval restarts from this run."""
+    job = sched.get_job(job_id)
+    if job is not None:
+        job.modify(next_run_time=datetime.now(sched.timezone))
+
+
+async def scheduled_order_probe_job(sched) -> None:
+    """Cheap new-work probe for the order lane.
+
+    A one-row ACCEPT lookup and an order-sheet G:M read (skipped while no row
+    awaits an invoice); the full order/shipping jobs run only when they report
+    work not seen before (ACCEPT orders missing from the sheet, shippable rows
+    with a valid carrier).
+    """
+    if _ORDER_LANE_LOCK.locked():
+        return
+    if _probe_should_fire("order", await probe_accept_orders()):
+        _log.info("order probe: new ACCEPT order → coupang_order_job")
+        _run_job_now(sched, "coupang_order")
+    if _probe_should_fire("shipping", await probe_pending_shipments()):
+        _log.info("order probe: invoices ready → shipping_job")
+        _run_job_now(sched, "shipping")
+
+
 async def run_initial_coupang_lanes() -> None:
     """Run startup Coupang jobs in two conflict-free lanes."""
 
@@ -394,12 +510,25 @@ async def main():
                 id="musinsa_check",
                 name="무신사봇 가격 모니터링",
             )
+            # 주문/발송은 신호 확인(order_probe)으로 즉시 당겨 실행하고,
+            # 정기 폴링은 안전망으로만 유지한다.
             sched.add_job(
                 scheduled_coupang_order_job,
-                trigger=IntervalTrigger(minutes=5, jitter=15),
+                trigger=IntervalTrigger(
+                    minutes=settings.coupang_order_poll_minutes, jitter=15
+                ),
                 id="coupang_order",
                 name="쿠팡 주문 자동화",
             )
+            sched.add_job(
+                scheduled_order_probe_job,
+                trigger=IntervalTrigger(
+                    seconds=settings.coupang_order_probe_seconds, jitter=5
+                ),
+                args=[sched],
+                id="order_probe",
+                name="주문/발송 신호 확인",
+            )
             sched.add_job(
                 scheduled_coupang_sync_job,
                 trigger=IntervalTrigger(minutes=5, jitter=20),
@@ -421,7 +550,9 @@ async def main():
             )
             sched.add_job(
                 scheduled_shipping_job,
-                trigger=IntervalTrigger(minutes=5, jitter=10),
+                trigger=IntervalTrigger(
+                    minutes=settings.coupang_order_poll_minutes, jitter=10
+                ),
                 id="shipping",
                 name="발송처리 자동화",
             )
@@ -458,6 +589,27 @@ async def main():
                 name="소싱목록 가격 자동 동기화",
             )
 
+        sched.add_job(
+            scheduled_db_maintenance_job,
+            trigger=IntervalTrigger(minutes=settings.db_checkpoint_minutes, jitter=30),
+            id="db_maintenance",
+            name="DB 체크포인트/최적화",
+        )
+        sched.add_job(
+            scheduled_db_retention_job,
+            trigger=CronTrigger(
+                hour=settings.db_maintenance_hour, minute=30, timezone=KST
+            ),
+            id="db_retention",
+            name="DB 로그 보존/정리",
+        )
+        sched.add_job(
+            scheduled_db_backup_job,
+            trigger=CronTrigger(hour=settings.db_backup_hour, minute=0, timezone=KST),
+            id="db_backup",
+            name="DB 온라인 백업",
+        )
+
         sched.start()
         _log.info("Scheduler running.. (Ctrl+C to stop)")
 
@@ -1,36 +1,279 @@
 """
 migrate.py
-One-shot JSON-to-DB migration script.
+JSON-to-DB import script.
 
 Migrates price_state.json and discovery_state.json into the SQLite DB tables
-created in Phase 4. Designed for manual execution with the bot stopped.
+created in Phase 4, and bulk-loads exported price history into price_series.
+Designed for manual execution with the bot stopped.
 
 Usage:
-    python migrate.py
+    python migrate.py                         # legacy state files
+    python migrate.py --history export.jsonl  # price history (JSONL or JSON array)
+
+History rows are objects {"url": ..., "ts": ..., "price": ...}; ts is epoch
+seconds or an ISO 8601 string (naive = KST), price null means sold out.
 
 Safety checks:
   - Refuses to run if .main.lock exists (bot is running)
-  - Uses BEGIN IMMEDIATE transaction for atomic writes
-  - Verifies row-count after INSERT — ROLLBACK on mismatch
-  - Renames JSON to .bak ONLY after successful COMMIT
+  - Files are streamed: one JSON member at a time, never the whole document
+  - Rows are written with executemany in IMPORT_CHUNK_ROWS transactions
+    (BEGIN IMMEDIATE); each chunk's row count is verified — ROLLBACK on mismatch
+  - Progress is stored per file in import_progress, so a failed run resumes
+    after the last committed chunk (same file size/mtime) instead of restarting
+  - Renames JSON to .bak ONLY after every chunk committed
   - Missing JSON files are silently skipped (no error)
 
-Dependency chain: config <- db <- migrate  (no other project imports)
+Dependency chain: config <- db <- price_series <- migrate
 """
 
+import argparse
 import asyncio
+import itertools
 import json
 import sys
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator
 from datetime import datetime
 from pathlib import Path
 
 import db
+import price_series
 from config import DB_FILE, KST, STATE_FILE  # noqa: F401 (DB_FILE imported for monkeypatching)
 
 # ── Module-level constants (monkeypatch-friendly) ─────────────────────────────
 
 LOCK_FILE = Path(__file__).resolve().parent / ".main.lock"
 DISCOVERY_STATE_FILE = str(Path(__file__).resolve().parent / "discovery_state.json")
+IMPORT_CHUNK_ROWS = 5000
+_READ_BLOCK = 1 << 16
+
+ChunkWriter = Callable[[object, list], Awaitable[int]]
+
+
+# ── Streaming JSON reader ─────────────────────────────────────────────────────
+
+
+class _JsonStream:
+    """Incremental reader over one JSON document.
+
+    Objects and arrays are walked member by member; only the member value being
+    read is decoded, so memory stays bounded by the largest single value.
+    """
+
+    def __init__(self, fh, block_size: int | None = None):
+        self._fh = fh
+        self._block_size = block_size or _READ_BLOCK
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._fh.read(self._block_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at end of input)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"invalid JSON: expected one of {chars!r}, got {ch!r}")
+        self._pos += 1
+        return ch
+
+    def value(self):
+        """Decode the value at the cursor (reading more input as needed)."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number ending exactly at the buffer edge may continue in the next block.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """Yield each key of the object at the cursor.
+
+        The caller must consume the member's value (value() / members() /
+        elements()) before asking for the next key.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError("invalid JSON: object key is not a string")
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def elements(self) -> Iterator[None]:
+        """Yield once per element of the array at the cursor (same contract)."""
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            if self._expect(",]") == "]":
+                return
+
+
+def _walk_object(stream: _JsonStream, keys: tuple[str, ...]) -> Iterator[tuple]:
+    if stream.peek() != "{":
+        stream.value()  # null / non-object at the path: nothing to import
+        return
+    for key in stream.members():
+        if not keys:
+            yield key, stream.value()
+        elif key == keys[0]:
+            yield from _walk_object(stream, keys[1:])
+        else:
+            stream.value()
+
+
+def _iter_json_object(path: Path, keys: tuple[str, ...] = ()) -> Iterator[tuple]:
+    """Stream (key, value) pairs of the object at keys inside the JSON file."""
+    with open(path, encoding="utf-8") as fh:
+        yield from _walk_object(_JsonStream(fh), keys)
+
+
+def _iter_json_records(path: Path) -> Iterator:
+    """Stream records from a JSON Lines file or a top-level JSON array."""
+    with open(path, encoding="utf-8") as fh:
+        stream = _JsonStream(fh)
+        if stream.peek() == "[":
+            for _ in stream.elements():
+                yield stream.value()
+            return
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+# ── Chunked import ────────────────────────────────────────────────────────────
+
+
+def _chunked(rows: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _fingerprint(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+async def _save_progress(conn, source: str, fingerprint: str, items: int, done: int):
+    await conn.execute(
+        "INSERT OR REPLACE INTO import_progress"
+        "(source, fingerprint, items, done, updated_at) "
+        "VALUES (?, ?, ?, ?, datetime('now'))",
+        (source, fingerprint, items, done),
+    )
+
+
+async def _import_chunks(
+    conn, label: str, path: Path, rows: Iterable, write_chunk: ChunkWriter
+) -> tuple[bool, int]:
+    """Write rows in IMPORT_CHUNK_ROWS transactions, resuming a failed run.
+
+    write_chunk(conn, chunk) runs inside the chunk's transaction and returns
+    how many rows it accounted for; anything but len(chunk) rolls the chunk back.
+
+    Returns:
+        (success, count) — count = rows written by this run.
+    """
+    source = f"{label}:{path.resolve()}"
+    fingerprint = _fingerprint(path)
+    async with conn.execute(
+        "SELECT fingerprint, items, done FROM import_progress WHERE source = ?",
+        (source,),
+    ) as cur:
+        saved = await cur.fetchone()
+
+    offset = 0
+    if saved is not None and saved[0] == fingerprint:
+        if saved[2]:
+            print(f"migrate: {label}: {path.name} already imported -- skip")
+            return True, 0
+        offset = saved[1]
+        print(f"migrate: {label}: resuming after {offset} rows")
+
+    started = time.monotonic()
+    total = offset
+    for chunk in _chunked(itertools.islice(rows, offset, None), IMPORT_CHUNK_ROWS):
+        await conn.execute("BEGIN IMMEDIATE")
+        try:
+            written = await write_chunk(conn, chunk)
+            if written != len(chunk):
+                await conn.execute("ROLLBACK")
+                print(
+                    f"migrate: ERROR {label} row-count mismatch "
+                    f"(chunk={len(chunk)}, db={written}) -- ROLLBACK, "
+                    f"resume from row {total}"
+                )
+                return False, total - offset
+            total += len(chunk)
+            await _save_progress(conn, source, fingerprint, total, 0)
+            await conn.commit()
+        except Exception:
+            await conn.execute("ROLLBACK")
+            raise
+        elapsed = max(time.monotonic() - started, 1e-6)
+        print(
+            f"migrate: {label}: {total} rows ({(total - offset) / elapsed:,.0f} rows/s)"
+        )
+
+    await _save_progress(conn, source, fingerprint, total, 1)
+    await conn.commit()
+    return True, total - offset
+
+
+async def _intern_urls(conn, urls: Iterable[str]) -> dict[str, int]:
+    """{url: urls.id} inside the caller's transaction (db.intern_urls() would
+    go through the group-commit writer, which cannot join this transaction)."""
+    wanted = list(dict.fromkeys(urls))
+    await conn.executemany(
+        "INSERT OR IGNORE INTO urls(url, domain, created_at) "
+        "VALUES (?, ?, datetime('now'))",
+        [(url, db.url_domain(url)) for url in wanted],
+    )
+    ids: dict[str, int] = {}
+    for start in range(0, len(wanted), 500):
+        chunk = wanted[start : start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        async with conn.execute(
+            f"SELECT url, id FROM urls WHERE url IN ({placeholders})", chunk
+        ) as cur:
+            ids.update({url: url_id for url, url_id in await cur.fetchall()})
+    return ids
 
 
 # ── Migration helpers ─────────────────────────────────────────────────────────
@@ -41,101 +284,115 @@ async def _migrate_price_state(conn) -> tuple[bool, int]:
 
     Returns:
         (success, count) — success=True and count=N rows on success,
-        (False, 0) on mismatch or error, (True, 0) if file missing.
+        (False, N) on mismatch (N rows committed before it), (True, 0) if
+        file missing.
     """
     src = Path(STATE_FILE)
     if not src.exists():
         print("migrate: price_state.json not found -- skip")
         return True, 0
 
-    with open(src, encoding="utf-8") as f:
-        data: dict = json.load(f)
-
-    json_count = len(data)
     now = datetime.now(KST).isoformat()
 
-    await conn.execute("BEGIN IMMEDIATE")
-    try:
-        for url, price in data.items():
-            await conn.execute(
-                "INSERT OR REPLACE INTO price_state(url, price, updated_at) VALUES (?,?,?)",
-                (url, price, now),
-            )
-        async with conn.execute("SELECT COUNT(*) FROM price_state") as cur:
-            db_count = (await cur.fetchone())[0]
-
-        if db_count != json_count:
-            await conn.execute("ROLLBACK")
-            print(
-                f"migrate: ERROR price_state row-count mismatch "
-                f"(json={json_count}, db={db_count}) -- ROLLBACK"
-            )
-            return False, 0
-
-        await conn.commit()
-        return True, json_count
+    async def _write(conn, chunk: list[tuple[str, int | None]]) -> int:
+        ids = await _intern_urls(conn, (url for url, _ in chunk))
+        cursor = await conn.executemany(
+            "INSERT OR REPLACE INTO price_state(url_id, price, updated_at) "
+            "VALUES (?,?,?)",
+            [(ids[url], price, now) for url, price in chunk],
+        )
+        return cursor.rowcount
 
-    except Exception:
-        await conn.execute("ROLLBACK")
-        raise
+    return await _import_chunks(
+        conn, "price_state", src, _iter_json_object(src), _write
+    )
 
 
 async def _migrate_discovery_state(conn) -> tuple[bool, int]:
     """Migrate discovery_state.json -> DB discovery_candidates table.
 
-    Uses count_before/count_after approach to handle pre-existing rows.
+    Only the discovered_urls member is decoded; the rest of the file is skipped.
 
     Returns:
         (success, count) — success=True and count=N new rows on success,
-        (False, 0) on mismatch or error, (True, 0) if file missing.
+        (False, N) on mismatch, (True, 0) if file missing or empty.
     """
     src = Path(DISCOVERY_STATE_FILE)
     if not src.exists():
         print("migrate: discovery_state.json not found -- skip")
         return True, 0
 
-    with open(src, encoding="utf-8") as f:
-        data: dict = json.load(f)
-
-    discovered_urls: dict = data.get("discovered_urls", {})
-    json_count = len(discovered_urls)
-
-    if json_count == 0:
+    rows = _iter_json_object(src, ("discovered_urls",))
+    first = next(rows, None)
+    if first is None:
         print("migrate: discovery_state.json has no discovered_urls -- skip")
         return True, 0
 
-    # Capture row count before transaction
-    async with conn.execute("SELECT COUNT(*) FROM discovery_candidates") as cur:
-        count_before = (await cur.fetchone())[0]
-
-    await conn.execute("BEGIN IMMEDIATE")
-    try:
-        for url, discovered_at in discovered_urls.items():
-            await conn.execute(
-                "INSERT OR IGNORE INTO discovery_candidates"
-                "(source, name, url, price, margin_pct, score, discovered_at) "
-                "VALUES (?,?,?,?,?,?,?)",
-                ("discovery_state", None, url, None, None, None, discovered_at),
-            )
-
-        async with conn.execute("SELECT COUNT(*) FROM discovery_candidates") as cur:
-            count_after = (await cur.fetchone())[0]
-
-        inserted = count_after - count_before
-        if inserted != json_count:
-            await conn.execute("ROLLBACK")
-            print(
-                f"migrate: ERROR discovery_state row-count mismatch "
-                f"(json={json_count}, inserted={inserted}) -- ROLLBACK"
-            )
-            return False, 0
-
-        await conn.commit()
-        return True, inserted
+    async def _write(conn, chunk: list[tuple[str, str]]) -> int:
+        cursor = await conn.executemany(
+            "INSERT OR IGNORE INTO discovery_candidates"
+            "(source, name, url, price, margin_pct, score, discovered_at) "
+            "VALUES (?,?,?,?,?,?,?)",
+            [
+                ("discovery_state", None, url, None, None, None, discovered_at)
+                for url, discovered_at in chunk
+            ],
+        )
+        return cursor.rowcount
+
+    return await _import_chunks(
+        conn,
+        "discovery_state",
+        src,
+        itertools.chain([first], rows),
+        _write,
+    )
+
+
+def _history_ts(value) -> int:
+    if isinstance(value, (int, float)):
+        return int(value)
+    parsed = datetime.fromisoformat(str(value))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=KST)
+    return int(parsed.timestamp())
+
+
+def _iter_history_points(path: Path) -> Iterator[tuple[str, int, int | None]]:
+    skipped = 0
+    for record in _iter_json_records(path):
+        try:
+            url = str(record["url"]).strip()
+            ts = _history_ts(record["ts"])
+            price = record.get("price")
+            price = None if price is None else int(price)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            skipped += 1
+            continue
+        if url:
+            yield url, ts, price
+        else:
+            skipped += 1
+    if skipped:
+        print(f"migrate: history: {path.name}: {skipped} malformed rows skipped")
+
+
+async def _import_price_history(conn, path: Path) -> tuple[bool, int]:
+    """Bulk-load one exported price history file into price_series."""
+    if not path.exists():
+        print(f"migrate: ERROR history file not found: {path}")
+        return False, 0
+
+    async def _write(conn, chunk: list[tuple[str, int, int | None]]) -> int:
+        ids = await _intern_urls(conn, (url for url, _, _ in chunk))
+        await price_series.insert_points(
+            conn, [(ids[url], ts, price) for url, ts, price in chunk]
+        )
+        return len(chunk)  # points already stored count as imported
 
-    except Exception:
-        await conn.execute("ROLLBACK")
-        raise
+    return await _import_chunks(
+        conn, "history", path, _iter_history_points(path), _write
+    )
 
 
 def _backup_json(path: str) -> None:
@@ -145,17 +402,23 @@ def _backup_json(path: str) -> None:
         p.rename(str(p) + ".bak")
 
 
+def _bot_running() -> bool:
+    if LOCK_FILE.exists():
+        print(
+            "migrate: ERROR bot is running (.main.lock exists). "
+            "Stop the bot before migrating."
+        )
+        return True
+    return False
+
+
 # ── Entry point ───────────────────────────────────────────────────────────────
 
 
 async def main() -> bool:
     """Run the full migration. Returns True on success, False on failure/refusal."""
     # 1. Bot-running guard
-    if LOCK_FILE.exists():
-        print(
-            "migrate: ERROR bot is running (.main.lock exists). "
-            "Stop the bot before migrating."
-        )
+    if _bot_running():
         return False
 
     # 2. Open DB (creates tables if needed)
@@ -186,6 +449,33 @@ async def main() -> bool:
     return True
 
 
+async def import_history(paths: list[str]) -> bool:
+    """Bulk-load exported price history files. Returns True if all succeeded."""
+    if _bot_running():
+        return False
+
+    await db.open_db()
+    try:
+        conn = db.get_conn()
+        for path in paths:
+            ok, count = await _import_price_history(conn, Path(path))
+            if not ok:
+                return False
+            print(f"migrate: history: {path}: {count} rows imported")
+    finally:
+        await db.close_db()
+    return True
+
+
 if __name__ == "__main__":
-    success = asyncio.run(main())
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument(
+        "--history",
+        nargs="+",
+        metavar="FILE",
+        help="bulk-load exported price history (JSONL or JSON array)",
+    )
+    args = parser.parse_args()
+    coro = import_history(args.history) if args.history else main()
+    success = asyncio.run(coro)
     sys.exit(0 if success else 1)
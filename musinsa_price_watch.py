@@ -37,6 +37,7 @@ from utils import (
 from adapters import pick_adapter
 from diagnostics import reset_diagnostic_capture_budget
 import db
+import price_series
 
 _log = logging.getLogger("musinsa_bot.price")
 _log_sheet = logging.getLogger("musinsa_bot.sheet")
@@ -55,7 +56,7 @@ _DB_ALERT_THRESHOLD: int = 5
 
 
 async def _db_write_guarded(coro_factory) -> bool:
-    """Acquire DB write lock, run coro_factory(), handle failures.
+    """Run coro_factory() (writes go through db.execute_write), handle failures.
 
     Returns True on success (resets _db_fail_count).
     Returns False on any Exception (increments _db_fail_count).
@@ -63,8 +64,7 @@ async def _db_write_guarded(coro_factory) -> bool:
     """
     global _db_fail_count
     try:
-        async with db._write_lock:
-            await coro_factory()
+        await coro_factory()
         _db_fail_count = 0
         return True
     except Exception as e:
@@ -82,13 +82,12 @@ async def _db_log_price_check(url: str, price: int | None, kind: str) -> None:
     """Insert a row into price_checks for changed or error results."""
 
     async def _write():
-        conn = db.get_conn()
-        await conn.execute(
-            "INSERT INTO price_checks(url, price, kind, checked_at) "
+        url_id = (await db.intern_urls([url]))[url]
+        await db.execute_write(
+            "INSERT INTO price_checks(url_id, price, kind, checked_at) "
             "VALUES (?, ?, ?, datetime('now'))",
-            (url, price, kind),
+            (url_id, price, kind),
         )
-        await conn.commit()
 
     await _db_write_guarded(_write)
 
@@ -102,13 +101,13 @@ async def _db_log_price_event(
     """Insert a row into price_events for price transitions."""
 
     async def _write():
-        conn = db.get_conn()
-        await conn.execute(
-            "INSERT INTO price_events(url, old_price, new_price, event_type, detected_at) "
+        url_id = (await db.intern_urls([url]))[url]
+        await db.execute_write(
+            "INSERT INTO price_events"
+            "(url_id, old_price, new_price, event_type, detected_at) "
             "VALUES (?, ?, ?, ?, datetime('now'))",
-            (url, old_price, new_price, event_type),
+            (url_id, old_price, new_price, event_type),
         )
-        await conn.commit()
 
     await _db_write_guarded(_write)
 
@@ -122,17 +121,26 @@ async def _db_log_adapter_run(
     """Insert a row into adapter_runs for error results."""
 
     async def _write():
-        conn = db.get_conn()
-        await conn.execute(
-            "INSERT INTO adapter_runs(adapter, url, error, traceback, run_at) "
+        url_id = (await db.intern_urls([url], adapter=adapter_name))[url]
+        await db.execute_write(
+            "INSERT INTO adapter_runs(adapter, url_id, error, traceback, run_at) "
             "VALUES (?, ?, ?, ?, datetime('now'))",
-            (adapter_name, url, error, tb),
+            (adapter_name, url_id, error, tb),
         )
-        await conn.commit()
 
     await _db_write_guarded(_write)
 
 
+async def _intern_result_urls(results: list) -> None:
+    """Intern checked URLs per adapter (fills urls.adapter, warms the id cache)."""
+    by_adapter: dict[str, list[str]] = defaultdict(list)
+    for result in results:
+        if not isinstance(result, Exception):
+            by_adapter[str(result["adapter"].name)].append(result["url"])
+    for adapter_name, urls in by_adapter.items():
+        await db.intern_urls(urls, adapter=adapter_name)
+
+
 # ---------------- Google Sheets ----------------
 def google_creds():
     return Credentials.from_service_account_file(
@@ -244,9 +252,11 @@ def _log_url_reload_stats(stats: dict) -> None:
 async def load_state():
     global state
     try:
-        conn = db.get_conn()
-        async with conn.execute("SELECT url, price FROM price_state") as cur:
-            rows = await cur.fetchall()
+        rows = await db.fetch_with_legacy(
+            "price_state",
+            "SELECT u.url, s.price FROM price_state s JOIN urls u ON u.id = s.url_id",
+            "SELECT url, price FROM price_state_legacy",
+        )
         state = {row[0]: row[1] for row in rows}
     except Exception:
         state = {}
@@ -258,20 +268,13 @@ async def save_state():
         return
 
     async def _do_upsert():
-        conn = db.get_conn()
         now = datetime.now(KST).isoformat()
-        await conn.execute("BEGIN IMMEDIATE")
-        try:
-            for url, price in state.items():
-                await conn.execute(
-                    "INSERT OR REPLACE INTO price_state(url, price, updated_at)"
-                    " VALUES (?,?,?)",
-                    (url, price, now),
-                )
-            await conn.commit()
-        except Exception:
-            await conn.execute("ROLLBACK")
-            raise
+        url_ids = await db.intern_urls(state.keys())
+        await db.execute_write_many(
+            "INSERT OR REPLACE INTO price_state(url_id, price, updated_at) "
+            "VALUES (?,?,?)",
+            [(url_ids[url], price, now) for url, price in state.items()],
+        )
 
     await _db_write_guarded(_do_upsert)
 
@@ -506,6 +509,8 @@ async def check_once():
         await context.close()
         await browser.close()
 
+    await _db_write_guarded(lambda: _intern_result_urls(results))
+
     if ws is None:
         try:
             ws = _open_sheet()
@@ -527,6 +532,7 @@ async def check_once():
     reconciled_count = 0
     error_count = 0
     pending_cells: list[gspread.Cell] = []
+    observations: list[tuple[str, int | None]] = []
 
     for result in results:
         if isinstance(result, Exception):
@@ -687,6 +693,7 @@ async def check_once():
                 await post_webhook(ad.webhook_url(), "가격 변동 알림", embeds=embeds)
 
         state[url] = curr
+        observations.append((url, curr))
         if changed:
             changed_count += 1
         if reconciled:
@@ -703,6 +710,7 @@ async def check_once():
         except Exception as e:
             _log_sheet.error(f"Batch update error: {e}")
 
+    await _db_write_guarded(lambda: price_series.record_prices(observations))
     await save_state()
     elapsed = asyncio.get_running_loop().time() - run_started
     summary_stats = url_reload_stats or _last_url_reload_stats or {}
@@ -0,0 +1,270 @@
+"""
+price_series.py
+Compact price time series for charting: interned URL ids, epoch-second
+timestamps and integer prices in WITHOUT ROWID tables, with hourly/daily
+min/max/last rollups maintained on write.
+
+A raw point costs ~10 bytes: url_id + ts + price varints inside the
+primary-key b-tree. URLs are interned through db.intern_urls().
+
+Dependency chain: config <- db <- price_series
+
+Public API:
+  vendor_item_key(vid)  — series key for a Coupang vendorItemId
+  record_prices(obs)    — append observations and update rollups
+  insert_points(conn, points) — bulk insert inside the caller's transaction
+  price_history(...)    — raw / hour / day arrays for a URL or vendorItemId
+  prune_raw(days)       — drop raw points older than days (rollups are kept)
+"""
+
+import asyncio
+import time
+
+import db
+
+try:
+    import numpy as _np  # price_history() 결과 배열 (선택)
+except Exception:
+    _np = None
+
+SOLDOUT = -1  # price value used in history arrays for sold-out observations
+_KST_OFFSET = 9 * 3600  # daily buckets start at KST midnight
+
+_ROLLUP_UPSERT = """
+INSERT INTO {table}(url_id, bucket, min_price, max_price, last_ts, last_price, samples)
+VALUES (?, ?, ?, ?, ?, ?, 1)
+ON CONFLICT(url_id, bucket) DO UPDATE SET
+    min_price = CASE
+        WHEN excluded.min_price IS NULL THEN min_price
+        WHEN min_price IS NULL THEN excluded.min_price
+        ELSE MIN(min_price, excluded.min_price) END,
+    max_price = CASE
+        WHEN excluded.max_price IS NULL THEN max_price
+        WHEN max_price IS NULL THEN excluded.max_price
+        ELSE MAX(max_price, excluded.max_price) END,
+    last_price = CASE
+        WHEN excluded.last_ts >= last_ts THEN excluded.last_price
+        ELSE last_price END,
+    last_ts = MAX(last_ts, excluded.last_ts),
+    samples = samples + 1
+"""
+
+PRUNE_BATCH_ROWS = 5000
+_PRUNE_SQL = """
+DELETE FROM price_series WHERE url_id = ?1 AND ts IN (
+    SELECT ts FROM price_series WHERE url_id = ?1 AND ts < ?2 ORDER BY ts LIMIT ?3
+)
+"""
+
+_RESOLUTIONS = {
+    "hour": "price_series_hourly",
+    "day": "price_series_daily",
+}
+
+
+def vendor_item_key(vendor_item_id: str | int) -> str:
+    """Series key under which Coupang vendorItemId prices are recorded."""
+    return f"coupang:vendor-item:{str(vendor_item_id).strip()}"
+
+
+def _hour_bucket(ts: int) -> int:
+    return ts - ts % 3600
+
+
+def _day_bucket(ts: int) -> int:
+    return ts - (ts + _KST_OFFSET) % 86400
+
+
+async def record_prices(
+    observations: list[tuple[str, int | None]], ts: int | None = None
+) -> int:
+    """Append (url, price) observations at ts (epoch seconds, default now).
+
+    price None means sold out. The raw points and both rollups are written in
+    one transaction, so a chart never sees a point without its rollups.
+    Returns: number of points written.
+    """
+    if not observations:
+        return 0
+    ts = int(ts if ts is not None else time.time())
+    ids = await db.intern_urls(url for url, _ in observations)
+    points = [(ids[url], price) for url, price in observations if url in ids]
+    if not points:
+        return 0
+
+    hour, day = _hour_bucket(ts), _day_bucket(ts)
+    conn = db.get_write_conn()
+    async with db._write_lock:
+        await conn.execute("BEGIN IMMEDIATE")
+        try:
+            await conn.executemany(
+                "INSERT OR REPLACE INTO price_series(url_id, ts, price)"
+                " VALUES (?, ?, ?)",
+                [(url_id, ts, price) for url_id, price in points],
+            )
+            for table, bucket in (
+                ("price_series_hourly", hour),
+                ("price_series_daily", day),
+            ):
+                await conn.executemany(
+                    _ROLLUP_UPSERT.format(table=table),
+                    [
+                        (url_id, bucket, price, price, ts, price)
+                        for url_id, price in points
+                    ],
+                )
+            await conn.commit()
+        except Exception:
+            await conn.execute("ROLLBACK")
+            raise
+    return len(points)
+
+
+async def insert_points(conn, points: list[tuple[int, int, int | None]]) -> int:
+    """Insert (url_id, ts, price) points inside the caller's open transaction.
+
+    Used by bulk imports (migrate.py --history). Points already stored are
+    skipped, so the rollups count each point once even if a file is re-read.
+    Returns: number of new points.
+    """
+    if not points:
+        return 0
+    url_ids = sorted({url_id for url_id, _, _ in points})
+    lo = min(ts for _, ts, _ in points)
+    hi = max(ts for _, ts, _ in points)
+    existing: set[tuple[int, int]] = set()
+    for start in range(0, len(url_ids), 500):
+        chunk = url_ids[start : start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        async with conn.execute(
+            "SELECT url_id, ts FROM price_series "
+            f"WHERE url_id IN ({placeholders}) AND ts BETWEEN ? AND ?",
+            [*chunk, lo, hi],
+        ) as cur:
+            existing.update((url_id, ts) for url_id, ts in await cur.fetchall())
+    new = {
+        (url_id, ts): price
+        for url_id, ts, price in points
+        if (url_id, ts) not in existing
+    }
+    if not new:
+        return 0
+
+    await conn.executemany(
+        "INSERT INTO price_series(url_id, ts, price) VALUES (?, ?, ?)",
+        [(url_id, ts, price) for (url_id, ts), price in new.items()],
+    )
+    for table, bucket in (
+        ("price_series_hourly", _hour_bucket),
+        ("price_series_daily", _day_bucket),
+    ):
+        await conn.executemany(
+            _ROLLUP_UPSERT.format(table=table),
+            [
+                (url_id, bucket(ts), price, price, ts, price)
+                for (url_id, ts), price in new.items()
+            ],
+        )
+    return len(new)
+
+
+def _column(values: list, dtype: str):
+    if _np is None:
+        return values
+    return _np.asarray(values, dtype=dtype)
+
+
+async def price_history(
+    url: str | None = None,
+    *,
+    vendor_item_id: str | int | None = None,
+    since: int | None = None,
+    until: int | None = None,
+    resolution: str = "raw",
+) -> dict:
+    """Price history for one URL (or Coupang vendorItemId) as columnar arrays.
+
+    resolution="raw" → {"ts", "price"}; "hour"/"day" → {"ts", "min", "max",
+    "last", "samples"} with ts = bucket start. ts is int64 epoch seconds and
+    prices are int32 with SOLDOUT (-1) for sold-out points. Returns numpy arrays
+    when numpy is installed, plain lists otherwise.
+    """
+    if vendor_item_id is not None:
+        url = vendor_item_key(vendor_item_id)
+    if not url:
+        raise ValueError("url or vendor_item_id is required")
+    if resolution != "raw" and resolution not in _RESOLUTIONS:
+        raise ValueError(f"unknown resolution: {resolution}")
+
+    lo = 0 if since is None else int(since)
+    hi = 2**62 if until is None else int(until)
+    async with db.get_read_conn() as conn:
+        async with conn.execute("SELECT id FROM urls WHERE url = ?", (url,)) as cur:
+            row = await cur.fetchone()
+        rows = []
+        if row is not None and resolution == "raw":
+            async with conn.execute(
+                "SELECT ts, price FROM price_series "
+                "WHERE url_id = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (row[0], lo, hi),
+            ) as cur:
+                rows = await cur.fetchall()
+        elif row is not None:
+            async with conn.execute(
+                "SELECT bucket, min_price, max_price, last_price, samples "
+                f"FROM {_RESOLUTIONS[resolution]} "
+                "WHERE url_id = ? AND bucket BETWEEN ? AND ? ORDER BY bucket",
+                (row[0], lo, hi),
+            ) as cur:
+                rows = await cur.fetchall()
+
+    def _prices(index: int) -> list[int]:
+        return [SOLDOUT if r[index] is None else r[index] for r in rows]
+
+    if resolution == "raw":
+        return {
+            "ts": _column([r[0] for r in rows], "int64"),
+            "price": _column(_prices(1), "int32"),
+        }
+    return {
+        "ts": _column([r[0] for r in rows], "int64"),
+        "min": _column(_prices(1), "int32"),
+        "max": _column(_prices(2), "int32"),
+        "last": _column(_prices(3), "int32"),
+        "samples": _column([r[4] for r in rows], "int32"),
+    }
+
+
+async def prune_raw(days: int) -> int:
+    """Delete raw points older than days; hourly/daily rollups are kept.
+
+    Deletes at most PRUNE_BATCH_ROWS points per transaction (primary-key seeks
+    per url_id), releasing db._write_lock between batches.
+    """
+    cutoff = int(time.time()) - int(days) * 86400
+    async with db.get_read_conn() as conn:
+        async with conn.execute("SELECT id FROM urls ORDER BY id") as cur:
+            url_ids = [row[0] for row in await cur.fetchall()]
+
+    conn = db.get_write_conn()
+    deleted = 0
+    index = 0
+    while index < len(url_ids):
+        budget = PRUNE_BATCH_ROWS
+        async with db._write_lock:
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                while index < len(url_ids) and budget > 0:
+                    cursor = await conn.execute(
+                        _PRUNE_SQL, (url_ids[index], cutoff, budget)
+                    )
+                    if cursor.rowcount < budget:
+                        index += 1  # this url has no expired points left
+                    budget -= cursor.rowcount
+                await conn.commit()
+            except Exception:
+                await conn.execute("ROLLBACK")
+                raise
+        deleted += PRUNE_BATCH_ROWS - budget
+        await asyncio.sleep(0)
+    return deleted
@@ -0,0 +1,186 @@
+"""
+product_names.py
+상품명 정규화 파이프라인 (소싱목록 ↔ 쿠팡상품관리 매칭 공용).
+- 정규식은 모듈 로드 시 1회 컴파일
+- 같은 문자열 반복 정규화는 크기 제한 LRU 캐시로 재사용 (hit/miss 통계 제공)
+의존: 없음 (setup_coupang_match.py 단독 실행에서도 import 가능)
+"""
+
+import os
+import re
+from functools import lru_cache
+
+NAME_CACHE_SIZE = int(os.getenv("PRODUCT_NAME_CACHE_SIZE", "16384"))
+
+_RE_MEASURE = re.compile(
+    r"(?P<num>\d+(?:[.,]\d+)?)\s*(?P<unit>kg|g|gr|ml|l)\b", re.IGNORECASE
+)
+_RE_SINGLE_PRODUCT = re.compile(r"\b단일상품\b", re.IGNORECASE)
+_RE_SINGLE_ITEM = re.compile(r"\b단품\b", re.IGNORECASE)
+_RE_MULTIPLIER = re.compile(r"(?<![0-9a-z가-힣])(?:x|×|\*)\s*(\d+)\b", re.IGNORECASE)
+_RE_COUNT_UNIT = re.compile(
+    r"\b(\d+)\s*(?:ea|개입|입|개|박스|box|팩|pack|세트)\b", re.IGNORECASE
+)
+_RE_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+_RE_SPACES = re.compile(r"\s+")
+_RE_PAREN = re.compile(r"\([^)]*\)")
+_RE_BRACKET = re.compile(r"\[[^\]]*\]")
+_RE_ANY_BRACKET = re.compile(r"[\(\[][^)\]]*[\)\]]")
+_RE_SINGLE_UNIT = re.compile(
+    r"\b(?:단일상품|단품|1\s*(?:개|박스|box|팩|pack|세트|입|개입|ea))\b",
+    re.IGNORECASE,
+)
+_RE_DIGITS = re.compile(r"\d+")
+_RE_COUNT = re.compile(r"(\d+)개")
+
+
+def parse_product_number(raw: str) -> float | None:
+    value = (raw or "").strip()
+    if not value:
+        return None
+
+    if "," in value and "." not in value:
+        head, tail = value.split(",", 1)
+        if len(tail) == 3:
+            value = value.replace(",", "")
+        else:
+            value = value.replace(",", ".")
+    else:
+        value = value.replace(",", "")
+
+    try:
+        return float(value)
+    except Exception:
+        return None
+
+
+def compact_number_str(value: float) -> str:
+    if abs(value - round(value)) < 1e-9:
+        return str(int(round(value)))
+    return f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+def _measure_repl(match: re.Match[str]) -> str:
+    number = parse_product_number(match.group("num"))
+    unit = (match.group("unit") or "").lower()
+    if number is None:
+        return match.group(0)
+    if unit == "kg":
+        return f"{int(round(number * 1000))}g"
+    if unit in {"g", "gr"}:
+        return f"{compact_number_str(number)}g"
+    if unit == "l":
+        return f"{int(round(number * 1000))}ml"
+    if unit == "ml":
+        return f"{compact_number_str(number)}ml"
+    return match.group(0)
+
+
+def canonicalize_measure_tokens(value: str) -> str:
+    return _RE_MEASURE.sub(_measure_repl, value)
+
+
+def canonicalize_count_tokens(value: str) -> str:
+    normalized = _RE_SINGLE_PRODUCT.sub(" 1개 ", value)
+    normalized = _RE_SINGLE_ITEM.sub(" 1개 ", normalized)
+    normalized = _RE_MULTIPLIER.sub(lambda m: f" {m.group(1)}개 ", normalized)
+    return _RE_COUNT_UNIT.sub(lambda m: f" {m.group(1)}개 ", normalized)
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def normalize_product_name(name: str) -> str:
+    value = (name or "").strip().lower()
+    value = canonicalize_measure_tokens(value)
+    value = canonicalize_count_tokens(value)
+    value = _RE_NON_WORD.sub(" ", value)
+    return _RE_SPACES.sub(" ", value).strip()
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _product_name_variants(raw: str) -> tuple[str, ...]:
+    variants = {raw}
+    if " / " in raw:
+        variants.add(raw.split(" / ", 1)[0].strip())
+    if "/" in raw:
+        variants.add(raw.split("/", 1)[0].strip())
+
+    expanded: list[str] = []
+    seen: set[str] = set()
+    for variant in variants:
+        for candidate in (
+            variant,
+            _RE_PAREN.sub(" ", variant),
+            _RE_BRACKET.sub(" ", variant),
+            _RE_ANY_BRACKET.sub(" ", variant),
+            _RE_SINGLE_UNIT.sub(" ", variant),
+        ):
+            cleaned = _RE_SPACES.sub(" ", candidate).strip(" /").strip()
+            if cleaned and cleaned not in seen:
+                seen.add(cleaned)
+                expanded.append(cleaned)
+    return tuple(expanded)
+
+
+def product_name_variants(name: str) -> list[str]:
+    raw = (name or "").strip()
+    if not raw:
+        return []
+    return list(_product_name_variants(raw))
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def name_token_set(name: str) -> frozenset[str]:
+    normalized = normalize_product_name(name)
+    if not normalized:
+        return frozenset()
+    return frozenset(t for t in normalized.split(" ") if len(t) >= 2)
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def name_number_set(name: str) -> frozenset[str]:
+    normalized = normalize_product_name(name)
+    if not normalized:
+        return frozenset()
+    return frozenset(_RE_DIGITS.findall(normalized))
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def name_count_set(name: str) -> frozenset[str]:
+    normalized = normalize_product_name(name)
+    if not normalized:
+        return frozenset()
+    return frozenset(_RE_COUNT.findall(normalized))
+
+
+_CACHED = {
+    "normalize": normalize_product_name,
+    "variants": _product_name_variants,
+    "tokens": name_token_set,
+    "numbers": name_number_set,
+    "counts": name_count_set,
+}
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """캐시별 hit/miss/현재 크기."""
+    stats = {}
+    for label, func in _CACHED.items():
+        info = func.cache_info()
+        stats[label] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+        }
+    return stats
+
+
+def cache_summary() -> str:
+    """로그용 한 줄 요약 (예: 'normalize 120/15 ...' = hit/miss)."""
+    return " | ".join(
+        f"{label} {s['hits']}/{s['misses']}" for label, s in cache_stats().items()
+    )
+
+
+def cache_clear() -> None:
+    for func in _CACHED.values():
+        func.cache_clear()
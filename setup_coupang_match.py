@@ -16,6 +16,8 @@ import gspread
 from google.oauth2.service_account import Credentials
 from dotenv import load_dotenv
 
+from product_names import normalize_product_name
+
 try:
     from rapidfuzz import fuzz, process as rfprocess
 
@@ -307,6 +309,8 @@ def match_sourcing_to_coupang(gc, coupang_items):
     for item in coupang_items:
         product_to_vids[item["productName"]].append(item["vendorItemId"])
     coupang_names = list(product_to_vids.keys())
+    # 봇 자동매칭(coupang_manager)과 같은 정규화 규칙으로 비교한다.
+    normalized_names = {n: normalize_product_name(n) for n in coupang_names}
 
     matched_count = 0
     skipped_count = 0
@@ -328,11 +332,15 @@ def match_sourcing_to_coupang(gc, coupang_items):
             skipped_count += 1
             continue
 
-        # 퍼지 매칭
+        # 정규화 이름 정확 일치 우선, 없으면 퍼지 매칭
+        sourcing_key = normalize_product_name(sourcing_name)
         best_name = None
         best_score = 0
         for cname in coupang_names:
-            score = fuzzy_score(sourcing_name, cname)
+            if sourcing_key and sourcing_key == normalized_names[cname]:
+                best_name, best_score = cname, 100
+                break
+            score = fuzzy_score(sourcing_key, normalized_names[cname])
             if score > best_score:
                 best_score = score
                 best_name = cname
@@ -352,7 +360,10 @@ def match_sourcing_to_coupang(gc, coupang_items):
             )
         else:
             top = sorted(
-                [(fuzzy_score(sourcing_name, n), n) for n in coupang_names],
+                [
+                    (fuzzy_score(sourcing_key, normalized_names[n]), n)
+                    for n in coupang_names
+                ],
                 reverse=True,
             )[:3]
             print(f"  ⚠️  매칭 실패 (점수 {best_score}) → '{sourcing_name}'")
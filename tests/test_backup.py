@@ -0,0 +1,152 @@
+"""
+tests/test_backup.py
+Online backup (page-stepped backup API + gzip + rotation) and restore.
+"""
+
+import asyncio
+import gzip
+import os
+import sqlite3
+
+import pytest
+
+import backup
+import db
+
+
+async def _open(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "ops.db"))
+    monkeypatch.setattr(db, "_conn", None)
+    monkeypatch.setattr(backup, "LOCK_FILE", tmp_path / ".main.lock")
+    await db.open_db()
+
+
+async def _fill(rows: int, start: int = 0) -> None:
+    await db.execute_write_many(
+        "INSERT INTO sourcing_price_state VALUES (?, ?, datetime('now'))",
+        [(f"row-{n}", n) for n in range(start, start + rows)],
+    )
+
+
+def _count(path: str) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM sourcing_price_state").fetchone()[0]
+    finally:
+        conn.close()
+
+
+async def test_backup_is_consistent_while_writes_continue(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    dest = tmp_path / "backups"
+    try:
+        await _fill(2000)
+        task = asyncio.create_task(
+            backup.create_backup(str(dest), keep=3, step_pages=4)
+        )
+        written = 0
+        while not task.done():
+            await _fill(10, start=2000 + written)
+            written += 10
+        report = await task
+
+        archive = report["path"]
+        assert archive.endswith(".db.gz") and report["pages"] > 4
+        restored = str(tmp_path / "unpacked.db")
+        with gzip.open(archive) as src, open(restored, "wb") as dst:
+            dst.write(src.read())
+        # A single snapshot: every committed batch is either fully in or out.
+        assert 2000 <= _count(restored) <= 2000 + written
+        assert _count(restored) % 10 == 0
+        assert not [p for p in os.listdir(dest) if not p.endswith(".db.gz")]
+    finally:
+        await db.close_db()
+
+
+async def test_rotate_keeps_newest(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "ops.db"))
+    for n in range(4):
+        path = tmp_path / f"ops-2026010{n}-030000.db.gz"
+        path.write_bytes(b"")
+        os.utime(path, ns=(n * 10**9, n * 10**9))
+    (tmp_path / "other.db.gz").write_bytes(b"")
+
+    removed = backup.rotate(2, str(tmp_path))
+
+    assert sorted(p.name for p in removed) == [
+        "ops-20260100-030000.db.gz",
+        "ops-20260101-030000.db.gz",
+    ]
+    assert [p.name for p in backup.list_backups(str(tmp_path))] == [
+        "ops-20260103-030000.db.gz",
+        "ops-20260102-030000.db.gz",
+    ]
+
+
+async def test_restore_replaces_db_and_keeps_previous(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        await _fill(5)
+        report = await backup.create_backup(str(tmp_path / "backups"))
+        await _fill(3, start=5)
+    finally:
+        await db.close_db()
+
+    kept = backup.restore_backup(report["path"])
+
+    assert _count(db.DB_FILE) == 5
+    assert kept is not None and _count(str(kept)) == 8
+    await db.open_db()
+    try:
+        assert await db.current_schema_version() == max(
+            m.version for m in db._MIGRATIONS
+        )
+    finally:
+        await db.close_db()
+
+
+async def test_restore_refuses_while_bot_running(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        report = await backup.create_backup(str(tmp_path / "backups"))
+    finally:
+        await db.close_db()
+    backup.LOCK_FILE.write_text("1")
+
+    with pytest.raises(RuntimeError, match="main.lock"):
+        backup.restore_backup(report["path"])
+
+
+async def test_restore_rejects_corrupt_archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "ops.db"))
+    monkeypatch.setattr(backup, "LOCK_FILE", tmp_path / ".main.lock")
+    (tmp_path / "ops.db").write_bytes(b"keep me")
+    archive = tmp_path / "ops-bad.db.gz"
+    with gzip.open(archive, "wb") as fh:
+        fh.write(b"not a database" * 100)
+
+    with pytest.raises(sqlite3.DatabaseError):
+        backup.restore_backup(str(archive))
+    assert (tmp_path / "ops.db").read_bytes() == b"keep me"
+    assert not (tmp_path / ".ops.db.restore").exists()
+
+
+def test_convert_auto_vacuum_is_offline_and_one_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup, "LOCK_FILE", tmp_path / ".main.lock")
+    path = str(tmp_path / "ops.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x)")
+    conn.close()
+
+    backup.LOCK_FILE.write_text("1")
+    with pytest.raises(RuntimeError, match="main.lock"):
+        backup.convert_auto_vacuum(path)
+    backup.LOCK_FILE.unlink()
+
+    assert backup.convert_auto_vacuum(path) is True
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    finally:
+        conn.close()
+    assert backup.convert_auto_vacuum(path) is False
@@ -108,14 +108,179 @@ async def test_all_7_tables_exist(tmp_path, monkeypatch):
 
 
 async def test_schema_version_seeded(tmp_path, monkeypatch):
-    """After open_db(), schema_version has exactly one row with version=1."""
+    """After open_db(), schema_version has version=1 once plus one row per migration."""
     await _open(tmp_path, monkeypatch)
     try:
         conn = db.get_conn()
-        async with conn.execute("SELECT version FROM schema_version") as cursor:
+        async with conn.execute(
+            "SELECT version FROM schema_version ORDER BY version"
+        ) as cursor:
             rows = await cursor.fetchall()
-        assert len(rows) == 1
-        assert rows[0][0] == 1
+        assert [r[0] for r in rows] == [1] + [m.version for m in db._MIGRATIONS]
+    finally:
+        await _cleanup()
+
+
+async def test_reopen_does_not_duplicate_schema_version(tmp_path, monkeypatch):
+    """Reopening an existing DB adds no schema_version rows."""
+    await _open(tmp_path, monkeypatch)
+    await db.close_db()
+    await db.open_db()
+    try:
+        conn = db.get_conn()
+        async with conn.execute("SELECT COUNT(*) FROM schema_version") as cursor:
+            assert (await cursor.fetchone())[0] == 1 + len(db._MIGRATIONS)
+    finally:
+        await _cleanup()
+
+
+async def test_version_1_db_is_migrated(tmp_path, monkeypatch):
+    """A DB left at schema version 1 gets the log indexes on open."""
+    import sqlite3
+
+    db_path = str(tmp_path / "test_ops.db")
+    legacy = sqlite3.connect(db_path)
+    legacy.execute(
+        "CREATE TABLE schema_version (version INTEGER NOT NULL, applied_at TEXT NOT NULL)"
+    )
+    legacy.executescript(db._SCHEMA_SQL + db._BASELINE_SQL)
+    legacy.execute("INSERT INTO schema_version VALUES (1, datetime('now'))")
+    legacy.commit()
+    legacy.close()
+
+    monkeypatch.setattr(db, "DB_FILE", db_path)
+    monkeypatch.setattr(db, "_conn", None)
+    await db.open_db()
+    try:
+        conn = db.get_conn()
+        async with conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='index'"
+        ) as cursor:
+            indexes = {r[0] for r in await cursor.fetchall()}
+        assert {
+            "idx_price_checks_url_time",
+            "idx_job_runs_job_started",
+            "idx_adapter_runs_adapter_time",
+        } <= indexes
+        async with conn.execute(
+            "EXPLAIN QUERY PLAN SELECT price FROM price_checks "
+            "WHERE url_id = ? ORDER BY checked_at DESC LIMIT 1",
+            (1,),
+        ) as cursor:
+            plan = " ".join(str(r[-1]) for r in await cursor.fetchall())
+        assert "COVERING INDEX idx_price_checks_url_time" in plan
+    finally:
+        await _cleanup()
+
+
+async def test_retention_rolls_up_and_prunes(tmp_path, monkeypatch):
+    """Old raw rows move into *_daily tables; recent rows stay raw."""
+    await _open(tmp_path, monkeypatch)
+    try:
+        conn = db.get_conn()
+        u1 = (await db.intern_urls(["u1"]))["u1"]
+        await conn.executemany(
+            "INSERT INTO price_checks(url_id, price, kind, checked_at) VALUES (?,?,?,?)",
+            [
+                (u1, 1000, "changed", "2020-01-01 01:00:00"),
+                (u1, 900, "changed", "2020-01-01 02:00:00"),
+                (u1, None, "error", "2020-01-01 03:00:00"),
+                (u1, 800, "changed", "2999-01-01 00:00:00"),
+            ],
+        )
+        await conn.executemany(
+            "INSERT INTO job_runs(job_name, started_at, finished_at, status) "
+            "VALUES (?,?,?,?)",
+            [
+                ("sync", "2020-01-01 00:00:00", "2020-01-01 00:00:10", "success"),
+                ("sync", "2020-01-01 01:00:00", "2020-01-01 01:00:20", "success"),
+            ],
+        )
+        await conn.execute(
+            "INSERT INTO adapter_runs(adapter, url_id, run_at) "
+            "VALUES ('musinsa', ?, '2020-01-01 00:00:00')",
+            (u1,),
+        )
+        await conn.execute(
+            "INSERT INTO price_events(url_id, event_type, detected_at) "
+            "VALUES (?, 'drop', '2020-01-01 00:00:00')",
+            (u1,),
+        )
+        await conn.commit()
+
+        stats = await db.run_retention(raw_days=30, event_days=365)
+        assert stats["price_checks"] == 3
+        assert stats["job_runs"] == 2
+        assert stats["adapter_runs"] == 1
+        assert stats["price_events"] == 1
+
+        async with conn.execute(
+            "SELECT kind, checks, min_price, max_price FROM price_checks_daily "
+            "WHERE url_id=? AND day='2020-01-01' ORDER BY kind",
+            (u1,),
+        ) as cursor:
+            assert await cursor.fetchall() == [
+                ("changed", 2, 900, 1000),
+                ("error", 1, None, None),
+            ]
+        async with conn.execute(
+            "SELECT runs, total_seconds FROM job_runs_daily WHERE job_name='sync'"
+        ) as cursor:
+            runs, seconds = await cursor.fetchone()
+        assert runs == 2 and round(seconds) == 30
+        async with conn.execute("SELECT COUNT(*) FROM price_checks") as cursor:
+            assert (await cursor.fetchone())[0] == 1
+
+        # 배치를 나눠도 일별 집계는 같다 (배치마다 더해짐)
+        monkeypatch.setattr(db, "RETENTION_BATCH_ROWS", 1)
+        await conn.executemany(
+            "INSERT INTO price_checks(url_id, price, kind, checked_at) VALUES (?,?,?,?)",
+            [(u1, p, "changed", "2020-01-02 01:00:00") for p in (700, 800, 750)],
+        )
+        await conn.commit()
+        stats = await db.run_retention(raw_days=30, event_days=365)
+        assert stats["price_checks"] == 3
+        async with conn.execute(
+            "SELECT checks, min_price, max_price FROM price_checks_daily "
+            "WHERE url_id=? AND day='2020-01-02'",
+            (u1,),
+        ) as cursor:
+            assert await cursor.fetchall() == [(3, 700, 800)]
+
+        # 두 번째 실행은 지울 것이 없다.
+        stats = await db.run_retention(raw_days=30, event_days=365)
+        assert stats["price_checks"] == 0
+    finally:
+        await _cleanup()
+
+
+async def test_new_db_uses_incremental_auto_vacuum(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        conn = db.get_conn()
+        async with conn.execute("PRAGMA auto_vacuum") as cursor:
+            assert (await cursor.fetchone())[0] == 2
+        assert await db.incremental_vacuum() >= 0
+    finally:
+        await _cleanup()
+
+
+async def test_incremental_vacuum_skips_legacy_db(tmp_path, monkeypatch):
+    """A pre-INCREMENTAL file is left alone (no full VACUUM under _write_lock)."""
+    import sqlite3
+
+    db_path = str(tmp_path / "test_ops.db")
+    legacy = sqlite3.connect(db_path)
+    legacy.execute("CREATE TABLE filler (x)")
+    legacy.close()
+
+    monkeypatch.setattr(db, "DB_FILE", db_path)
+    monkeypatch.setattr(db, "_conn", None)
+    await db.open_db()
+    try:
+        assert await db.incremental_vacuum() == 0
+        async with db.get_conn().execute("PRAGMA auto_vacuum") as cursor:
+            assert (await cursor.fetchone())[0] == 0
     finally:
         await _cleanup()
 
@@ -133,3 +298,199 @@ async def test_db_file_constant_importable():
     from config import DB_FILE
 
     assert "ops.db" in DB_FILE
+
+
+async def test_read_pool_is_query_only(tmp_path, monkeypatch):
+    """get_read_conn() lends a pooled read-only connection distinct from the writer."""
+    import sqlite3
+
+    await _open(tmp_path, monkeypatch)
+    try:
+        async with db.get_read_conn() as reader:
+            assert reader is not db.get_write_conn()
+            assert reader in db._readers
+            with pytest.raises(sqlite3.OperationalError):
+                await reader.execute(
+                    "INSERT INTO sourcing_price_state VALUES ('u', 1, 'now')"
+                )
+        assert db._read_pool.qsize() == db.READ_POOL_SIZE
+    finally:
+        await _cleanup()
+    assert db._readers == []
+
+
+async def test_reads_do_not_wait_for_open_write(tmp_path, monkeypatch):
+    """A reader sees the last committed snapshot while a write transaction is open."""
+    import asyncio
+
+    await _open(tmp_path, monkeypatch)
+    try:
+        writer = db.get_write_conn()
+        await writer.execute(
+            "INSERT INTO sourcing_price_state VALUES ('u1', 100, 'now')"
+        )
+        await writer.commit()
+        async with db._write_lock:
+            await writer.execute("BEGIN IMMEDIATE")
+            await writer.execute("UPDATE sourcing_price_state SET min_price = 200")
+
+            async def read():
+                async with db.get_read_conn() as reader:
+                    async with reader.execute(
+                        "SELECT min_price FROM sourcing_price_state"
+                    ) as cur:
+                        return (await cur.fetchone())[0]
+
+            assert await asyncio.wait_for(read(), timeout=2) == 100
+            await writer.commit()
+        assert await read() == 200
+    finally:
+        await _cleanup()
+
+
+async def test_get_read_conn_raises_before_open(monkeypatch):
+    monkeypatch.setattr(db, "_conn", None)
+    with pytest.raises(RuntimeError, match="open_db"):
+        async with db.get_read_conn():
+            pass
+
+
+async def test_concurrent_writes_share_commits(tmp_path, monkeypatch):
+    """Concurrent execute_write() calls are committed in groups, each gets its rowid."""
+    import asyncio
+
+    await _open(tmp_path, monkeypatch)
+    try:
+        before = db.writer_stats()
+        rowids = await asyncio.gather(
+            *(
+                db.execute_write(
+                    "INSERT INTO job_runs(job_name, started_at, status) "
+                    "VALUES (?, datetime('now'), 'running')",
+                    (f"job{i}",),
+                )
+                for i in range(50)
+            )
+        )
+        after = db.writer_stats()
+        assert sorted(rowids) == list(range(1, 51))
+        assert after["statements"] - before["statements"] == 50
+        assert after["commits"] - before["commits"] < 5
+        async with db.get_read_conn() as reader:
+            async with reader.execute("SELECT COUNT(*) FROM job_runs") as cursor:
+                assert (await cursor.fetchone())[0] == 50
+    finally:
+        await _cleanup()
+
+
+async def test_failed_write_only_fails_its_caller(tmp_path, monkeypatch):
+    """A bad statement raises for its caller; the rest of the group commits."""
+    import asyncio
+    import sqlite3
+
+    await _open(tmp_path, monkeypatch)
+    try:
+        results = await asyncio.gather(
+            db.execute_write("INSERT INTO sourcing_price_state VALUES ('a', 1, 'now')"),
+            db.execute_write("INSERT INTO sourcing_price_state VALUES ('a', 2, 'now')"),
+            db.execute_write_many(
+                "INSERT INTO sourcing_price_state VALUES (?, ?, 'now')",
+                [("b", 1), ("c", 2)],
+            ),
+            return_exceptions=True,
+        )
+        assert isinstance(results[1], sqlite3.IntegrityError)
+        assert results[2] == 2
+        async with db.get_conn().execute(
+            "SELECT row_key, min_price FROM sourcing_price_state ORDER BY row_key"
+        ) as cursor:
+            assert await cursor.fetchall() == [("a", 1), ("b", 1), ("c", 2)]
+    finally:
+        await _cleanup()
+
+
+async def test_close_db_drains_queued_writes(tmp_path, monkeypatch):
+    import asyncio
+
+    await _open(tmp_path, monkeypatch)
+    pending = asyncio.ensure_future(
+        db.execute_write("INSERT INTO sourcing_price_state VALUES ('a', 1, 'now')")
+    )
+    await asyncio.sleep(0)
+    await db.close_db()
+    assert await pending == 1
+    await db.open_db()
+    try:
+        async with db.get_conn().execute(
+            "SELECT COUNT(*) FROM sourcing_price_state"
+        ) as cur:
+            assert (await cur.fetchone())[0] == 1
+    finally:
+        await _cleanup()
+
+
+async def test_pragma_profile_from_settings(tmp_path, monkeypatch):
+    """Writer and readers get the Settings pragma profile."""
+    from config import settings
+
+    monkeypatch.setattr(settings, "db_cache_size_kib", 4096)
+    monkeypatch.setattr(settings, "db_wal_autocheckpoint_pages", 500)
+    await _open(tmp_path, monkeypatch)
+    try:
+        writer = db.get_write_conn()
+        for pragma, expected in (
+            ("cache_size", -4096),
+            ("wal_autocheckpoint", 500),
+            ("temp_store", 2),
+            ("synchronous", 1),
+        ):
+            async with writer.execute(f"PRAGMA {pragma}") as cursor:
+                assert (await cursor.fetchone())[0] == expected, pragma
+        async with db.get_read_conn() as reader:
+            async with reader.execute("PRAGMA cache_size") as cursor:
+                assert (await cursor.fetchone())[0] == -4096
+            async with reader.execute("PRAGMA query_only") as cursor:
+                assert (await cursor.fetchone())[0] == 1
+    finally:
+        await _cleanup()
+
+
+async def test_maintenance_truncates_wal(tmp_path, monkeypatch):
+    """run_maintenance() checkpoints the WAL back to zero bytes and reports sizes."""
+    import os
+
+    db_path = await _open(tmp_path, monkeypatch)
+    try:
+        await db.execute_write_many(
+            "INSERT INTO sourcing_price_state VALUES (?, 1, 'now')",
+            [(f"https://example.com/{i}",) for i in range(2000)],
+        )
+        assert os.path.getsize(f"{db_path}-wal") > 0
+
+        report = await db.run_maintenance()
+        assert report["checkpoint_busy"] == 0
+        assert report["wal_bytes_before"] > 0
+        assert report["wal_bytes"] == 0
+        assert report["db_bytes"] > 0
+    finally:
+        await _cleanup()
+
+
+async def test_intern_urls_is_stable_and_fills_adapter(tmp_path, monkeypatch):
+    """intern_urls() returns the same id across cache resets and records adapters."""
+    await _open(tmp_path, monkeypatch)
+    url = "https://www.musinsa.com/products/1"
+    try:
+        first = await db.intern_urls([url, "https://shop.com/item/2", url])
+        db._url_ids.clear()
+        second = await db.intern_urls([url], adapter="musinsa")
+        assert len(first) == 2
+        assert second[url] == first[url]
+        await db.intern_urls([url], adapter="other")
+        async with db.get_conn().execute(
+            "SELECT domain, adapter FROM urls WHERE url = ?", (url,)
+        ) as cursor:
+            assert await cursor.fetchone() == ("www.musinsa.com", "musinsa")
+    finally:
+        await _cleanup()
+    assert db._url_ids == {}
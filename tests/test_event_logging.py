@@ -165,7 +165,9 @@ class TestDbLogPriceCheck:
         await mpw._db_log_price_check("https://example.com/item/1", 25000, "price")
 
         conn = db.get_conn()
-        async with conn.execute("SELECT url, price, kind FROM price_checks") as cur:
+        async with conn.execute(
+            "SELECT u.url, c.price, c.kind FROM price_checks c JOIN urls u ON u.id = c.url_id"
+        ) as cur:
             rows = await cur.fetchall()
 
         assert len(rows) == 1
@@ -178,7 +180,9 @@ class TestDbLogPriceCheck:
         await mpw._db_log_price_check("https://example.com/item/2", None, "soldout")
 
         conn = db.get_conn()
-        async with conn.execute("SELECT url, price, kind FROM price_checks") as cur:
+        async with conn.execute(
+            "SELECT u.url, c.price, c.kind FROM price_checks c JOIN urls u ON u.id = c.url_id"
+        ) as cur:
             rows = await cur.fetchall()
 
         assert len(rows) == 1
@@ -218,7 +222,8 @@ class TestDbLogPriceEvent:
 
         conn = db.get_conn()
         async with conn.execute(
-            "SELECT url, old_price, new_price, event_type FROM price_events"
+            "SELECT u.url, e.old_price, e.new_price, e.event_type "
+            "FROM price_events e JOIN urls u ON u.id = e.url_id"
         ) as cur:
             rows = await cur.fetchall()
 
@@ -316,7 +321,9 @@ class TestDbLogAdapterRun:
         )
 
         conn = db.get_conn()
-        async with conn.execute("SELECT adapter, url, error FROM adapter_runs") as cur:
+        async with conn.execute(
+            "SELECT a.adapter, u.url, a.error FROM adapter_runs a JOIN urls u ON u.id = a.url_id"
+        ) as cur:
             rows = await cur.fetchall()
 
         assert len(rows) == 1
@@ -390,7 +397,9 @@ class TestCheckOnceDbIntegration:
             await mpw._db_log_price_check(url, curr, kind)
 
         conn = db.get_conn()
-        async with conn.execute("SELECT url, price, kind FROM price_checks") as cur:
+        async with conn.execute(
+            "SELECT u.url, c.price, c.kind FROM price_checks c JOIN urls u ON u.id = c.url_id"
+        ) as cur:
             rows = await cur.fetchall()
 
         assert len(rows) == 1
@@ -571,7 +580,9 @@ class TestCheckOnceDbIntegration:
         )
 
         conn = db.get_conn()
-        async with conn.execute("SELECT adapter, url, error FROM adapter_runs") as cur:
+        async with conn.execute(
+            "SELECT a.adapter, u.url, a.error FROM adapter_runs a JOIN urls u ON u.id = a.url_id"
+        ) as cur:
             rows = await cur.fetchall()
 
         assert len(rows) == 1
@@ -6,6 +6,7 @@ Covers:
 - _try_db_job_start: INSERT row with status='running', return rowid
 - _try_db_job_finish: UPDATE row with status/error/finished_at
 - _run_with_lane_lock: records start/finish for every scheduled job execution
+- job metrics: lane / wait_ms / run_ms / counters and db.job_run_stats()
 
 All tests use file-backed tmp_path DBs (WAL mode does NOT work on :memory:).
 """
@@ -13,6 +14,7 @@ All tests use file-backed tmp_path DBs (WAL mode does NOT work on :memory:).
 import asyncio
 import pytest
 import db
+import job_metrics
 from main import _try_db_job_start, _try_db_job_finish, _run_with_lane_lock
 
 
@@ -66,15 +68,15 @@ async def test_job_start_returns_none_on_db_failure(tmp_path, monkeypatch):
     """_try_db_job_start returns None without raising when DB is unavailable."""
     await _open(tmp_path, monkeypatch)
     try:
-        monkeypatch.setattr(
-            db,
-            "get_conn",
-            lambda: (_ for _ in ()).throw(RuntimeError("DB not initialized")),
-        )
-        result = await _try_db_job_start("test_job")
+        with monkeypatch.context() as m:
+            m.setattr(
+                db,
+                "get_conn",
+                lambda: (_ for _ in ()).throw(RuntimeError("DB not initialized")),
+            )
+            result = await _try_db_job_start("test_job")
         assert result is None
     finally:
-        monkeypatch.undo()
         await _cleanup()
 
 
@@ -209,7 +211,7 @@ async def test_job_func_runs_even_when_db_start_fails(tmp_path, monkeypatch):
 
         import main as main_mod
 
-        async def _start_returns_none(job_name: str):
+        async def _start_returns_none(job_name: str, lane=None, wait_ms=None):
             return None
 
         monkeypatch.setattr(main_mod, "_try_db_job_start", _start_returns_none)
@@ -219,3 +221,78 @@ async def test_job_func_runs_even_when_db_start_fails(tmp_path, monkeypatch):
         assert len(executed) == 1
     finally:
         await _cleanup()
+
+
+# ── Job metrics ───────────────────────────────────────────────────────────────
+
+
+async def test_run_with_lane_lock_records_lane_timing_and_counters(
+    tmp_path, monkeypatch
+):
+    """Lane, wait/run ms and counters reported via job_metrics land in job_runs."""
+    await _open(tmp_path, monkeypatch)
+    try:
+
+        async def api_call():
+            await asyncio.sleep(0)
+            job_metrics.add(api_calls=1)
+
+        async def counting_job():
+            job_metrics.add(items_processed=3, items_changed=1)
+            await asyncio.gather(api_call(), api_call())
+            job_metrics.add(sheet_calls=1)
+
+        lock = asyncio.Lock()
+        await _run_with_lane_lock(lock, "product", "count_job", counting_job)
+
+        conn = db.get_conn()
+        async with conn.execute(
+            "SELECT lane, wait_ms, run_ms, items_processed, items_changed, "
+            "api_calls, sheet_calls FROM job_runs"
+        ) as cursor:
+            row = await cursor.fetchone()
+        assert row[0] == "product"
+        assert row[1] >= 0 and row[2] >= 0
+        assert row[3:] == (3, 1, 2, 1)
+        assert job_metrics.current() is None
+    finally:
+        await _cleanup()
+
+
+async def test_job_metrics_add_is_noop_outside_run():
+    job_metrics.add(api_calls=5)
+    assert job_metrics.current() is None
+    with job_metrics.track() as metrics:
+        job_metrics.add(api_calls=2)
+        with pytest.raises(ValueError):
+            job_metrics.add(bogus=1)
+    assert metrics.api_calls == 2
+
+
+async def test_job_run_stats_percentiles(tmp_path, monkeypatch):
+    """job_run_stats returns nearest-rank p50/p95 per job, busiest first."""
+    await _open(tmp_path, monkeypatch)
+    try:
+        rows = [("slow_job", "product", 10 * i, 100 * i, 1) for i in range(1, 21)]
+        rows += [("fast_job", "order", 0, 5, 0), ("fast_job", "order", 2, 7, 0)]
+        rows += [("unwrapped_job", None, None, None, None)]
+        await db.execute_write_many(
+            "INSERT INTO job_runs(job_name, started_at, status, lane, wait_ms, "
+            "run_ms, api_calls) VALUES (?, datetime('now'), 'success', ?, ?, ?, ?)",
+            rows,
+        )
+
+        stats = await db.job_run_stats(days=1)
+        assert [s["job_name"] for s in stats] == ["slow_job", "fast_job"]
+        slow = stats[0]
+        assert slow["runs"] == 20
+        assert slow["total_run_ms"] == sum(100 * i for i in range(1, 21))
+        assert (slow["run_p50_ms"], slow["run_p95_ms"]) == (1000, 1900)
+        assert (slow["wait_p50_ms"], slow["wait_p95_ms"]) == (100, 190)
+        assert slow["api_calls"] == 20
+        assert stats[1]["run_p95_ms"] == 7
+
+        order = await db.job_run_stats(days=1, lane="order")
+        assert [s["job_name"] for s in order] == ["fast_job"]
+    finally:
+        await _cleanup()
@@ -152,3 +152,76 @@ def test_sourcing_price_job_scheduler_overrides_in_sourcing_only_mode(monkeypatc
     assert jobs["sourcing_price"]["max_instances"] == 2
     assert jobs["sourcing_price"]["misfire_grace_time"] == 900
     assert "coalesce" not in jobs["sourcing_match"]
+
+
+class _FakeJob:
+    def __init__(self):
+        self.next_run_times = []
+
+    def modify(self, *, next_run_time):
+        self.next_run_times.append(next_run_time)
+
+
+class _ProbeScheduler:
+    timezone = None
+
+    def __init__(self):
+        self.jobs = {"coupang_order": _FakeJob(), "shipping": _FakeJob()}
+
+    def get_job(self, job_id):
+        return self.jobs.get(job_id)
+
+
+def test_order_probe_pulls_jobs_forward_only_on_new_work(monkeypatch):
+    monkeypatch.setattr(main, "_ORDER_LANE_LOCK", asyncio.Lock())
+    monkeypatch.setattr(main, "_order_probe_marks", {})
+    signals = {"order": "ORD-1", "shipping": ""}
+    monkeypatch.setattr(
+        main, "probe_accept_orders", AsyncMock(side_effect=lambda: signals["order"])
+    )
+    monkeypatch.setattr(
+        main,
+        "probe_pending_shipments",
+        AsyncMock(side_effect=lambda: signals["shipping"]),
+    )
+    sched = _ProbeScheduler()
+
+    asyncio.run(main.scheduled_order_probe_job(sched))
+    assert len(sched.jobs["coupang_order"].next_run_times) == 1
+    assert sched.jobs["shipping"].next_run_times == []
+
+    # 같은 신호는 다시 당기지 않는다 (멈춘 주문은 정기 폴링이 처리).
+    asyncio.run(main.scheduled_order_probe_job(sched))
+    assert len(sched.jobs["coupang_order"].next_run_times) == 1
+
+    signals.update(order="ORD-2", shipping="abc")
+    asyncio.run(main.scheduled_order_probe_job(sched))
+    assert len(sched.jobs["coupang_order"].next_run_times) == 2
+    assert len(sched.jobs["shipping"].next_run_times) == 1
+
+
+def test_order_probe_skips_while_order_lane_busy(monkeypatch):
+    lock = asyncio.Lock()
+    monkeypatch.setattr(main, "_ORDER_LANE_LOCK", lock)
+    probe = AsyncMock(return_value="ORD-1")
+    monkeypatch.setattr(main, "probe_accept_orders", probe)
+
+    async def scenario():
+        await lock.acquire()
+        await main.scheduled_order_probe_job(_ProbeScheduler())
+        lock.release()
+
+    asyncio.run(scenario())
+    probe.assert_not_awaited()
+
+
+def test_probe_fires_once_per_signal(monkeypatch):
+    monkeypatch.setattr(main, "_order_probe_marks", {})
+    assert main._probe_should_fire("order", "ORD-1")
+    assert not main._probe_should_fire("order", "ORD-1")
+    assert main._probe_should_fire("order", "ORD-1,ORD-2")
+    # 조회 실패는 표시를 유지하고, 빈 신호는 표시를 지워 같은 주문이 다시 오면 발사
+    assert not main._probe_should_fire("order", None)
+    assert not main._probe_should_fire("order", "ORD-1,ORD-2")
+    assert not main._probe_should_fire("order", "")
+    assert main._probe_should_fire("order", "ORD-1")
@@ -94,7 +94,10 @@ async def test_price_state_migrates_3_urls(tmp_path, monkeypatch):
     # main() closes the DB in its finally block — re-open to verify data
     await db.open_db()
     conn = db.get_conn()
-    async with conn.execute("SELECT url, price FROM price_state ORDER BY url") as cur:
+    async with conn.execute(
+        "SELECT u.url, s.price FROM price_state s JOIN urls u ON u.id = s.url_id "
+        "ORDER BY u.url"
+    ) as cur:
         rows = await cur.fetchall()
 
     assert len(rows) == 3
@@ -132,8 +135,13 @@ async def test_row_count_mismatch_rollback(tmp_path, monkeypatch):
         await conn.execute("BEGIN IMMEDIATE")
         try:
             await conn.execute(
-                "INSERT OR REPLACE INTO price_state(url, price, updated_at) VALUES (?,?,?)",
-                ("https://a.com", 10000, "2026-01-01T00:00:00"),
+                "INSERT OR IGNORE INTO urls(url, domain, created_at) "
+                "VALUES ('https://a.com', 'a.com', 'now')"
+            )
+            await conn.execute(
+                "INSERT OR REPLACE INTO price_state(url_id, price, updated_at) "
+                "SELECT id, ?, ? FROM urls WHERE url = ?",
+                (10000, "2026-01-01T00:00:00", "https://a.com"),
             )
             # Force mismatch: json_count=2 but we only inserted 1
             async with conn.execute("SELECT COUNT(*) FROM price_state") as cur:
@@ -406,14 +414,15 @@ async def test_load_state_reads_from_db(tmp_path, monkeypatch):
     await _open_db_for_watch(tmp_path, monkeypatch)
 
     conn = db.get_conn()
+    ids = await db.intern_urls(["https://shop.com/item/1", "https://shop.com/item/2"])
     # Insert known rows into price_state
     await conn.execute(
-        "INSERT INTO price_state(url, price, updated_at) VALUES (?,?,?)",
-        ("https://shop.com/item/1", 15000, "2026-01-01T00:00:00"),
+        "INSERT INTO price_state(url_id, price, updated_at) VALUES (?,?,?)",
+        (ids["https://shop.com/item/1"], 15000, "2026-01-01T00:00:00"),
     )
     await conn.execute(
-        "INSERT INTO price_state(url, price, updated_at) VALUES (?,?,?)",
-        ("https://shop.com/item/2", None, "2026-01-01T00:00:00"),
+        "INSERT INTO price_state(url_id, price, updated_at) VALUES (?,?,?)",
+        (ids["https://shop.com/item/2"], None, "2026-01-01T00:00:00"),
     )
     await conn.commit()
 
@@ -453,12 +462,14 @@ async def test_load_state_db_error_fallback(tmp_path, monkeypatch):
     await _open_db_for_watch(tmp_path, monkeypatch)
 
     # Force DB connection to None to simulate unavailable DB
+    conn = db.get_conn()
     monkeypatch.setattr(db, "_conn", None)
 
     await mpw.load_state()
 
     assert mpw.state == {}
 
+    monkeypatch.setattr(db, "_conn", conn)
     await db.close_db()
 
 
@@ -487,7 +498,10 @@ async def test_save_state_upserts_to_db(tmp_path, monkeypatch):
     await mpw.save_state()
 
     conn = db.get_conn()
-    async with conn.execute("SELECT url, price FROM price_state ORDER BY url") as cur:
+    async with conn.execute(
+        "SELECT u.url, s.price FROM price_state s JOIN urls u ON u.id = s.url_id "
+        "ORDER BY u.url"
+    ) as cur:
         rows = await cur.fetchall()
 
     assert len(rows) == 3
@@ -559,9 +573,10 @@ async def test_no_spurious_alerts_after_load(tmp_path, monkeypatch):
 
     # Pre-populate price_state with a known price
     conn = db.get_conn()
+    ids = await db.intern_urls(["https://shop.com/item/99"])
     await conn.execute(
-        "INSERT INTO price_state(url, price, updated_at) VALUES (?,?,?)",
-        ("https://shop.com/item/99", 20000, "2026-01-01T00:00:00"),
+        "INSERT INTO price_state(url_id, price, updated_at) VALUES (?,?,?)",
+        (ids["https://shop.com/item/99"], 20000, "2026-01-01T00:00:00"),
     )
     await conn.commit()
 
@@ -580,3 +595,108 @@ async def test_no_spurious_alerts_after_load(tmp_path, monkeypatch):
     )
 
     await db.close_db()
+
+
+# ── Streaming / chunked importer ─────────────────────────────────────────────
+
+
+def test_json_stream_reads_nested_members_across_small_blocks(tmp_path, monkeypatch):
+    """The streaming reader handles values split across read blocks."""
+    monkeypatch.setattr(migrate, "_READ_BLOCK", 3)
+    path = tmp_path / "state.json"
+    _write_json(
+        path,
+        {
+            "last_run": "2026-03-01T00:00:00",
+            "daily_stats": {"2026-03-01": [1, 2, {"x": None}]},
+            "discovered_urls": {
+                "https://a.com/1": "2026-03-01",
+                "https://b.com": 123456,
+            },
+        },
+    )
+
+    assert list(migrate._iter_json_object(path, ("discovered_urls",))) == [
+        ("https://a.com/1", "2026-03-01"),
+        ("https://b.com", 123456),
+    ]
+    assert list(migrate._iter_json_object(path, ("missing",))) == []
+
+
+def _record_calls(fn, calls, fail_on=None):
+    async def wrapper(conn, urls):
+        urls = list(urls)
+        calls.append(urls)
+        if len(calls) == fail_on:
+            raise RuntimeError("disk full")
+        return await fn(conn, urls)
+
+    return wrapper
+
+
+async def test_price_state_import_resumes_after_failed_chunk(tmp_path, monkeypatch):
+    """A failed chunk rolls back; the next run resumes after the last committed chunk."""
+    await _open_db(tmp_path, monkeypatch)
+    price_json = tmp_path / "price_state.json"
+    _write_json(price_json, {f"https://shop.com/item/{n}": n * 100 for n in range(5)})
+    monkeypatch.setattr(migrate, "STATE_FILE", str(price_json))
+    monkeypatch.setattr(migrate, "IMPORT_CHUNK_ROWS", 2)
+    intern = migrate._intern_urls
+    conn = db.get_conn()
+
+    calls: list[list[str]] = []
+    monkeypatch.setattr(migrate, "_intern_urls", _record_calls(intern, calls, 2))
+    with pytest.raises(RuntimeError, match="disk full"):
+        await migrate._migrate_price_state(conn)
+    async with conn.execute("SELECT COUNT(*) FROM price_state") as cur:
+        assert (await cur.fetchone())[0] == 2
+
+    calls.clear()
+    monkeypatch.setattr(migrate, "_intern_urls", _record_calls(intern, calls))
+    assert await migrate._migrate_price_state(conn) == (True, 3)
+    assert calls[0] == ["https://shop.com/item/2", "https://shop.com/item/3"]
+    async with conn.execute("SELECT COUNT(*) FROM price_state") as cur:
+        assert (await cur.fetchone())[0] == 5
+
+    # 완료된 파일은 다시 가져오지 않는다.
+    assert await migrate._migrate_price_state(conn) == (True, 0)
+    await db.close_db()
+
+
+async def test_history_import_fills_series_and_rollups(tmp_path, monkeypatch):
+    """--history bulk-loads JSONL and JSON-array exports into price_series."""
+    import price_series
+
+    await _open_db(tmp_path, monkeypatch)
+    monkeypatch.setattr(migrate, "LOCK_FILE", tmp_path / ".main.lock")
+    monkeypatch.setattr(migrate, "IMPORT_CHUNK_ROWS", 2)
+    url = "https://shop.com/item/1"
+    jsonl = tmp_path / "history.jsonl"
+    jsonl.write_text(
+        "\n".join(
+            json.dumps(row)
+            for row in [
+                {"url": url, "ts": 1772290800, "price": 10000},
+                {"url": url, "ts": "2026-03-01T00:30:00", "price": None},
+                {"url": url, "ts": "2026-03-01T01:10:00+09:00", "price": 9000},
+                {"url": url, "price": 1},
+            ]
+        ),
+        encoding="utf-8",
+    )
+    array = tmp_path / "history.json"
+    _write_json(array, [{"url": url, "ts": 1772290800, "price": 10000}])
+    await db.close_db()
+
+    assert await migrate.import_history([str(jsonl), str(array)]) is True
+
+    await db.open_db()
+    try:
+        raw = await price_series.price_history(url)
+        assert [int(v) for v in raw["ts"]] == [1772290800, 1772292600, 1772295000]
+        assert [int(v) for v in raw["price"]] == [10000, price_series.SOLDOUT, 9000]
+        daily = await price_series.price_history(url, resolution="day")
+        assert [int(v) for v in daily["samples"]] == [3]
+        assert [int(v) for v in daily["min"]] == [9000]
+    finally:
+        await db.close_db()
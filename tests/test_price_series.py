@@ -0,0 +1,139 @@
+"""
+tests/test_price_series.py
+Price time series: raw points, hourly/daily rollups, history queries and
+raw pruning.
+"""
+
+import time
+
+import pytest
+
+import db
+import price_series
+
+
+@pytest.fixture(autouse=True)
+async def series_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "test_series.db"))
+    monkeypatch.setattr(db, "_conn", None)
+    await db.open_db()
+    yield
+    await db.close_db()
+
+
+def _as_list(values):
+    return [int(v) for v in values]
+
+
+URL = "https://shop.com/item/1"
+# 2026-03-01 00:00:00 KST
+DAY_START = 1772290800
+
+
+async def test_raw_history_marks_soldout():
+    await price_series.record_prices([(URL, 10000)], ts=DAY_START + 60)
+    await price_series.record_prices([(URL, None)], ts=DAY_START + 120)
+    await price_series.record_prices([(URL, 9000)], ts=DAY_START + 180)
+
+    history = await price_series.price_history(URL)
+    assert _as_list(history["ts"]) == [DAY_START + 60, DAY_START + 120, DAY_START + 180]
+    assert _as_list(history["price"]) == [10000, price_series.SOLDOUT, 9000]
+
+    window = await price_series.price_history(
+        URL, since=DAY_START + 100, until=DAY_START + 150
+    )
+    assert _as_list(window["price"]) == [price_series.SOLDOUT]
+
+
+async def test_rollups_track_min_max_last():
+    await price_series.record_prices([(URL, 12000)], ts=DAY_START + 100)
+    await price_series.record_prices([(URL, None)], ts=DAY_START + 200)
+    await price_series.record_prices([(URL, 8000)], ts=DAY_START + 3700)
+    await price_series.record_prices([(URL, 9500)], ts=DAY_START + 3800)
+
+    hourly = await price_series.price_history(URL, resolution="hour")
+    assert _as_list(hourly["ts"]) == [DAY_START, DAY_START + 3600]
+    assert _as_list(hourly["min"]) == [12000, 8000]
+    assert _as_list(hourly["last"]) == [price_series.SOLDOUT, 9500]
+    assert _as_list(hourly["samples"]) == [2, 2]
+
+    daily = await price_series.price_history(URL, resolution="day")
+    assert _as_list(daily["ts"]) == [DAY_START]
+    assert _as_list(daily["min"]) == [8000]
+    assert _as_list(daily["max"]) == [12000]
+    assert _as_list(daily["last"]) == [9500]
+    assert _as_list(daily["samples"]) == [4]
+
+
+async def test_vendor_item_history_and_unknown_url():
+    key = price_series.vendor_item_key(" 9001 ")
+    await price_series.record_prices([(key, 15000)], ts=DAY_START)
+    history = await price_series.price_history(vendor_item_id=9001)
+    assert _as_list(history["price"]) == [15000]
+
+    empty = await price_series.price_history("https://shop.com/missing")
+    assert len(empty["ts"]) == 0
+    with pytest.raises(ValueError):
+        await price_series.price_history(URL, resolution="week")
+
+
+async def test_prune_raw_keeps_rollups():
+    now = int(time.time())
+    await price_series.record_prices([(URL, 10000)], ts=now - 10 * 86400)
+    await price_series.record_prices([(URL, 11000)], ts=now)
+
+    assert await price_series.prune_raw(5) == 1
+    raw = await price_series.price_history(URL)
+    assert _as_list(raw["price"]) == [11000]
+    daily = await price_series.price_history(URL, resolution="day")
+    assert 10000 in _as_list(daily["min"])
+
+
+async def test_history_arrays_use_compact_dtypes():
+    np = pytest.importorskip("numpy")
+    await price_series.record_prices([(URL, 10000)], ts=DAY_START)
+    await price_series.record_prices([(URL, None)], ts=DAY_START + 60)
+
+    raw = await price_series.price_history(URL)
+    assert isinstance(raw["ts"], np.ndarray) and raw["ts"].dtype == np.int64
+    assert raw["price"].dtype == np.int32
+    assert raw["price"].tolist() == [10000, price_series.SOLDOUT]
+
+    hourly = await price_series.price_history(URL, resolution="hour")
+    assert hourly["ts"].dtype == np.int64
+    for key in ("min", "max", "last", "samples"):
+        assert hourly[key].dtype == np.int32
+
+
+async def test_record_prices_rolls_back_raw_when_rollup_fails(monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            price_series, "_ROLLUP_UPSERT", "INSERT INTO {table}(x) VALUES (?)"
+        )
+        with pytest.raises(Exception):
+            await price_series.record_prices([(URL, 10000)], ts=DAY_START)
+
+    assert len((await price_series.price_history(URL))["ts"]) == 0
+    assert await price_series.record_prices([(URL, 10000)], ts=DAY_START) == 1
+
+
+async def test_prune_raw_deletes_in_bounded_batches(monkeypatch):
+    monkeypatch.setattr(price_series, "PRUNE_BATCH_ROWS", 2)
+    old = int(time.time()) - 10 * 86400
+    other = "https://shop.com/item/2"
+    for n in range(5):
+        await price_series.record_prices([(URL, 1000 + n), (other, 10)], ts=old + n)
+    await price_series.record_prices([(URL, 9000)], ts=int(time.time()))
+
+    commits = []
+    real_commit = db.get_write_conn().commit
+
+    async def counting_commit():
+        commits.append(1)
+        await real_commit()
+
+    monkeypatch.setattr(db.get_write_conn(), "commit", counting_commit)
+    assert await price_series.prune_raw(5) == 10
+    assert len(commits) >= 5  # ≤ PRUNE_BATCH_ROWS points per transaction
+    assert _as_list((await price_series.price_history(URL))["price"]) == [9000]
+    assert len((await price_series.price_history(other))["ts"]) == 0
@@ -1,7 +1,7 @@
 """
 Unit tests for price sync bug fixes (Phase 07-01):
   1. update_sale_price() read-back verification
-  2. _sourcing_price_state persistence
+  2. legacy sourcing_price_state.json import
   3. Discord failure notifications
 """
 
@@ -23,7 +23,7 @@ import coupang_manager
 
 def _run(coro):
     """Run a coroutine synchronously."""
-    return asyncio.get_event_loop().run_until_complete(coro)
+    return asyncio.run(coro)
 
 
 # ─────────────────────────────────────────────
@@ -212,83 +212,117 @@ class TestUpdateSalePriceVerification:
         assert result is False
 
 
+class TestVerifySalePricesBatch:
+    """verify_sale_prices() settles once and re-reads only mismatches."""
+
+    def test_single_settle_delay_for_many_items(self):
+        sleep_calls = []
+
+        async def fake_sleep(delay):
+            sleep_calls.append(delay)
+
+        expected = {str(10000000 + n): 50000 for n in range(20)}
+        with (
+            patch(
+                "coupang_manager.get_vendor_item_stock", new_callable=AsyncMock
+            ) as mock_stock,
+            patch("asyncio.sleep", side_effect=fake_sleep),
+        ):
+            mock_stock.return_value = {"salePrice": 50000}
+            result = _run(coupang_manager.verify_sale_prices(expected))
+
+        assert result == {vid: True for vid in expected}
+        assert len(sleep_calls) == 1
+        assert mock_stock.call_count == 20
+
+    def test_only_mismatches_are_retried(self):
+        reads = {"11111111": [50000], "22222222": [40000, 50000]}
+
+        async def fake_stock(vid, fresh=False):
+            return {"salePrice": reads[vid].pop(0)}
+
+        with (
+            patch("coupang_manager.get_vendor_item_stock", side_effect=fake_stock),
+            patch("asyncio.sleep", new_callable=AsyncMock),
+        ):
+            result = _run(
+                coupang_manager.verify_sale_prices(
+                    {"11111111": 50000, "22222222": 50000}
+                )
+            )
+
+        assert result == {"11111111": True, "22222222": True}
+        assert reads == {"11111111": [], "22222222": []}
+
+    def test_per_item_failure_reported(self):
+        with (
+            patch(
+                "coupang_manager.get_vendor_item_stock", new_callable=AsyncMock
+            ) as mock_stock,
+            patch("asyncio.sleep", new_callable=AsyncMock),
+        ):
+            mock_stock.side_effect = lambda vid, fresh=False: {
+                "salePrice": 50000 if vid == "11111111" else 40000
+            }
+            result = _run(
+                coupang_manager.verify_sale_prices(
+                    {"11111111": 50000, "22222222": 50000}
+                )
+            )
+
+        assert result == {"11111111": True, "22222222": False}
+
+
 # ─────────────────────────────────────────────
-# Task 2: _sourcing_price_state persistence
+# Task 2: legacy sourcing_price_state.json import
 # ─────────────────────────────────────────────
 
 
-class TestSourcingPriceStatePersistence:
-    """_sourcing_price_state must survive bot restarts via JSON file."""
-
-    def test_load_returns_empty_dict_when_file_missing(self, tmp_path):
-        """_load_sourcing_price_state returns {} when JSON file does not exist."""
-        original = coupang_manager._SOURCING_PRICE_STATE_FILE
-        coupang_manager._SOURCING_PRICE_STATE_FILE = str(tmp_path / "nonexistent.json")
-        try:
-            result = coupang_manager._load_sourcing_price_state()
-        finally:
-            coupang_manager._SOURCING_PRICE_STATE_FILE = original
+class TestLegacySourcingPriceState:
+    """Row-number keyed JSON state is only read once for the ops.db import."""
 
-        assert result == {}
+    def test_load_returns_empty_dict_when_file_missing(self, tmp_path, monkeypatch):
+        """_load_legacy_sourcing_price_state returns {} when JSON file does not exist."""
+        monkeypatch.setattr(
+            coupang_manager,
+            "_LEGACY_SOURCING_PRICE_STATE_FILE",
+            str(tmp_path / "nonexistent.json"),
+        )
+        assert coupang_manager._load_legacy_sourcing_price_state() == {}
 
-    def test_load_returns_empty_dict_when_file_corrupt(self, tmp_path):
-        """_load_sourcing_price_state returns {} when JSON is malformed."""
+    def test_load_returns_empty_dict_when_file_corrupt(self, tmp_path, monkeypatch):
+        """_load_legacy_sourcing_price_state returns {} when JSON is malformed."""
         bad_file = tmp_path / "corrupt.json"
         bad_file.write_text("NOT VALID JSON {{{")
-        original = coupang_manager._SOURCING_PRICE_STATE_FILE
-        coupang_manager._SOURCING_PRICE_STATE_FILE = str(bad_file)
-        try:
-            result = coupang_manager._load_sourcing_price_state()
-        finally:
-            coupang_manager._SOURCING_PRICE_STATE_FILE = original
-
-        assert result == {}
+        monkeypatch.setattr(
+            coupang_manager, "_LEGACY_SOURCING_PRICE_STATE_FILE", str(bad_file)
+        )
+        assert coupang_manager._load_legacy_sourcing_price_state() == {}
 
-    def test_save_and_load_roundtrip(self, tmp_path):
-        """Save then load produces same dict with int keys."""
-        state_file = tmp_path / "sourcing_price_state.json"
-        original = coupang_manager._SOURCING_PRICE_STATE_FILE
-        coupang_manager._SOURCING_PRICE_STATE_FILE = str(state_file)
-        try:
-            state = {3: 50000, 5: 75000, 10: 120000}
-            coupang_manager._save_sourcing_price_state(state)
-            loaded = coupang_manager._load_sourcing_price_state()
-        finally:
-            coupang_manager._SOURCING_PRICE_STATE_FILE = original
-
-        assert loaded == state
-        assert all(isinstance(k, int) for k in loaded.keys())
-
-    def test_save_is_atomic(self, tmp_path):
-        """Save must use a temp file + os.replace (atomic write pattern)."""
-        state_file = tmp_path / "sourcing_price_state.json"
-        original = coupang_manager._SOURCING_PRICE_STATE_FILE
-        coupang_manager._SOURCING_PRICE_STATE_FILE = str(state_file)
-        try:
-            with patch("os.replace") as mock_replace:
-                coupang_manager._save_sourcing_price_state({3: 50000})
-        finally:
-            coupang_manager._SOURCING_PRICE_STATE_FILE = original
-
-        mock_replace.assert_called_once()
-        # First arg (tmp file) should differ from final destination
-        tmp_arg, dest_arg = mock_replace.call_args[0]
-        assert tmp_arg != dest_arg
-
-    def test_load_converts_string_keys_to_int(self, tmp_path):
+    def test_load_converts_string_keys_to_int(self, tmp_path, monkeypatch):
         """JSON stores keys as strings; load must convert them back to int."""
         state_file = tmp_path / "sourcing_price_state.json"
         state_file.write_text(json.dumps({"3": 50000, "7": 75000}))
-        original = coupang_manager._SOURCING_PRICE_STATE_FILE
-        coupang_manager._SOURCING_PRICE_STATE_FILE = str(state_file)
-        try:
-            result = coupang_manager._load_sourcing_price_state()
-        finally:
-            coupang_manager._SOURCING_PRICE_STATE_FILE = original
+        monkeypatch.setattr(
+            coupang_manager, "_LEGACY_SOURCING_PRICE_STATE_FILE", str(state_file)
+        )
+        result = coupang_manager._load_legacy_sourcing_price_state()
 
         assert result == {3: 50000, 7: 75000}
         assert all(isinstance(k, int) for k in result.keys())
 
+    def test_retire_renames_to_bak(self, tmp_path, monkeypatch):
+        """After the import the JSON file is renamed, not deleted."""
+        state_file = tmp_path / "sourcing_price_state.json"
+        state_file.write_text(json.dumps({"3": 50000}))
+        monkeypatch.setattr(
+            coupang_manager, "_LEGACY_SOURCING_PRICE_STATE_FILE", str(state_file)
+        )
+        coupang_manager._retire_legacy_sourcing_price_state()
+
+        assert not state_file.exists()
+        assert (tmp_path / "sourcing_price_state.json.bak").exists()
+
 
 # ─────────────────────────────────────────────
 # Task 2: Discord failure notifications
@@ -311,7 +345,7 @@ class TestDiscordFailureNotifications:
         return ws
 
     def _run_sync_with_update_result(self, update_result: bool):
-        """Helper: run sync_price_from_sourcing() with update_sale_price mocked."""
+        """Helper: run sync_price_from_sourcing() with price PUT/verify mocked."""
         import coupang_manager as cm
 
         pad = [""] * (cm.SOURCING_DATA_START - 1)
@@ -321,7 +355,9 @@ class TestDiscordFailureNotifications:
         rows_o = pad + ["12345678"]
         rows_p = pad + ["12345678"]
 
-        cm._sourcing_price_state[cm.SOURCING_DATA_START] = 40000
+        cm._sourcing_row_hashes.clear()
+        cm._sourcing_price_state.clear()
+        cm._sourcing_price_state["vid:12345678"] = 40000
 
         mock_ws = self._make_sheet_ws(rows_b, rows_h, rows_k, rows_o, rows_p)
         webhook_content = []  # collect (content_arg, embeds_kwarg) tuples
@@ -329,18 +365,26 @@ class TestDiscordFailureNotifications:
         async def capture_webhook(url, content, **kwargs):
             webhook_content.append((content, kwargs.get("embeds", [])))
 
+        async def fake_verify(expected):
+            return {vid: update_result for vid in expected}
+
         with (
             patch("coupang_manager.gspread") as mock_gspread,
+            patch("coupang_manager._google_creds"),
             patch(
-                "coupang_manager.update_sale_price", new_callable=AsyncMock
-            ) as mock_update,
+                "coupang_manager._put_sale_price", new_callable=AsyncMock
+            ) as mock_put,
+            patch("coupang_manager.verify_sale_prices", side_effect=fake_verify),
             patch(
                 "coupang_manager.get_vendor_item_stock", new_callable=AsyncMock
             ) as mock_stock,
             patch("coupang_manager.post_webhook", side_effect=capture_webhook),
-            patch("coupang_manager._save_sourcing_price_state"),
+            patch(
+                "coupang_manager._load_sourcing_sync_state",
+                AsyncMock(return_value=False),
+            ),
         ):
-            mock_update.return_value = update_result
+            mock_put.return_value = True
             mock_stock.return_value = {"salePrice": 40000}
 
             gc_mock = MagicMock()
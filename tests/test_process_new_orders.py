@@ -0,0 +1,273 @@
+"""Tests for the staged order pipeline in process_new_orders()."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import coupang_manager
+from coupang_manager import (
+    _append_order_rows,
+    _build_order_sheet_row,
+    _confirm_orders_concurrently,
+    probe_accept_orders,
+    probe_pending_shipments,
+    process_new_orders,
+)
+
+
+def _order(order_id: str, vid: str = "111", phone: str = "050-1234-5678") -> dict:
+    return {
+        "orderId": order_id,
+        "shipmentBoxId": f"BOX-{order_id}",
+        "orderedAt": "2026-03-01T10:00:00",
+        "receiver": {
+            "name": "홍길동",
+            "safeNumber": phone,
+            "addr1": "서울",
+            "addr2": "1",
+        },
+        "orderItems": [
+            {
+                "vendorItemId": vid,
+                "vendorItemName": f"상품{order_id}",
+                "shippingCount": 1,
+                "orderPrice": 20000,
+            }
+        ],
+    }
+
+
+# ── _build_order_sheet_row ───────────────────────────────────
+
+
+class TestBuildOrderSheetRow:
+    def test_thirteen_columns(self):
+        row = _build_order_sheet_row(_order("A1"), sms_sent=True, status="상품준비중")
+        assert len(row) == 13
+        assert row[0] == "A1"
+        assert row[6] == "상품준비중"
+        assert row[8] == "발송완료"
+        assert row[9] == "BOX-A1"
+
+    def test_sms_not_sent(self):
+        row = _build_order_sheet_row(_order("A1"), sms_sent=False, status="결제완료")
+        assert row[8] == "미완료"
+
+
+# ── _append_order_rows ───────────────────────────────────────
+
+
+class TestAppendOrderRows:
+    def test_single_append_rows_call(self):
+        ws = MagicMock()
+        rows = [["A1"], ["A2"], ["A3"]]
+        assert _append_order_rows(ws, rows) == 3
+        ws.append_rows.assert_called_once_with(rows, value_input_option="USER_ENTERED")
+        ws.append_row.assert_not_called()
+
+    def test_falls_back_to_row_by_row(self):
+        ws = MagicMock()
+        ws.append_rows.side_effect = Exception("quota")
+        ws.col_values.return_value = ["주문ID"]
+        assert _append_order_rows(ws, [["A1"], ["A2"]]) == 2
+        assert ws.append_row.call_count == 2
+
+    def test_fallback_skips_rows_already_written(self):
+        """append_rows가 반영 후 타임아웃나면 누락된 주문만 다시 쓴다."""
+        ws = MagicMock()
+        ws.append_rows.side_effect = Exception("read timeout")
+        ws.col_values.return_value = ["주문ID", "A0", "A1"]
+        assert _append_order_rows(ws, [["A1"], ["A2"]]) == 2
+        ws.append_row.assert_called_once_with(["A2"], value_input_option="USER_ENTERED")
+
+    def test_fallback_skipped_when_reread_fails(self):
+        ws = MagicMock()
+        ws.append_rows.side_effect = Exception("read timeout")
+        ws.col_values.side_effect = Exception("quota")
+        assert _append_order_rows(ws, [["A1"]]) == 0
+        ws.append_row.assert_not_called()
+
+    def test_empty_rows_skip_api(self):
+        ws = MagicMock()
+        assert _append_order_rows(ws, []) == 0
+        ws.append_rows.assert_not_called()
+
+
+# ── _confirm_orders_concurrently ─────────────────────────────
+
+
+class TestConfirmOrdersConcurrently:
+    async def test_results_keep_order_and_exceptions_are_failures(self):
+        async def fake_confirm(order_id, box_id):
+            if order_id == "boom":
+                raise RuntimeError("network")
+            return order_id == "ok"
+
+        with patch("coupang_manager.confirm_order", side_effect=fake_confirm):
+            results = await _confirm_orders_concurrently(
+                [("ok", "1"), ("fail", "2"), ("boom", "3")]
+            )
+        assert results == [True, False, False]
+
+
+# ── process_new_orders ───────────────────────────────────────
+
+
+class TestProcessNewOrdersPipeline:
+    async def test_new_orders_written_with_one_append_rows(self, monkeypatch):
+        monkeypatch.setattr(coupang_manager, "_sheet_order_ids", {"OLD"})
+        ws = MagicMock()
+        ws.get_all_values.return_value = [["주문ID"]]
+        accept = [_order("A1"), _order("A2", phone="")]
+        instruct = [_order("I1")]
+
+        async def fake_orders(status, days=7):
+            return accept if status == "ACCEPT" else instruct
+
+        confirm = AsyncMock(side_effect=lambda oid, box: oid == "A1")
+        sms = AsyncMock(return_value=(True, "99"))
+        record = AsyncMock()
+        with (
+            patch("coupang_manager.get_orders_by_status", side_effect=fake_orders),
+            patch("coupang_manager._open_coupang_sheet", return_value=ws),
+            patch("coupang_manager._load_sourcing_min_price_by_vid", return_value={}),
+            patch("coupang_manager._load_sourcing_info_by_vid", return_value={}),
+            patch("coupang_manager._google_creds"),
+            patch("coupang_manager.gspread"),
+            patch("coupang_manager.confirm_order", confirm),
+            patch("coupang_manager.send_order_privacy_sms", sms),
+            patch("coupang_manager._record_order_to_sourcing_tab", record),
+            patch("coupang_manager.post_webhook", new_callable=AsyncMock),
+            patch("coupang_manager.asyncio.sleep", new_callable=AsyncMock),
+        ):
+            coupang_manager._price_guard_warned_missing.clear()
+            await process_new_orders()
+
+        assert confirm.await_count == 2
+        # A1 확인 성공 + I1 신규 → SMS 2건 (A2는 번호 없음)
+        assert sms.await_count == 2
+        ws.append_rows.assert_called_once()
+        written = ws.append_rows.call_args[0][0]
+        status_by_id = {row[0]: row[6] for row in written}
+        assert status_by_id == {
+            "A1": "상품준비중",
+            "A2": "결제완료",
+            "I1": "상품준비중",
+        }
+        ws.append_row.assert_not_called()
+        assert record.await_count == 3
+        # 시트에 기록된 주문은 ACCEPT probe 신호에서 제외된다
+        assert coupang_manager._sheet_order_ids == {"A1", "A2", "I1"}
+
+    async def test_existing_rows_retry_confirm_and_batch_cell_updates(self):
+        ws = MagicMock()
+        ws.get_all_values.return_value = [
+            ["주문ID"],
+            ["A1", "상품", "1", "홍길동", "050", "주소", "결제완료", "", "발송완료"],
+        ]
+
+        async def fake_orders(status, days=7):
+            return [_order("A1")] if status == "ACCEPT" else []
+
+        confirm = AsyncMock(return_value=True)
+        with (
+            patch("coupang_manager.get_orders_by_status", side_effect=fake_orders),
+            patch("coupang_manager._open_coupang_sheet", return_value=ws),
+            patch("coupang_manager._load_sourcing_min_price_by_vid", return_value={}),
+            patch("coupang_manager._load_sourcing_info_by_vid", return_value={}),
+            patch("coupang_manager._google_creds"),
+            patch("coupang_manager.gspread"),
+            patch("coupang_manager.confirm_order", confirm),
+            patch(
+                "coupang_manager.send_order_privacy_sms", new_callable=AsyncMock
+            ) as sms,
+            patch("coupang_manager.post_webhook", new_callable=AsyncMock),
+        ):
+            await process_new_orders()
+
+        confirm.assert_awaited_once_with("A1", "BOX-A1")
+        sms.assert_not_awaited()
+        ws.append_rows.assert_not_called()
+        ws.batch_update.assert_called_once()
+        updates = ws.batch_update.call_args[0][0]
+        assert updates == [{"range": "G2", "values": [["상품준비중"]]}]
+
+
+# ── new-work probes ──────────────────────────────────────────
+
+
+class TestOrderProbes:
+    async def test_accept_probe_requests_a_single_page(self, monkeypatch):
+        monkeypatch.setattr(coupang_manager, "_sheet_order_ids", set())
+        api = AsyncMock(return_value={"data": [{"orderId": 123}]})
+        with patch("coupang_manager._coupang_get", api):
+            assert await probe_accept_orders() == "123"
+        assert api.await_count == 1
+        params = api.call_args[0][1]
+        assert params["maxPerPage"] == coupang_manager._ORDER_PROBE_PAGE_SIZE
+        assert params["status"] == "ACCEPT"
+
+    async def test_accept_probe_ignores_orders_already_in_sheet(self, monkeypatch):
+        """가격미달보류처럼 ACCEPT에 남은 주문은 신호를 점유하지 않는다."""
+        monkeypatch.setattr(coupang_manager, "_sheet_order_ids", {"HELD", "OLD"})
+        api = AsyncMock(return_value={"data": [{"orderId": "HELD"}]})
+        with patch("coupang_manager._coupang_get", api):
+            assert await probe_accept_orders() == ""
+            assert api.await_count == 1
+
+            api.reset_mock()
+            api.side_effect = [
+                {"data": [{"orderId": "HELD"}], "nextToken": "t1"},
+                {"data": [{"orderId": "NEW"}], "nextToken": "t2"},
+            ]
+            assert await probe_accept_orders() == "NEW"
+            assert api.call_args[0][1]["nextToken"] == "t1"
+
+            # 시트에 있는 주문만 계속 나오면 _ORDER_PROBE_MAX_PAGES에서 멈춘다
+            api.reset_mock()
+            api.side_effect = lambda path, params: {
+                "data": [{"orderId": "OLD"}],
+                "nextToken": f"t{api.await_count}",
+            }
+            assert await probe_accept_orders() == ""
+            assert api.await_count == coupang_manager._ORDER_PROBE_MAX_PAGES
+
+    async def test_accept_probe_empty_and_error(self):
+        with patch("coupang_manager._coupang_get", AsyncMock(return_value={})):
+            assert await probe_accept_orders() == ""
+        with patch(
+            "coupang_manager._coupang_get", AsyncMock(side_effect=RuntimeError("x"))
+        ):
+            assert await probe_accept_orders() is None
+
+    async def test_shipping_probe_signs_ready_rows_only(self, monkeypatch):
+        monkeypatch.setattr(coupang_manager, "_awaiting_invoice_rows", None)
+        ws = MagicMock()
+        ws.get.return_value = [
+            ["주문완료", "", "", "", "123", "CJGLS", ""],
+            ["주문완료", "", "", "", "456", "CJGLS", "2026-03-01"],
+            ["상품준비중", "", "", "", "789", "CJGLS"],
+            ["주문완료", "", "", "", "999", "없는택배사", ""],
+        ]
+        with patch("coupang_manager._open_coupang_sheet", return_value=ws):
+            first = await probe_pending_shipments()
+            ws.get.return_value = ws.get.return_value[1:]
+            second = await probe_pending_shipments()
+        ws.get.assert_called_with("G2:M")
+        assert first
+        assert second == ""
+
+    async def test_shipping_probe_skips_read_while_nothing_awaits_invoice(
+        self, monkeypatch
+    ):
+        monkeypatch.setattr(coupang_manager, "_awaiting_invoice_rows", None)
+        ws = MagicMock()
+        ws.get.return_value = [["주문완료", "", "", "", "1", "CJGLS", "2026-03-01"]]
+        with patch("coupang_manager._open_coupang_sheet", return_value=ws):
+            assert await probe_pending_shipments() == ""
+            assert await probe_pending_shipments() == ""
+            assert ws.get.call_count == 1
+
+            # 봇이 '주문완료'로 바꾸면 다시 읽는다
+            coupang_manager._awaiting_invoice_rows = None
+            ws.get.return_value = [["주문완료", "", "", "", "1", "CJGLS", ""]]
+            assert await probe_pending_shipments()
+            assert ws.get.call_count == 2
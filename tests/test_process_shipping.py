@@ -0,0 +1,227 @@
+"""Tests for bulk invoice upload in process_shipping()."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import coupang_manager as cm
+import db
+
+
+@pytest.fixture(autouse=True)
+def reset_shipment_index(monkeypatch):
+    monkeypatch.setattr(db, "_conn", None)
+    cm._order_shipments.clear()
+    yield
+    cm._order_shipments.clear()
+
+
+def _sheet_row(order_id: str, box_id: str = "", invoice: str = "123456789") -> list:
+    return [
+        order_id,
+        f"상품{order_id}",
+        "1",
+        "홍길동",
+        "050-1234-5678",
+        "서울",
+        "주문완료",
+        "2026-03-01T10:00:00",
+        "발송완료",
+        box_id,
+        invoice,
+        "CJGLS",
+        "",
+    ]
+
+
+def _api_order(order_id: str, box_id: str, vid: str) -> dict:
+    return {
+        "orderId": order_id,
+        "shipmentBoxId": box_id,
+        "orderItems": [{"vendorItemId": vid}],
+    }
+
+
+def _invoice_ok(path, body):
+    return {
+        "code": "200",
+        "data": {
+            "responseList": [
+                {"shipmentBoxId": dto["shipmentBoxId"], "succeed": True}
+                for dto in body["orderSheetInvoiceApplyDtos"]
+            ]
+        },
+    }
+
+
+async def _run(rows, post, instruct_orders=(), lookup=None):
+    ws = MagicMock()
+    ws.get_all_values.return_value = [["header"]] + rows
+    get_orders = AsyncMock(return_value=list(instruct_orders))
+    lookup = lookup or AsyncMock(return_value=("", ""))
+    with (
+        patch("coupang_manager._open_coupang_sheet", return_value=ws),
+        patch("coupang_manager._coupang_post", side_effect=post) as mock_post,
+        patch("coupang_manager.get_orders_by_status", get_orders),
+        patch("coupang_manager.get_shipment_box_id", lookup),
+        patch("coupang_manager.post_webhook", new_callable=AsyncMock) as webhook,
+    ):
+        await cm.process_shipping()
+    return ws, mock_post, get_orders, lookup, webhook
+
+
+async def test_indexed_orders_ship_in_one_request():
+    await cm._remember_order_shipments(
+        [_api_order(str(1000 + n), str(5000 + n), str(9000 + n)) for n in range(8)]
+    )
+    rows = [_sheet_row(str(1000 + n)) for n in range(8)]
+
+    ws, post, get_orders, lookup, webhook = await _run(rows, _invoice_ok)
+
+    assert post.call_count == 1
+    dtos = post.call_args.args[1]["orderSheetInvoiceApplyDtos"]
+    assert [d["shipmentBoxId"] for d in dtos] == [5000 + n for n in range(8)]
+    get_orders.assert_not_awaited()
+    lookup.assert_not_awaited()
+    ws.batch_update.assert_called_once()
+    assert len(ws.batch_update.call_args.args[0]) == 16
+    # 대량 처리는 요약 알림 1건
+    webhook.assert_awaited_once()
+
+
+async def test_index_miss_uses_one_list_scan_then_single_lookup():
+    rows = [_sheet_row("1001"), _sheet_row("1002")]
+    lookup = AsyncMock(return_value=("5002", "9002"))
+
+    ws, post, get_orders, lookup, webhook = await _run(
+        rows,
+        _invoice_ok,
+        instruct_orders=[_api_order("1001", "5001", "9001")],
+        lookup=lookup,
+    )
+
+    get_orders.assert_awaited_once_with("INSTRUCT", days=14)
+    lookup.assert_awaited_once_with("1002")
+    assert post.call_count == 1
+    assert cm._order_shipments["1001"] == ("5001", "9001")
+    assert webhook.await_count == 2
+
+
+async def test_batches_split_and_partial_failure(monkeypatch):
+    monkeypatch.setattr(cm, "INVOICE_BATCH_SIZE", 2)
+    await cm._remember_order_shipments(
+        [_api_order(str(1000 + n), str(5000 + n), str(9000 + n)) for n in range(3)]
+    )
+
+    def post(path, body):
+        response = _invoice_ok(path, body)
+        for item in response["data"]["responseList"]:
+            if item["shipmentBoxId"] == 5001:
+                item["succeed"] = False
+        return response
+
+    ws, mock_post, *_ = await _run([_sheet_row(str(1000 + n)) for n in range(3)], post)
+
+    assert mock_post.call_count == 2
+    updated = {u["range"] for u in ws.batch_update.call_args.args[0]}
+    assert updated == {"G2", "M2", "G4", "M4"}
+
+
+async def test_failed_batch_request_retries_per_order():
+    await cm._remember_order_shipments(
+        [_api_order(str(1000 + n), str(5000 + n), str(9000 + n)) for n in range(2)]
+    )
+    calls = []
+
+    def post(path, body):
+        calls.append(len(body["orderSheetInvoiceApplyDtos"]))
+        if len(calls) == 1:
+            raise RuntimeError("timeout")
+        return _invoice_ok(path, body)
+
+    ws, *_ = await _run([_sheet_row("1000"), _sheet_row("1001")], post)
+
+    assert calls == [2, 1, 1]
+    assert len(ws.batch_update.call_args.args[0]) == 4
+
+
+async def test_failed_batch_skips_orders_already_applied():
+    await cm._remember_order_shipments(
+        [_api_order(str(1000 + n), str(5000 + n), str(9000 + n)) for n in range(3)]
+    )
+    departed = [
+        {**_api_order("1000", "5000", "9000"), "invoiceNumber": "123456789"},
+        {**_api_order("1001", "5001", "9001"), "invoiceNumber": "999"},
+    ]
+    calls = []
+
+    def post(path, body):
+        dtos = body["orderSheetInvoiceApplyDtos"]
+        calls.append([d["shipmentBoxId"] for d in dtos])
+        if len(calls) == 1:
+            raise RuntimeError("timeout")
+        return _invoice_ok(path, body)
+
+    ws, _, get_orders, *_ = await _run(
+        [_sheet_row(str(1000 + n)) for n in range(3)], post, instruct_orders=departed
+    )
+
+    get_orders.assert_awaited_once_with("DEPARTURE", days=14)
+    # 5000은 같은 송장으로 이미 반영 → 재전송하지 않음
+    assert calls[0] == [5000, 5001, 5002]
+    assert sorted(calls[1:]) == [[5001], [5002]]
+    assert len(ws.batch_update.call_args.args[0]) == 6
+
+
+async def test_sheet_box_id_kept_and_shipped_rows_skipped():
+    await cm._remember_order_shipments([_api_order("1001", "5001", "9001")])
+    done = _sheet_row("1002")
+    done[12] = "2026-03-01 12:00:00"
+
+    ws, post, *_ = await _run([_sheet_row("1001", box_id="7777"), done], _invoice_ok)
+
+    dtos = post.call_args.args[1]["orderSheetInvoiceApplyDtos"]
+    assert [(d["orderId"], d["shipmentBoxId"]) for d in dtos] == [(1001, 7777)]
+
+
+async def test_shipment_index_persists_in_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "test_shipping.db"))
+    await db.open_db()
+    try:
+        assert await cm._remember_order_shipments([_api_order("1001", "5001", "9001")])
+        cm._order_shipments.clear()
+        assert await cm._load_order_shipments(["1001", "1002"]) == {
+            "1001": ("5001", "9001")
+        }
+    finally:
+        await db.close_db()
+
+
+async def test_non_numeric_vendor_item_id_fails_only_that_order():
+    targets = [
+        {
+            "shipment_box_id": str(5000 + n),
+            "order_id": str(1000 + n),
+            "vendor_item_id": vid,
+            "invoice": "123456789",
+            "carrier_code": "CJGLS",
+        }
+        for n, vid in enumerate(["9000", "", "abc", "9003"])
+    ]
+    with patch("coupang_manager._coupang_post", side_effect=_invoice_ok) as mock_post:
+        results = await cm.ship_orders_api(targets)
+
+    assert results == {"5000": True, "5001": False, "5002": False, "5003": True}
+    dtos = mock_post.call_args.args[1]["orderSheetInvoiceApplyDtos"]
+    assert [d["shipmentBoxId"] for d in dtos] == [5000, 5003]
+
+
+async def test_lookup_with_bad_vendor_item_id_is_skipped():
+    rows = [_sheet_row("1001"), _sheet_row("1002")]
+    lookup = AsyncMock(side_effect=[("5001", "9001"), ("5002", "N/A")])
+
+    ws, post, *_ = await _run(rows, _invoice_ok, lookup=lookup)
+
+    dtos = post.call_args.args[1]["orderSheetInvoiceApplyDtos"]
+    assert [d["orderId"] for d in dtos] == [1001]
+    assert {u["range"] for u in ws.batch_update.call_args.args[0]} == {"G2", "M2"}
@@ -0,0 +1,231 @@
+"""Tests for the cached product-name matching index in coupang_manager.py."""
+
+from unittest.mock import MagicMock, patch
+
+import gspread
+import pytest
+
+import coupang_manager
+import db
+from coupang_manager import (
+    COL_PRODUCT_NAME,
+    COL_VENDOR_ITEM_ID,
+    PRODUCT_START_ROW,
+    _fuzzy_name_score,
+    _fuzzy_score_matrix,
+    _get_product_name_index,
+    _match_sourcing_vendor_item_ids,
+    _top2_scores,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_index():
+    coupang_manager._product_name_index = None
+    yield
+    coupang_manager._product_name_index = None
+
+
+def _product_rows(products: list[tuple[str, str]]) -> list[list[str]]:
+    """(name, vendorItemId) → 쿠팡상품관리 시트 행."""
+    width = max(COL_PRODUCT_NAME, COL_VENDOR_ITEM_ID)
+    rows = [[""] * width for _ in range(PRODUCT_START_ROW - 1)]
+    for name, vid in products:
+        row = [""] * width
+        row[COL_PRODUCT_NAME - 1] = name
+        row[COL_VENDOR_ITEM_ID - 1] = vid
+        rows.append(row)
+    return rows
+
+
+class TestProductNameIndex:
+    def test_reused_until_sheet_changes(self):
+        rows = _product_rows([("푸르젠 참기름 350ml 2개", "70000000001")])
+        first = _get_product_name_index(rows)
+        assert (
+            _get_product_name_index(
+                _product_rows([("푸르젠 참기름 350ml 2개", "70000000001")])
+            )
+            is first
+        )
+
+        changed = _get_product_name_index(
+            _product_rows([("푸르젠 참기름 350ml 3개", "70000000001")])
+        )
+        assert changed is not first
+        assert changed.version != first.version
+
+    def test_precomputed_sets_and_inverted_index(self):
+        index = _get_product_name_index(
+            _product_rows([("푸르젠 참기름 350ml 2개", "70000000001")])
+        )
+        key = "푸르젠 참기름 350ml 2개"
+        assert index.name_to_vids[key] == {"70000000001"}
+        assert index.counts[key] == {"2"}
+        assert {"350", "2"} <= index.numbers[key]
+        assert index.keys_sharing_tokens({"참기름"}) == {key}
+        assert index.vid_to_product_name["70000000001"] == "푸르젠 참기름 350ml 2개"
+
+
+class TestMatchWithIndex:
+    def test_exact_match_groups_siblings(self):
+        index = _get_product_name_index(
+            _product_rows(
+                [
+                    ("푸르젠 유기농 참기름 350ml 2개", "70000000001"),
+                    ("푸르젠 유기농 참기름 350ml 2개 선물", "70000000002"),
+                    ("다른 브랜드 들기름 1개", "70000000003"),
+                ]
+            )
+        )
+        vids, key, score, mode = _match_sourcing_vendor_item_ids(
+            "푸르젠 유기농 참기름 350ml 2개", index
+        )
+        assert mode == "exact"
+        assert key == "푸르젠 유기농 참기름 350ml 2개"
+        assert vids == ["70000000001", "70000000002"]
+
+    def test_no_match_below_threshold(self):
+        index = _get_product_name_index(
+            _product_rows([("다른 브랜드 들기름 1개", "70000000003")])
+        )
+        assert _match_sourcing_vendor_item_ids("전혀 무관한 세제", index) == (
+            [],
+            "",
+            0,
+            "",
+        )
+
+
+class TestBulkFuzzyScoring:
+    def test_matrix_matches_pairwise_scores(self):
+        queries = ["푸르젠 참기름 350ml", "들기름 1개"]
+        choices = ["푸르젠 참기름 350ml 2개", "다른 브랜드 들기름 1개", "세제"]
+        matrix = _fuzzy_score_matrix(queries, choices)
+        assert matrix == [[_fuzzy_name_score(q, c) for c in choices] for q in queries]
+
+    def test_cdist_matrix_matches_pairwise_scores(self, monkeypatch):
+        pytest.importorskip("numpy")
+        process = pytest.importorskip("rapidfuzz.process")
+        calls = []
+
+        def spy_cdist(*args, **kwargs):
+            calls.append(kwargs["scorer"])
+            return process.cdist(*args, **kwargs)
+
+        monkeypatch.setattr(coupang_manager, "_rf_process", MagicMock(cdist=spy_cdist))
+        queries = ["푸르젠 참기름 350ml", "들기름 1개", "세제 리필 2L", ""]
+        choices = [
+            "푸르젠 참기름 350ml 2개",
+            "다른 브랜드 들기름 1개",
+            "세제",
+            "리필 세제 2L 대용량",
+            "",
+        ]
+        matrix = _fuzzy_score_matrix(queries, choices)
+        assert len(calls) == 3
+        assert matrix == [[_fuzzy_name_score(q, c) for c in choices] for q in queries]
+
+    def test_matrix_falls_back_without_numpy(self, monkeypatch):
+        monkeypatch.setattr(coupang_manager, "_np", None)
+        assert _fuzzy_score_matrix(["abc"], ["abc", "xyz"]) == [
+            [_fuzzy_name_score("abc", "abc"), _fuzzy_name_score("abc", "xyz")]
+        ]
+
+    def test_top2_without_sorting(self):
+        assert _top2_scores([70, 95, 88, 95], ["a", "b", "c", "d"]) == (95, "b", 95)
+        assert _top2_scores([60], ["a"]) == (60, "a", 0)
+
+    def test_fuzzy_match_only_scores_blocked_candidates(self, monkeypatch):
+        index = _get_product_name_index(
+            _product_rows(
+                [
+                    ("푸르젠 유기농 참기름 350ml 2개입", "70000000001"),
+                    ("다른 브랜드 들기름 1개", "70000000003"),
+                ]
+            )
+        )
+        seen_choices: list[list[str]] = []
+        original = coupang_manager._fuzzy_score_matrix
+
+        def spy(queries, choices):
+            seen_choices.append(list(choices))
+            return original(queries, choices)
+
+        monkeypatch.setattr(coupang_manager, "_fuzzy_score_matrix", spy)
+        vids, key, score, mode = _match_sourcing_vendor_item_ids(
+            "푸르젠 유기농 참기름 350ml 2개 선물용", index
+        )
+        assert mode == "fuzzy"
+        assert vids == ["70000000001"]
+        assert seen_choices[0] == ["푸르젠 유기농 참기름 350ml 2개"]
+
+
+# ── auto_match_sourcing_vendor_item_ids match cache ──────────
+
+
+async def _auto_match(sourcing_rows, product_rows):
+    ws_sourcing = MagicMock()
+    ws_sourcing.get_all_values.return_value = sourcing_rows
+    ws_product = MagicMock()
+    ws_product.get_all_values.return_value = product_rows
+    spy = MagicMock(side_effect=coupang_manager._match_sourcing_vendor_item_ids)
+    with (
+        patch("coupang_manager.gspread") as mock_gspread,
+        patch("coupang_manager._google_creds"),
+        patch("coupang_manager._match_sourcing_vendor_item_ids", spy),
+    ):
+        mock_gspread.utils.rowcol_to_a1 = gspread.utils.rowcol_to_a1
+        sh = mock_gspread.authorize.return_value.open_by_key.return_value
+        sh.worksheet.side_effect = lambda name: (
+            ws_sourcing if name == coupang_manager.SOURCING_SHEET else ws_product
+        )
+        await coupang_manager.auto_match_sourcing_vendor_item_ids()
+    return spy, ws_sourcing
+
+
+def _sourcing_rows(names: list[str]) -> list[list[str]]:
+    rows = [[""] * 16 for _ in range(coupang_manager.SOURCING_DATA_START - 1)]
+    for name in names:
+        row = [""] * 16
+        row[coupang_manager.SOURCING_COL_NAME - 1] = name
+        rows.append(row)
+    return rows
+
+
+async def test_auto_match_reuses_cached_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "match_cache.db"))
+    monkeypatch.setattr(db, "_conn", None)
+    await db.open_db()
+    try:
+        products = _product_rows(
+            [
+                ("푸르젠 참기름 350ml 2개", "70000000001"),
+                ("다른 브랜드 들기름 1개", "70000000003"),
+            ]
+        )
+        sourcing = _sourcing_rows(["푸르젠 참기름 350ml 2개", "전혀 무관한 세제"])
+
+        spy, ws = await _auto_match(sourcing, products)
+        assert spy.call_count == 2
+        body = ws.batch_update.call_args_list[-1][0][0]
+        assert {"range": "O3", "values": [["70000000001"]]} in body
+
+        # 같은 이름 + 같은 상품 시트 → 재채점 없음, 결과는 동일
+        spy, ws = await _auto_match(sourcing, products)
+        assert spy.call_count == 0
+        assert ws.batch_update.call_args_list[-1][0][0] == body
+
+        # 소싱명이 새로 생기면 그 행만 채점
+        spy, _ = await _auto_match(
+            _sourcing_rows(["푸르젠 참기름 350ml 2개", "다른 브랜드 들기름"]),
+            products,
+        )
+        assert spy.call_count == 1
+
+        # 상품 시트가 바뀌면 전체 재채점
+        products.append(products[-1][:])
+        spy, _ = await _auto_match(sourcing, products)
+        assert spy.call_count == 2
+    finally:
+        await db.close_db()
@@ -0,0 +1,48 @@
+"""Tests for the shared, memoized product-name normalization module."""
+
+import pytest
+
+import product_names
+from product_names import (
+    cache_clear,
+    cache_stats,
+    name_count_set,
+    name_token_set,
+    normalize_product_name,
+    product_name_variants,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    cache_clear()
+    yield
+    cache_clear()
+
+
+def test_repeated_normalization_hits_cache():
+    normalize_product_name("푸르젠 참기름 350 x 2")
+    normalize_product_name("푸르젠 참기름 350 x 2")
+    stats = cache_stats()["normalize"]
+    assert stats == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_normalization_rules():
+    assert normalize_product_name("우유 1.5kg") == "우유 1500g"
+    assert normalize_product_name("참기름 350ml x2") == "참기름 350ml 2개"
+    assert name_count_set("세제 3개입") == frozenset({"3"})
+    assert name_token_set("a 세제 1L") == frozenset({"세제", "1000ml"})
+
+
+def test_variants_return_fresh_list():
+    first = product_name_variants("상품 [A] / 옵션")
+    first.append("mutated")
+    assert "mutated" not in product_name_variants("상품 [A] / 옵션")
+    assert product_name_variants("  ") == []
+
+
+def test_coupang_manager_reexports_shared_functions():
+    import coupang_manager
+
+    assert coupang_manager._normalize_product_name is normalize_product_name
+    assert coupang_manager._product_name_variants is product_names.product_name_variants
@@ -0,0 +1,329 @@
+"""
+tests/test_schema_migrations.py
+Numbered schema migrations in db.py: checksums, one transaction per step,
+resumable chunked backfills and rollback_to().
+
+All tests use file-backed tmp_path DBs (WAL mode does NOT work on :memory:).
+"""
+
+import pytest
+
+import db
+
+
+async def _open(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test_ops.db")
+    monkeypatch.setattr(db, "DB_FILE", db_path)
+    monkeypatch.setattr(db, "_conn", None)
+    await db.open_db()
+    return db_path
+
+
+async def _reopen():
+    await db.close_db()
+    await db.open_db()
+
+
+async def _fetchall(sql, params=()):
+    async with db.get_conn().execute(sql, params) as cursor:
+        return await cursor.fetchall()
+
+
+_ITEMS = db.Migration(
+    version=100,
+    name="items",
+    sql="CREATE TABLE items (id INTEGER PRIMARY KEY, n INTEGER NOT NULL);",
+    down="DROP TABLE items;",
+)
+
+
+def _doubled_backfill(fail_after: int | None = None, calls: list | None = None):
+    """Backfill items.doubled two rows per chunk; optionally fail mid-way."""
+
+    async def backfill(conn, cursor):
+        last_id = int(cursor or 0)
+        if calls is not None:
+            calls.append(last_id)
+        if fail_after is not None and last_id >= fail_after:
+            raise RuntimeError("interrupted")
+        async with conn.execute(
+            "SELECT id FROM items WHERE id > ? ORDER BY id LIMIT 2", (last_id,)
+        ) as cur:
+            ids = [row[0] for row in await cur.fetchall()]
+        if not ids:
+            return None
+        await conn.execute(
+            "UPDATE items SET doubled = n * 2 WHERE id BETWEEN ? AND ?",
+            (ids[0], ids[-1]),
+        )
+        return str(ids[-1])
+
+    return db.Migration(
+        version=101,
+        name="items_doubled",
+        sql="ALTER TABLE items ADD COLUMN doubled INTEGER;",
+        down="ALTER TABLE items DROP COLUMN doubled;",
+        backfill=backfill,
+    )
+
+
+async def test_checksums_recorded(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        rows = await _fetchall(
+            "SELECT version, name, checksum FROM schema_version WHERE version > 1"
+        )
+        assert rows == [(m.version, m.name, m.checksum) for m in db._MIGRATIONS]
+    finally:
+        await db.close_db()
+
+
+async def test_fresh_db_ends_at_url_id_layout(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        for table in ("price_state", "price_checks", "price_events", "adapter_runs"):
+            columns = {r[1] for r in await _fetchall(f"PRAGMA table_info({table})")}
+            assert "url_id" in columns and "url" not in columns
+        tables = {r[0] for r in await _fetchall("SELECT name FROM sqlite_master")}
+        assert not {t for t in tables if t.endswith("_legacy")}
+        await _reopen()
+        assert await _fetchall("SELECT COUNT(*) FROM schema_version") == [
+            (1 + len(db._MIGRATIONS),)
+        ]
+    finally:
+        await db.close_db()
+
+
+async def test_edited_step_is_rejected(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    monkeypatch.setattr(db, "_MIGRATIONS", db._MIGRATIONS + [_ITEMS])
+    await _reopen()
+    edited = db.Migration(100, "items", _ITEMS.sql.replace("n INTEGER", "m INTEGER"))
+    monkeypatch.setattr(db, "_MIGRATIONS", db._MIGRATIONS[:-1] + [edited])
+    await db.close_db()
+    with pytest.raises(RuntimeError, match="checksum mismatch"):
+        await db.open_db()
+    await db.close_db()
+
+
+async def test_failed_step_leaves_nothing_behind(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    broken = db.Migration(
+        100, "broken", "CREATE TABLE half (id INTEGER);\nSELECT * FROM missing;"
+    )
+    monkeypatch.setattr(db, "_MIGRATIONS", db._MIGRATIONS + [broken])
+    await db.close_db()
+    with pytest.raises(Exception):
+        await db.open_db()
+    try:
+        tables = {r[0] for r in await _fetchall("SELECT name FROM sqlite_master")}
+        assert "half" not in tables
+        assert await db.current_schema_version() < 100
+    finally:
+        await db.close_db()
+
+
+async def test_backfill_resumes_from_saved_cursor(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    monkeypatch.setattr(db, "_MIGRATIONS", db._MIGRATIONS + [_ITEMS])
+    await _reopen()
+    conn = db.get_conn()
+    await conn.executemany("INSERT INTO items(n) VALUES (?)", [(n,) for n in range(5)])
+    await conn.commit()
+
+    monkeypatch.setattr(
+        db, "_MIGRATIONS", db._MIGRATIONS + [_doubled_backfill(fail_after=2)]
+    )
+    await db.close_db()
+    await db.open_db()  # 첫 청크만 시작 시 실행, 나머지는 백그라운드에서 실패
+    try:
+        await db.wait_for_backfills()
+        assert await _fetchall("SELECT version, cursor FROM schema_backfills") == [
+            (101, "2")
+        ]
+        assert await db.current_schema_version() == 100
+
+        calls: list[int] = []
+        monkeypatch.setattr(
+            db, "_MIGRATIONS", db._MIGRATIONS[:-1] + [_doubled_backfill(calls=calls)]
+        )
+        await _reopen()
+        await db.wait_for_backfills()
+        assert calls[0] == 2  # 처음부터가 아니라 저장된 커서에서 재개
+        assert await db.current_schema_version() == 101
+        assert await _fetchall("SELECT COUNT(*) FROM schema_backfills") == [(0,)]
+        assert await _fetchall("SELECT n, doubled FROM items ORDER BY id") == [
+            (n, n * 2) for n in range(5)
+        ]
+    finally:
+        await db.close_db()
+
+
+async def test_rollback_to_runs_down_steps(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    monkeypatch.setattr(db, "_MIGRATIONS", db._MIGRATIONS + [_ITEMS])
+    await _reopen()
+    try:
+        assert await db.rollback_to(1) == [100, 8, 7, 6, 5, 4, 3, 2]
+        assert await db.current_schema_version() == 1
+        tables = {r[0] for r in await _fetchall("SELECT name FROM sqlite_master")}
+        assert "items" not in tables
+        assert "price_checks_daily" not in tables
+        assert "price_series" not in tables
+        assert "import_progress" not in tables
+
+        await _reopen()  # 다시 열면 최신 버전까지 재적용
+        assert await db.current_schema_version() == 100
+    finally:
+        await db.close_db()
+
+
+async def test_rollback_refuses_steps_without_down(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    no_down = db.Migration(100, "no_down", "CREATE TABLE keep (id INTEGER);")
+    monkeypatch.setattr(db, "_MIGRATIONS", db._MIGRATIONS + [no_down])
+    await _reopen()
+    try:
+        with pytest.raises(RuntimeError, match="without down"):
+            await db.rollback_to(1)
+        assert await db.current_schema_version() == 100
+    finally:
+        await db.close_db()
+
+
+async def _open_v3_with_text_urls(tmp_path, monkeypatch):
+    """A DB at schema version 3 whose log tables still store the URL text."""
+    v3 = [m for m in db._MIGRATIONS if m.version <= 3]
+    monkeypatch.setattr(db, "_MIGRATIONS", v3)
+    await _open(tmp_path, monkeypatch)
+    conn = db.get_conn()
+    urls = [f"https://www.musinsa.com/products/{n}" for n in range(3)]
+    await conn.executemany(
+        "INSERT INTO price_state(url, price, updated_at) VALUES (?, ?, 'now')",
+        [(url, 1000 * n) for n, url in enumerate(urls)],
+    )
+    await conn.executemany(
+        "INSERT INTO price_checks(url, price, kind, checked_at) VALUES (?, ?, ?, ?)",
+        [(urls[n % 3], n, "price", f"2026-01-0{n + 1}") for n in range(7)],
+    )
+    await conn.execute(
+        "INSERT INTO price_events(url, new_price, event_type, detected_at) "
+        "VALUES (?, 1, 'first_seen', 'now')",
+        (urls[0],),
+    )
+    await conn.execute(
+        "INSERT INTO adapter_runs(adapter, url, error, run_at) "
+        "VALUES ('musinsa', ?, 'timeout', 'now')",
+        (urls[2],),
+    )
+    await conn.execute(
+        "INSERT INTO price_checks_daily(url, day, kind, checks) "
+        "VALUES (?, '2025-12-01', 'price', 4)",
+        (urls[1],),
+    )
+    await conn.commit()
+    await db.close_db()
+    monkeypatch.undo()
+    return urls
+
+
+async def test_url_interning_backfill_moves_rows_in_chunks(tmp_path, monkeypatch):
+    urls = await _open_v3_with_text_urls(tmp_path, monkeypatch)
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "test_ops.db"))
+    monkeypatch.setattr(db, "BACKFILL_CHUNK_ROWS", 2)
+    await db.open_db()
+    try:
+        await db.wait_for_backfills()
+        assert await db.current_schema_version() == 8
+        tables = {r[0] for r in await _fetchall("SELECT name FROM sqlite_master")}
+        assert not {t for t in tables if t.endswith("_legacy")}
+
+        assert await _fetchall(
+            "SELECT u.url, s.price FROM price_state s "
+            "JOIN urls u ON u.id = s.url_id ORDER BY u.url"
+        ) == [(url, 1000 * n) for n, url in enumerate(urls)]
+        assert await _fetchall(
+            "SELECT c.id, u.url FROM price_checks c "
+            "JOIN urls u ON u.id = c.url_id ORDER BY c.id"
+        ) == [(n + 1, urls[n % 3]) for n in range(7)]
+        assert await _fetchall(
+            "SELECT u.url, u.domain, u.adapter FROM adapter_runs a "
+            "JOIN urls u ON u.id = a.url_id"
+        ) == [(urls[2], "www.musinsa.com", "musinsa")]
+        assert await _fetchall(
+            "SELECT u.url, d.checks FROM price_checks_daily d "
+            "JOIN urls u ON u.id = d.url_id"
+        ) == [(urls[1], 4)]
+        assert await _fetchall("SELECT COUNT(*) FROM urls") == [(3,)]
+    finally:
+        await db.close_db()
+
+
+async def test_url_interning_backfill_runs_after_startup(tmp_path, monkeypatch):
+    urls = await _open_v3_with_text_urls(tmp_path, monkeypatch)
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "test_ops.db"))
+    monkeypatch.setattr(db, "BACKFILL_CHUNK_ROWS", 2)
+    await db.open_db()
+    try:
+        # 백그라운드 청크를 멈춰 두고 이관 중 상태를 확인
+        async with db._write_lock:
+            assert await _fetchall("SELECT version FROM schema_backfills") == [(4,)]
+            rows = await db.fetch_with_legacy(
+                "price_state",
+                "SELECT u.url, s.price FROM price_state s "
+                "JOIN urls u ON u.id = s.url_id",
+                "SELECT url, price FROM price_state_legacy",
+            )
+            assert dict(rows) == {url: 1000 * n for n, url in enumerate(urls)}
+
+            # 이관 중 봇이 쓴 행: 레거시 행이 덮어쓰지 않고, id도 겹치지 않는다
+            conn = db.get_conn()
+            await conn.execute(
+                "INSERT OR IGNORE INTO urls(url, domain, created_at) "
+                "VALUES (?, 'www.musinsa.com', 'later')",
+                (urls[2],),
+            )
+            ((url_id,),) = await _fetchall(
+                "SELECT id FROM urls WHERE url=?", (urls[2],)
+            )
+            await conn.execute(
+                "INSERT OR REPLACE INTO price_state(url_id, price, updated_at) "
+                "VALUES (?, 99, 'later')",
+                (url_id,),
+            )
+            cursor = await conn.execute(
+                "INSERT INTO price_checks(url_id, price, kind, checked_at) "
+                "VALUES (?, 99, 'price', 'later')",
+                (url_id,),
+            )
+            assert cursor.lastrowid == 8
+            await conn.commit()
+
+        await db.wait_for_backfills()
+        assert await db.current_schema_version() == 8
+        assert await _fetchall("SELECT COUNT(*) FROM schema_backfills") == [(0,)]
+        assert await _fetchall(
+            "SELECT u.url, s.price FROM price_state s "
+            "JOIN urls u ON u.id = s.url_id ORDER BY u.url"
+        ) == [(urls[0], 0), (urls[1], 1000), (urls[2], 99)]
+        assert await _fetchall("SELECT id FROM price_checks ORDER BY id") == [
+            (n,) for n in range(1, 9)
+        ]
+    finally:
+        await db.close_db()
+
+
+async def test_url_interning_rollback_restores_text_urls(tmp_path, monkeypatch):
+    urls = await _open_v3_with_text_urls(tmp_path, monkeypatch)
+    await _open(tmp_path, monkeypatch)
+    try:
+        assert await db.rollback_to(3) == [8, 7, 6, 5, 4]
+        assert await _fetchall("SELECT url, price FROM price_state ORDER BY url") == [
+            (url, 1000 * n) for n, url in enumerate(urls)
+        ]
+        assert await _fetchall("SELECT COUNT(*) FROM price_checks") == [(7,)]
+        assert await _fetchall("SELECT adapter, url FROM adapter_runs") == [
+            ("musinsa", urls[2])
+        ]
+    finally:
+        await db.close_db()
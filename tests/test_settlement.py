@@ -0,0 +1,295 @@
+"""
+tests/test_settlement.py
+Unit tests for the incremental settlement aggregation in coupang_manager.py.
+
+Covers:
+- _parse_settlement_records: row parsing, exclusion statuses
+- _aggregate_settlement_via_mirror: SQLite mirror diff + dirty-key rollups
+- _settlement_scan_plan / _settlement_read_start: recent-window read, new-row
+  diff scope, periodic full scan
+- update_settlement: reads only rows from the recent window between full scans
+- _write_settlement_diff: only changed cells are written
+
+DB tests use file-backed tmp_path DBs (WAL mode does NOT work on :memory:).
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import coupang_manager as cm
+import db
+from config import KST
+from coupang_manager import (
+    ORDER_STATUS_PRICE_HOLD,
+    _aggregate_settlement_in_memory,
+    _aggregate_settlement_via_mirror,
+    _load_settlement_marker,
+    _parse_settlement_records,
+    _settlement_read_start,
+    _settlement_scan_plan,
+    _settlement_tail_ok,
+    _write_settlement_diff,
+)
+
+
+# ── Helper ────────────────────────────────────────────────────────────────────
+
+
+async def _open(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test_settlement.db")
+    monkeypatch.setattr(db, "DB_FILE", db_path)
+    monkeypatch.setattr(db, "_conn", None)
+    await db.open_db()
+    return db_path
+
+
+def _rows(orders: list[tuple]) -> list[list[str]]:
+    """(order_id, product, qty, status, date) → order sheet rows with header."""
+    rows = [
+        ["주문ID", "상품명", "수량", "수신자", "연락처", "주소", "상태", "주문일시"]
+    ]
+    for order_id, product, qty, status, date in orders:
+        rows.append([order_id, product, qty, "", "", "", status, date])
+    return rows
+
+
+# ── _parse_settlement_records ─────────────────────────────────────────────────
+
+
+def test_parse_excludes_cancel_and_price_hold():
+    records = _parse_settlement_records(
+        _rows(
+            [
+                ("A1", "상품A", "2", "상품준비중", "2026-03-01T10:00:00"),
+                ("A2", "상품A", "1", "취소", "2026-03-02"),
+                ("A3", "상품B", "1", ORDER_STATUS_PRICE_HOLD, "2026-03-02"),
+            ]
+        )
+    )
+    assert records["A1"] == ("2026-03", "상품A", 2, True)
+    assert records["A2"][3] is False
+    assert records["A3"][3] is False
+
+    monthly, by_product = _aggregate_settlement_in_memory(records)
+    assert monthly == {"2026-03": {"count": 1, "qty": 2}}
+    assert by_product == {"상품A": {"count": 1, "qty": 2}}
+
+
+# ── _aggregate_settlement_via_mirror ──────────────────────────────────────────
+
+
+async def test_mirror_matches_in_memory(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        records = _parse_settlement_records(
+            _rows(
+                [
+                    ("A1", "상품A", "2", "상품준비중", "2026-02-01"),
+                    ("A2", "상품B", "1", "배송완료", "2026-03-02"),
+                    ("A3", "상품A", "3", "배송중", "2026-03-05"),
+                    ("A4", "상품A", "1", "환불", "2026-03-05"),
+                ]
+            )
+        )
+        assert await _aggregate_settlement_via_mirror(
+            records
+        ) == _aggregate_settlement_in_memory(records)
+    finally:
+        await db.close_db()
+
+
+async def test_mirror_only_recomputes_touched_months(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        orders = [
+            ("A1", "상품A", "2", "상품준비중", "2026-02-01"),
+            ("A2", "상품B", "1", "배송완료", "2026-03-02"),
+        ]
+        await _aggregate_settlement_via_mirror(_parse_settlement_records(_rows(orders)))
+        conn = db.get_conn()
+        async with conn.execute(
+            "SELECT month, updated_at FROM settlement_monthly"
+        ) as cur:
+            before = dict(await cur.fetchall())
+
+        # 3월 주문만 취소로 변경
+        orders[1] = ("A2", "상품B", "1", "취소", "2026-03-02")
+        monthly, by_product = await _aggregate_settlement_via_mirror(
+            _parse_settlement_records(_rows(orders))
+        )
+        async with conn.execute(
+            "SELECT month, updated_at FROM settlement_monthly"
+        ) as cur:
+            after = dict(await cur.fetchall())
+
+        assert monthly == {"2026-02": {"count": 1, "qty": 2}}
+        assert "상품B" not in by_product
+        assert after["2026-02"] == before["2026-02"]
+    finally:
+        await db.close_db()
+
+
+async def test_mirror_drops_orders_removed_from_sheet(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        orders = [
+            ("A1", "상품A", "2", "상품준비중", "2026-02-01"),
+            ("A2", "상품A", "1", "배송완료", "2026-02-02"),
+        ]
+        await _aggregate_settlement_via_mirror(_parse_settlement_records(_rows(orders)))
+        monthly, by_product = await _aggregate_settlement_via_mirror(
+            _parse_settlement_records(_rows(orders[:1]))
+        )
+        assert monthly == {"2026-02": {"count": 1, "qty": 2}}
+        assert by_product == {"상품A": {"count": 1, "qty": 2}}
+    finally:
+        await db.close_db()
+
+
+# ── _settlement_scan_plan ─────────────────────────────────────────────────────
+
+
+def _recent(days_ago: int = 0) -> str:
+    return (datetime.now(KST) - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+
+
+def test_read_start_and_tail_check():
+    fresh = datetime.now(KST).isoformat()
+    stale = (datetime.now(KST) - timedelta(days=2)).isoformat()
+
+    assert _settlement_read_start(None) == 1
+    assert _settlement_read_start((5, stale, 3, "A2")) == 1
+    assert _settlement_read_start((5, fresh, None, "")) == 1
+    assert _settlement_read_start((5, fresh, 3, "A2")) == 3
+
+    tail = _rows([("A2", "상품B", "1", "배송완료", _recent())])[1:]
+    assert _settlement_tail_ok(tail + [["A3"]], (4, fresh, 3, "A2"))
+    # 위쪽 행 삭제로 최근 구간 첫 행이 바뀜 / 행 수 축소
+    assert not _settlement_tail_ok(tail, (4, fresh, 3, "A1"))
+    assert not _settlement_tail_ok(tail, (5, fresh, 3, "A2"))
+
+
+def test_full_plan_records_recent_window_start():
+    rows = _rows(
+        [
+            ("A1", "상품A", "1", "배송완료", "2020-01-01"),
+            ("A2", "상품B", "1", "배송완료", _recent()),
+        ]
+    )
+    new_ids, marker = _settlement_scan_plan(rows, 1, None)
+    assert new_ids is None
+    assert (marker[0], marker[2], marker[3]) == (3, 3, "A2")
+
+    tail = rows[2:] + [["A3", "상품C", "1", "", "", "", "배송완료", _recent()]]
+    new_ids, next_marker = _settlement_scan_plan(tail, 3, marker)
+    assert new_ids == {"A3"}
+    assert next_marker == (4, marker[1], 3, "A2")
+
+
+async def test_incremental_run_compares_recent_and_new_rows_only(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        orders = [
+            ("A1", "상품A", "2", "배송완료", "2020-01-01"),
+            ("A2", "상품B", "1", "배송완료", _recent()),
+        ]
+        rows = _rows(orders)
+        new_ids, marker = _settlement_scan_plan(rows, 1, None)
+        await _aggregate_settlement_via_mirror(
+            _parse_settlement_records(rows), new_ids, marker
+        )
+        assert await _load_settlement_marker() == marker
+
+        # 오래된 주문 수정은 다음 전체 비교까지 보류, 최근 주문/새 행은 즉시 반영
+        orders[0] = ("A1", "상품A", "2", "취소", "2020-01-01")
+        orders[1] = ("A2", "상품B", "1", "반품", _recent())
+        orders.append(("A3", "상품C", "4", "배송완료", "2020-02-01"))
+        rows = _rows(orders)
+        first_row = _settlement_read_start(marker)
+        tail = rows[first_row - 1 :]
+        assert _settlement_tail_ok(tail, marker)
+        new_ids, next_marker = _settlement_scan_plan(tail, first_row, marker)
+        assert new_ids == {"A3"}
+        monthly, by_product = await _aggregate_settlement_via_mirror(
+            _parse_settlement_records(tail, first_row), new_ids, next_marker
+        )
+        assert monthly == {
+            "2020-01": {"count": 1, "qty": 2},
+            "2020-02": {"count": 1, "qty": 4},
+        }
+        assert "상품B" not in by_product
+        assert await _load_settlement_marker() == (len(rows), *marker[1:])
+
+        # 전체 비교에서 오래된 주문 변경이 반영된다
+        monthly, _ = await _aggregate_settlement_via_mirror(
+            _parse_settlement_records(rows)
+        )
+        assert monthly == {"2020-02": {"count": 1, "qty": 4}}
+    finally:
+        await db.close_db()
+
+
+async def test_update_settlement_reads_only_recent_rows(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    rows = _rows(
+        [("A1", "상품A", "2", "배송완료", "2020-01-01")]
+        + [("A2", "상품B", "1", "배송완료", _recent())]
+    )
+    order_ws = MagicMock()
+    order_ws.get_all_values.return_value = rows
+    settle_ws = MagicMock()
+    settle_ws.row_count = 100
+    settle_ws.get_all_values.return_value = []
+    sh = MagicMock()
+    sh.worksheet.side_effect = lambda title: (
+        order_ws if title == cm.COUPANG_ORDER_SHEET else settle_ws
+    )
+    monkeypatch.setattr(cm, "_google_creds", lambda: None)
+    monkeypatch.setattr(
+        cm.gspread, "authorize", lambda creds: MagicMock(open_by_key=lambda key: sh)
+    )
+    monkeypatch.setattr(cm, "post_webhook", AsyncMock())
+    try:
+        await cm.update_settlement()
+        assert order_ws.get_all_values.call_count == 1
+
+        order_ws.get.return_value = rows[2:] + [
+            ["A3", "상품C", "1", "", "", "", "배송완료", _recent()]
+        ]
+        await cm.update_settlement()
+        order_ws.get.assert_called_once_with("A3:H")
+        assert order_ws.get_all_values.call_count == 1
+        async with db.get_read_conn() as conn:
+            async with conn.execute(
+                "SELECT order_id FROM settlement_orders ORDER BY order_id"
+            ) as cur:
+                assert [r[0] for r in await cur.fetchall()] == ["A1", "A2", "A3"]
+
+        # 최근 구간 첫 행이 바뀌면 전체 읽기로 돌아간다
+        order_ws.get.return_value = [["A9", "상품Z", "1"]]
+        await cm.update_settlement()
+        assert order_ws.get_all_values.call_count == 2
+    finally:
+        await db.close_db()
+
+
+# ── _write_settlement_diff ────────────────────────────────────────────────────
+
+
+def test_write_diff_updates_only_changed_cells():
+    ws = MagicMock()
+    ws.row_count = 100
+    ws.get_all_values.return_value = [
+        ["📊 쿠팡 정산 집계", "", "", "", "마지막 갱신: old"],
+        ["2026-03", "1", "2", "", ""],
+        ["stale", "9", "9", "", ""],
+    ]
+    output = [
+        ["📊 쿠팡 정산 집계", "", "", "", "마지막 갱신: new"],
+        ["2026-03", "1", "3", "", ""],
+    ]
+
+    assert _write_settlement_diff(ws, output) == 2
+    body = ws.batch_update.call_args[0][0]
+    assert {item["range"] for item in body} == {"E1", "C2"}
+    ws.batch_clear.assert_called_once_with(["A3:E3"])
@@ -0,0 +1,190 @@
+"""
+tests/test_sourcing_row_state.py
+Diff-driven sourcing price sync: rows whose B/H/K/O/P inputs did not change
+since the last successful sync are skipped, and the min-price state lives in
+ops.db keyed by a stable row identity instead of the sheet row number.
+
+DB tests use file-backed tmp_path DBs (WAL mode does NOT work on :memory:).
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import coupang_manager as cm
+import db
+
+
+@pytest.fixture(autouse=True)
+def reset_sourcing_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        cm, "_LEGACY_SOURCING_PRICE_STATE_FILE", str(tmp_path / "legacy.json")
+    )
+    monkeypatch.setattr(cm, "_sourcing_state_loaded", False)
+    cm._sourcing_price_state.clear()
+    cm._sourcing_row_hashes.clear()
+    yield
+    cm._sourcing_price_state.clear()
+    cm._sourcing_row_hashes.clear()
+
+
+def _restart():
+    """Simulate a process restart: drop the in-memory state."""
+    cm._sourcing_state_loaded = False
+    cm._sourcing_price_state.clear()
+    cm._sourcing_row_hashes.clear()
+
+
+async def _open(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test_sourcing_row_state.db")
+    monkeypatch.setattr(db, "DB_FILE", db_path)
+    monkeypatch.setattr(db, "_conn", None)
+    await db.open_db()
+    return db_path
+
+
+def _row(name: str, buy: str, min_price: str, vid: str) -> dict[int, str]:
+    return {2: name, 8: buy, 11: min_price, 15: vid, 16: vid}
+
+
+async def _sync(rows: list[dict[int, str]], sale_price: int = 40000):
+    """Run sync_price_from_sourcing() against mocked sheet rows."""
+    pad = [""] * (cm.SOURCING_DATA_START - 1)
+    ws = MagicMock()
+    ws.col_values.side_effect = lambda col: pad + [r.get(col, "") for r in rows]
+
+    stock = AsyncMock(return_value={"salePrice": sale_price, "onSale": True})
+    put = AsyncMock(return_value=True)
+
+    async def fake_verify(expected):
+        return {vid: True for vid in expected}
+
+    with (
+        patch("coupang_manager.gspread") as mock_gspread,
+        patch("coupang_manager._google_creds"),
+        patch("coupang_manager.get_vendor_item_stock", stock),
+        patch("coupang_manager._put_sale_price", put),
+        patch("coupang_manager.verify_sale_prices", side_effect=fake_verify),
+        patch("coupang_manager.post_webhook", new_callable=AsyncMock),
+    ):
+        sh = mock_gspread.authorize.return_value.open_by_key.return_value
+        sh.worksheet.side_effect = lambda name: ws
+        await cm.sync_price_from_sourcing()
+    return stock, put
+
+
+async def test_unchanged_rows_skipped_on_next_run(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        rows = [_row("상품A", "10000", "50000", "11111111")]
+        await _sync(rows)  # 최초 실행: 상태만 기록
+        stock, put = await _sync(rows)
+        stock.assert_not_awaited()
+        put.assert_not_awaited()
+    finally:
+        await db.close_db()
+
+
+async def test_changed_min_price_is_processed(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        await _sync([_row("상품A", "10000", "50000", "11111111")])
+        stock, put = await _sync([_row("상품A", "10000", "60000", "11111111")])
+        put.assert_awaited_once_with("11111111", 60000)
+
+        # 동기화 성공 후에는 다시 건너뛴다.
+        stock, put = await _sync([_row("상품A", "10000", "60000", "11111111")])
+        put.assert_not_awaited()
+    finally:
+        await db.close_db()
+
+
+async def test_row_insertion_does_not_trigger_updates(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        a = _row("상품A", "10000", "50000", "11111111")
+        b = _row("상품B", "10000", "90000", "22222222")
+        await _sync([a, b])
+
+        inserted = _row("상품C", "10000", "70000", "33333333")
+        stock, put = await _sync([inserted, a, b])
+        put.assert_not_awaited()
+
+        # 밀린 행의 K열이 바뀌면 그 행의 이전 값과 비교한다.
+        b_changed = _row("상품B", "10000", "95000", "22222222")
+        stock, put = await _sync([inserted, a, b_changed], sale_price=90000)
+        put.assert_awaited_once_with("22222222", 95000)
+    finally:
+        await db.close_db()
+
+
+async def test_state_survives_restart_via_db(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        await _sync([_row("상품A", "10000", "50000", "11111111")])
+        _restart()
+        stock, put = await _sync([_row("상품A", "10000", "50000", "11111111")])
+        stock.assert_not_awaited()
+
+        _restart()
+        stock, put = await _sync([_row("상품A", "10000", "60000", "11111111")])
+        put.assert_awaited_once_with("11111111", 60000)
+
+        conn = db.get_conn()
+        async with conn.execute(
+            "SELECT row_key, min_price FROM sourcing_price_state"
+        ) as cur:
+            assert await cur.fetchall() == [("vid:11111111", 60000)]
+    finally:
+        await db.close_db()
+
+
+async def test_removed_rows_are_deleted(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    try:
+        a = _row("상품A", "10000", "50000", "11111111")
+        b = _row("상품B", "10000", "90000", "22222222")
+        await _sync([a, b])
+        await _sync([a])
+
+        conn = db.get_conn()
+        async with conn.execute("SELECT row_key FROM sourcing_price_state") as cur:
+            assert await cur.fetchall() == [("vid:11111111",)]
+        async with conn.execute("SELECT row_key FROM sourcing_row_state") as cur:
+            assert await cur.fetchall() == [("vid:11111111",)]
+    finally:
+        await db.close_db()
+
+
+async def test_legacy_json_imported_once_and_renamed(tmp_path, monkeypatch):
+    await _open(tmp_path, monkeypatch)
+    legacy = tmp_path / "legacy.json"
+    start = cm.SOURCING_DATA_START
+    legacy.write_text(f'{{"{start}": 40000, "{start + 1}": 90000}}')
+    try:
+        rows = [
+            _row("상품A", "10000", "50000", "11111111"),
+            _row("상품B", "10000", "90000", "22222222"),
+        ]
+        stock, put = await _sync(rows)
+        # 행 번호 기준 이전값과 비교 → A만 변경
+        put.assert_awaited_once_with("11111111", 50000)
+        assert not legacy.exists()
+        assert (tmp_path / "legacy.json.bak").exists()
+        assert cm._sourcing_price_state == {
+            "vid:11111111": 50000,
+            "vid:22222222": 90000,
+        }
+    finally:
+        await db.close_db()
+
+
+async def test_without_db_state_is_kept_in_memory(monkeypatch):
+    monkeypatch.setattr(db, "_conn", None)
+    cm._sourcing_price_state["vid:11111111"] = 40000
+    rows = [_row("상품A", "10000", "50000", "11111111")]
+    stock, put = await _sync(rows)
+    put.assert_awaited_once_with("11111111", 50000)
+
+    stock, put = await _sync(rows)
+    put.assert_not_awaited()
@@ -3,11 +3,13 @@
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 
+import coupang_manager
 from config import DOMAIN_TO_SOURCING_TAB
 from coupang_manager import (
     _resolve_sourcing_tab_name,
     _load_sourcing_info_by_vid,
     _record_order_to_sourcing_tab,
+    _flush_sourcing_tab_rows,
     match_sourcing_orders_to_coupang,
     _SOURCING_ORDER_TABS,
     _SOURCING_TAB_ORDERER_COL,
@@ -391,6 +393,61 @@ class TestAppendRowPosition:
         assert call_args[0][0] == "A2:M2"
 
 
+class TestBatchedSourcingTabRows:
+    """pending_rows mode collects rows per tab and flushes once per tab."""
+
+    @pytest.mark.asyncio
+    async def test_pending_rows_defer_write(self):
+        mock_sh = MagicMock()
+        mock_ws = MagicMock()
+        mock_sh.worksheet.return_value = mock_ws
+        pending: dict[str, dict] = {}
+
+        for i in range(3):
+            kwargs = _base_order_kwargs()
+            kwargs["order_id"] = f"ORD-{i}"
+            await _record_order_to_sourcing_tab(
+                mock_sh, _base_sourcing_info(), pending_rows=pending, **kwargs
+            )
+
+        mock_ws.col_values.assert_not_called()
+        mock_ws.update.assert_not_called()
+        # 탭은 한 번만 연다
+        mock_sh.worksheet.assert_called_once_with("무신사")
+        assert len(pending["무신사"]["rows"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_one_range_per_tab(self):
+        mock_sh = MagicMock()
+        mock_ws = MagicMock()
+        mock_sh.worksheet.return_value = mock_ws
+        mock_ws.col_values.return_value = ["주문ID"] + ["ORD-X"] * 5
+        pending: dict[str, dict] = {}
+
+        for i in range(3):
+            kwargs = _base_order_kwargs()
+            kwargs["order_id"] = f"ORD-{i}"
+            await _record_order_to_sourcing_tab(
+                mock_sh, _base_sourcing_info(), pending_rows=pending, **kwargs
+            )
+
+        assert _flush_sourcing_tab_rows(pending) == 3
+        mock_ws.col_values.assert_called_once_with(11)
+        mock_ws.append_row.assert_not_called()
+        mock_ws.update.assert_called_once()
+        rng, rows = mock_ws.update.call_args[0][:2]
+        assert rng == "A7:M9"
+        assert [r[10] for r in rows] == ["ORD-0", "ORD-1", "ORD-2"]
+
+    def test_flush_failure_is_contained(self):
+        mock_ws = MagicMock()
+        mock_ws.col_values.side_effect = Exception("API error")
+        pending = {"무신사": {"ws": mock_ws, "rows": [["x"] * 13], "labels": ["a"]}}
+
+        assert _flush_sourcing_tab_rows(pending) == 0
+        mock_ws.update.assert_not_called()
+
+
 class TestRecordOrderToSourcingTab:
     """Integration tests for _record_order_to_sourcing_tab."""
 
@@ -762,6 +819,22 @@ class TestMatchSourcingOrdersToCoupang:
             return ws
 
         mock_sh.worksheet.side_effect = worksheet_side_effect
+
+        titles = list(sourcing_tabs) + ["쿠팡주문관리"]
+        mock_sh.worksheets.return_value = [MagicMock(title=t) for t in titles]
+
+        def values_batch_get_side_effect(ranges):
+            # "'탭'!A2:K" → 탭의 2행부터 (1행은 헤더)
+            value_ranges = []
+            for a1 in ranges:
+                tab, cells = a1.rsplit("!", 1)
+                tab = tab.strip("'").replace("''", "'")
+                start = int(cells.split(":")[0][1:])
+                rows = [["헤더"] * 11] + sourcing_tabs[tab]
+                value_ranges.append({"range": a1, "values": rows[start - 1 :]})
+            return {"valueRanges": value_ranges}
+
+        mock_sh.values_batch_get.side_effect = values_batch_get_side_effect
         return mock_gc
 
     @pytest.mark.asyncio
@@ -776,7 +849,10 @@ class TestMatchSourcingOrdersToCoupang:
         mock_gc = self._setup_mocks(sourcing, orders)
         mock_authorize.return_value = mock_gc
 
-        await match_sourcing_orders_to_coupang()
+        with patch("coupang_manager._awaiting_invoice_rows", 0):
+            await match_sourcing_orders_to_coupang()
+            # 발송 probe가 새 '주문완료' 행을 다시 읽도록 대기 행 수를 잊는다
+            assert coupang_manager._awaiting_invoice_rows is None
 
         # flush 호출 확인
         order_ws = mock_gc.open_by_key.return_value.worksheet("쿠팡주문관리")
@@ -852,3 +928,82 @@ class TestMatchSourcingOrdersToCoupang:
 
         order_ws = mock_gc.open_by_key.return_value.worksheet("쿠팡주문관리")
         order_ws.batch_update.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("coupang_manager.COUPANG_ORDER_SHEET", "쿠팡주문관리")
+    @patch("coupang_manager.gspread.authorize")
+    @patch("coupang_manager._google_creds")
+    async def test_all_tabs_fetched_in_one_batch_get(self, mock_creds, mock_authorize):
+        """소싱처 탭은 values_batch_get 1회로 읽고 탭별 get_all_values는 쓰지 않는다."""
+        sourcing = {
+            "무신사": [_make_sourcing_tab_row("김철수", "상품A", "ORD-100")],
+            "hmall": [_make_sourcing_tab_row("이영희", "상품B", "ORD-101")],
+        }
+        orders = [_make_order_row("ORD-101", "상품B", "이영희", "결제완료")]
+
+        mock_gc = self._setup_mocks(sourcing, orders)
+        mock_authorize.return_value = mock_gc
+
+        await match_sourcing_orders_to_coupang()
+
+        sh = mock_gc.open_by_key.return_value
+        sh.values_batch_get.assert_called_once()
+        assert len(sh.values_batch_get.call_args[0][0]) == 2
+        sh.worksheet("무신사").get_all_values.assert_not_called()
+        sh.worksheet("쿠팡주문관리").batch_update.assert_called_once()
+
+
+class TestSourcingOrderIncrementalScan:
+    """ops.db 누적 인덱스 + 탭별 마지막 처리 행 기반 증분 스캔."""
+
+    @pytest.fixture
+    async def ops_db(self, tmp_path, monkeypatch):
+        import db
+
+        monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "sourcing_orders.db"))
+        monkeypatch.setattr(db, "_conn", None)
+        await db.open_db()
+        yield
+        await db.close_db()
+
+    async def _run(self, sourcing, orders):
+        mock_gc = TestMatchSourcingOrdersToCoupang()._setup_mocks(sourcing, orders)
+        with (
+            patch("coupang_manager.COUPANG_ORDER_SHEET", "쿠팡주문관리"),
+            patch("coupang_manager.gspread.authorize", return_value=mock_gc),
+            patch("coupang_manager._google_creds"),
+        ):
+            await match_sourcing_orders_to_coupang()
+        return mock_gc.open_by_key.return_value
+
+    async def test_second_run_reads_only_new_rows(self, ops_db):
+        sourcing = {"무신사": [_make_sourcing_tab_row("김철수", "상품A", "ORD-100")]}
+        orders = [_make_order_row("ORD-100", "상품A", "김철수", "결제완료")]
+        await self._run(sourcing, orders)
+
+        # 새 행 추가 → 마지막 처리 행(2행)부터 읽고, 이전 행 키도 인덱스에 남아 있다.
+        sourcing["무신사"].append(_make_sourcing_tab_row("이영희", "상품B", "ORD-101"))
+        orders.append(_make_order_row("ORD-101", "상품B", "이영희", "결제완료"))
+        sh = await self._run(sourcing, orders)
+
+        assert sh.values_batch_get.call_args[0][0] == ["'무신사'!A2:K"]
+        updates = sh.worksheet("쿠팡주문관리").batch_update.call_args[0][0]
+        assert {u["range"] for u in updates} == {"G2", "G3"}
+
+    async def test_deleted_row_triggers_full_rescan(self, ops_db):
+        sourcing = {
+            "무신사": [
+                _make_sourcing_tab_row("김철수", "상품A", "ORD-100"),
+                _make_sourcing_tab_row("이영희", "상품B", "ORD-101"),
+            ]
+        }
+        await self._run(sourcing, [])
+
+        del sourcing["무신사"][0]
+        sourcing["무신사"].append(_make_sourcing_tab_row("박민수", "상품C", "ORD-102"))
+        orders = [_make_order_row("ORD-102", "상품C", "박민수", "결제완료")]
+        sh = await self._run(sourcing, orders)
+
+        calls = [c[0][0] for c in sh.values_batch_get.call_args_list]
+        assert calls == [["'무신사'!A3:K"], ["'무신사'!A2:K"]]
+        sh.worksheet("쿠팡주문관리").batch_update.assert_called_once()
@@ -0,0 +1,191 @@
+"""Tests for the inventory cache and the concurrent scan in auto_stock_out_check()."""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import coupang_manager
+from coupang_manager import (
+    _fetch_vendor_item_stocks,
+    _put_sale_price,
+    auto_stock_out_check,
+    get_vendor_item_stock,
+    update_sale_status,
+)
+
+VID = "70000000111"
+
+
+@pytest.fixture(autouse=True)
+def reset_stock_status():
+    coupang_manager._stock_status.clear()
+    coupang_manager._inventory_cache.clear()
+    coupang_manager._inventory_inflight.clear()
+    yield
+    coupang_manager._stock_status.clear()
+    coupang_manager._inventory_cache.clear()
+    coupang_manager._inventory_inflight.clear()
+
+
+def _sheet(rows: list[list[str]]) -> MagicMock:
+    ws = MagicMock()
+    ws.get_all_values.return_value = [
+        ["vendorItemId", "상품명", "판매가", "재고", "판매상태", "마지막업데이트"]
+    ] + rows
+    return ws
+
+
+# ── get_vendor_item_stock cache ──────────────────────────────
+
+
+class TestInventoryCache:
+    async def test_second_call_served_from_cache(self):
+        api = AsyncMock(return_value={"data": {"salePrice": 10000}})
+        with patch("coupang_manager._coupang_get", api):
+            first = await get_vendor_item_stock(VID)
+            second = await get_vendor_item_stock(VID)
+        assert first == second == {"salePrice": 10000}
+        api.assert_awaited_once()
+
+    async def test_concurrent_requests_collapse(self):
+        async def slow_get(path):
+            await asyncio.sleep(0.01)
+            return {"data": {"salePrice": 10000}}
+
+        api = AsyncMock(side_effect=slow_get)
+        with patch("coupang_manager._coupang_get", api):
+            results = await asyncio.gather(
+                *(get_vendor_item_stock(VID) for _ in range(5))
+            )
+        assert all(r == {"salePrice": 10000} for r in results)
+        api.assert_awaited_once()
+
+    async def test_fresh_bypasses_cache(self):
+        api = AsyncMock(return_value={"data": {"salePrice": 10000}})
+        with patch("coupang_manager._coupang_get", api):
+            await get_vendor_item_stock(VID)
+            await get_vendor_item_stock(VID, fresh=True)
+        assert api.await_count == 2
+
+    async def test_write_invalidates(self):
+        api = AsyncMock(return_value={"data": {"onSale": True}})
+        with (
+            patch("coupang_manager._coupang_get", api),
+            patch(
+                "coupang_manager._coupang_put",
+                AsyncMock(return_value={"code": "SUCCESS"}),
+            ),
+        ):
+            await get_vendor_item_stock(VID)
+            await update_sale_status(VID, False)
+            await get_vendor_item_stock(VID)
+        assert api.await_count == 2
+
+    async def test_failed_price_put_still_invalidates(self):
+        api = AsyncMock(return_value={"data": {"salePrice": 10000}})
+        with (
+            patch("coupang_manager._coupang_get", api),
+            patch(
+                "coupang_manager._coupang_put",
+                AsyncMock(side_effect=TimeoutError("timeout")),
+            ),
+        ):
+            await get_vendor_item_stock(VID)
+            assert await _put_sale_price(VID, 9000) is False
+            await get_vendor_item_stock(VID)
+        assert api.await_count == 2
+
+    async def test_empty_response_not_cached(self):
+        api = AsyncMock(return_value={})
+        with patch("coupang_manager._coupang_get", api):
+            assert await get_vendor_item_stock(VID) == {}
+            await get_vendor_item_stock(VID)
+        assert api.await_count == 2
+
+
+# ── _fetch_vendor_item_stocks ────────────────────────────────
+
+
+class TestFetchVendorItemStocks:
+    async def test_runs_concurrently_and_drops_empty(self):
+        in_flight = 0
+        peak = 0
+
+        async def fake_stock(vid):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {} if vid == "3" else {"amountInStock": int(vid)}
+
+        with patch("coupang_manager.get_vendor_item_stock", side_effect=fake_stock):
+            result = await _fetch_vendor_item_stocks(["1", "2", "3", "4"], workers=2)
+
+        assert set(result) == {"1", "2", "4"}
+        assert result["4"] == {"amountInStock": 4}
+        assert peak == 2
+
+
+# ── auto_stock_out_check ─────────────────────────────────────
+
+
+class TestAutoStockOutCheck:
+    async def test_duplicate_vid_fetched_and_stopped_once(self):
+        ws = _sheet(
+            [
+                ["70000000111", "상품A", "10000", "3", "판매중", ""],
+                ["70000000111", "상품A", "10000", "3", "판매중", ""],
+            ]
+        )
+        stock = AsyncMock(return_value={"amountInStock": 0, "onSale": True})
+        status = AsyncMock(return_value=True)
+        with (
+            patch("coupang_manager._open_coupang_sheet", return_value=ws),
+            patch("coupang_manager.get_vendor_item_stock", stock),
+            patch("coupang_manager.update_sale_status", status),
+            patch("coupang_manager.post_webhook", new_callable=AsyncMock),
+        ):
+            await auto_stock_out_check()
+
+        stock.assert_awaited_once_with("70000000111")
+        status.assert_awaited_once_with("70000000111", False)
+        ranges = {item["range"] for item in ws.batch_update.call_args[0][0]}
+        assert {"E2", "D2", "E3", "D3"} <= ranges
+        assert coupang_manager._stock_status["70000000111"] is False
+
+    async def test_no_transition_no_api_or_sheet_writes(self):
+        ws = _sheet([["70000000111", "상품A", "10000", "3", "판매중", ""]])
+        status = AsyncMock(return_value=True)
+        with (
+            patch("coupang_manager._open_coupang_sheet", return_value=ws),
+            patch(
+                "coupang_manager.get_vendor_item_stock",
+                AsyncMock(return_value={"amountInStock": 3, "onSale": True}),
+            ),
+            patch("coupang_manager.update_sale_status", status),
+            patch("coupang_manager.post_webhook", new_callable=AsyncMock) as wh,
+        ):
+            await auto_stock_out_check()
+
+        status.assert_not_awaited()
+        ws.batch_update.assert_not_called()
+        wh.assert_not_awaited()
+
+    async def test_unchanged_cells_are_not_rewritten(self):
+        # 시트는 이미 품절/0 이지만 쿠팡은 판매중 → 상태변경은 하되 E/D열은 그대로
+        ws = _sheet([["70000000111", "상품A", "10000", "0", "품절", ""]])
+        with (
+            patch("coupang_manager._open_coupang_sheet", return_value=ws),
+            patch(
+                "coupang_manager.get_vendor_item_stock",
+                AsyncMock(return_value={"amountInStock": 0, "onSale": True}),
+            ),
+            patch("coupang_manager.update_sale_status", AsyncMock(return_value=True)),
+            patch("coupang_manager.post_webhook", new_callable=AsyncMock),
+        ):
+            await auto_stock_out_check()
+
+        ranges = [item["range"] for item in ws.batch_update.call_args[0][0]]
+        assert ranges == ["F2"]